@@ -0,0 +1,92 @@
+# ============================================================
+# Benchmark: full Prompt rows vs PromptSummary projection
+#
+#   python benchmarks/bench_list_load.py --prompts 50000
+#
+# Fills a profile with long SDXL-style prompts and compares time and
+# peak Python memory of DB.list_prompts (every text column wrapped in
+# a Prompt dataclass) with DB.list_prompt_summaries.
+# ============================================================
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from promptexplorer.db import DB  # noqa: E402
+from promptexplorer.utils import now_ts  # noqa: E402
+
+
+TAGS = [
+    "masterpiece", "best quality", "ultra detailed", "8k", "photorealistic", "1girl", "solo",
+    "looking at viewer", "cinematic lighting", "volumetric fog", "depth of field", "bokeh",
+    "intricate armor", "flowing cape", "dragon wings", "glowing eyes", "ruined castle",
+    "stormy sky", "lightning", "rain", "(detailed face:1.2)", "(sharp focus:1.1)", "[blurry]",
+]
+
+
+def fill(db: DB, prompts: int, seed: int) -> int:
+    rnd = random.Random(seed)
+    pid = db.create_profile("bench")
+    tid = db.create_type_if_missing(pid, "SDXL")
+
+    now = now_ts()
+
+    def rows():
+        for i in range(prompts):
+            positive = ", ".join(rnd.choices(TAGS, k=rnd.randint(60, 120)))
+            negative = ", ".join(rnd.choices(TAGS, k=rnd.randint(20, 40)))
+            ts = now - rnd.randrange(365 * 86400)  # within the last year
+            yield (pid, tid, f"Prompt {i}", "long description " * 10, positive, negative,
+                   "<lora:detail:0.6>", "sdxl", ts, ts)
+
+    db.conn.executemany("""
+        INSERT INTO prompts(profile_id, type_id, name, description, positive, negative, lora, model,
+                            created_at, updated_at)
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+    """, rows())
+    db.conn.commit()
+    return pid
+
+
+def measure(fn) -> tuple[float, float]:
+    # timing and tracing separately: tracemalloc slows allocations down
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed * 1000.0, peak / (1024 * 1024)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="List projection benchmark")
+    ap.add_argument("--prompts", type=int, default=50_000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DB(os.path.join(tmp, "bench.sqlite3"))
+        pid = fill(db, args.prompts, args.seed)
+
+        full_ms, full_mb = measure(lambda: db.list_prompts(pid, None))
+        summ_ms, summ_mb = measure(lambda: db.list_prompt_summaries(pid, None))
+        db.close()
+
+    print(f"{'query':<24}{'time, ms':>12}{'peak, MiB':>12}")
+    print(f"{'list_prompts':<24}{full_ms:>12.1f}{full_mb:>12.1f}")
+    print(f"{'list_prompt_summaries':<24}{summ_ms:>12.1f}{summ_mb:>12.1f}")
+    print(f"{'ratio':<24}{full_ms / summ_ms:>11.1f}x{full_mb / summ_mb:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
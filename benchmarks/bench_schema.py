@@ -0,0 +1,222 @@
+# ============================================================
+# Benchmark: legacy (unversioned) schema vs migrated schema
+#
+#   python benchmarks/bench_schema.py --prompts 300000
+#
+# Builds a database with the pre-migration layout (no secondary
+# indexes, no foreign keys), prints query plans and timings of the
+# hot DB queries, migrates it through DB() and prints them again.
+# ============================================================
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from promptexplorer.db import DB  # noqa: E402
+
+
+LEGACY_SCHEMA = [
+    """
+    CREATE TABLE profiles(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        theme TEXT NOT NULL DEFAULT 'light',
+        created_at TEXT NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE types(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        profile_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        FOREIGN KEY(profile_id) REFERENCES profiles(id)
+    );
+    """,
+    """
+    CREATE TABLE prompts(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        profile_id INTEGER NOT NULL,
+        type_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        description TEXT NOT NULL,
+        positive TEXT NOT NULL,
+        negative TEXT NOT NULL,
+        lora TEXT NOT NULL,
+        model TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        FOREIGN KEY(profile_id) REFERENCES profiles(id),
+        FOREIGN KEY(type_id) REFERENCES types(id)
+    );
+    """,
+]
+
+WORDS = [
+    "masterpiece", "best quality", "1girl", "solo", "looking at viewer", "smile", "long hair",
+    "outdoors", "sky", "cloud", "dragon", "armor", "sword", "forest", "night", "city lights",
+    "cinematic lighting", "depth of field", "ultra detailed", "highres", "portrait", "full body",
+]
+
+LIST_SQL = """
+    SELECT p.id, t.name AS type, p.name, p.description, p.positive, p.negative, p.lora, p.model,
+           p.created_at, p.updated_at
+    FROM prompts p
+    JOIN types t ON t.id = p.type_id
+    WHERE p.profile_id=?{extra}
+    ORDER BY p.updated_at DESC;
+"""
+
+QUERIES = [
+    ("list_prompts(type)", LIST_SQL.format(extra=" AND p.type_id=?"), ("profile", "type")),
+    ("list_prompts(All)", LIST_SQL.format(extra=""), ("profile",)),
+    ("type_prompt_count", "SELECT COUNT(*) FROM prompts WHERE profile_id=? AND type_id=?;", ("profile", "type")),
+    ("stats_total", "SELECT COUNT(*) FROM prompts WHERE profile_id=?;", ("profile",)),
+]
+
+# Destructive statements run inside a savepoint and are rolled back.
+DELETES_BEFORE = [
+    ("delete_type_and_prompts", [
+        ("DELETE FROM prompts WHERE profile_id=? AND type_id=?;", ("profile", "type")),
+        ("DELETE FROM types WHERE id=? AND profile_id=?;", ("type", "profile")),
+    ]),
+    ("delete_profile", [
+        ("DELETE FROM prompts WHERE profile_id=?;", ("profile",)),
+        ("DELETE FROM types WHERE profile_id=?;", ("profile",)),
+        ("DELETE FROM profiles WHERE id=?;", ("profile",)),
+    ]),
+]
+
+DELETES_AFTER = [
+    ("delete_type_and_prompts", [
+        ("DELETE FROM types WHERE id=? AND profile_id=?;", ("type", "profile")),
+    ]),
+    ("delete_profile", [
+        ("DELETE FROM profiles WHERE id=?;", ("profile",)),
+    ]),
+]
+
+
+def build_legacy_db(path: str, profiles: int, types: int, prompts: int, seed: int) -> None:
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(path)
+    for sql in LEGACY_SCHEMA:
+        conn.execute(sql)
+
+    conn.executemany(
+        "INSERT INTO profiles(id, name, theme, created_at) VALUES(?, ?, 'light', '2025-01-01 00:00:00');",
+        [(i, f"Profile {i}") for i in range(1, profiles + 1)],
+    )
+    type_rows = []
+    for pid in range(1, profiles + 1):
+        for t in range(types):
+            type_rows.append((len(type_rows) + 1, pid, f"Type {t}"))
+    conn.executemany("INSERT INTO types(id, profile_id, name) VALUES(?, ?, ?);", type_rows)
+
+    def rows():
+        for i in range(prompts):
+            tid, pid, _ = type_rows[rnd.randrange(len(type_rows))]
+            ts = f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} {rnd.randint(0, 23):02d}:00:00"
+            positive = ", ".join(rnd.choices(WORDS, k=rnd.randint(10, 40)))
+            yield (pid, tid, f"Prompt {i}", "(без описания)", positive, "lowres, bad anatomy", "", "sdxl", ts, ts)
+
+    conn.executemany("""
+        INSERT INTO prompts(profile_id, type_id, name, description, positive, negative, lora, model,
+                            created_at, updated_at)
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+    """, rows())
+    conn.commit()
+    conn.close()
+
+
+def _bind(keys: tuple[str, ...], ids: dict[str, int]) -> tuple[int, ...]:
+    return tuple(ids[k] for k in keys)
+
+
+def _plan(conn: sqlite3.Connection, sql: str, params: tuple) -> list[str]:
+    return [str(r[3]) for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def run_suite(conn: sqlite3.Connection, ids: dict[str, int], deletes, repeat: int) -> dict[str, tuple[float, list[str]]]:
+    out: dict[str, tuple[float, list[str]]] = {}
+
+    for label, sql, keys in QUERIES:
+        params = _bind(keys, ids)
+        ms = _time(lambda: conn.execute(sql, params).fetchall(), repeat)
+        out[label] = (ms, _plan(conn, sql, params))
+
+    for label, statements in deletes:
+        def run():
+            conn.execute("SAVEPOINT bench;")
+            for sql, keys in statements:
+                conn.execute(sql, _bind(keys, ids))
+            conn.execute("ROLLBACK TO bench;")
+            conn.execute("RELEASE bench;")
+
+        plan: list[str] = []
+        for sql, keys in statements:
+            plan.extend(_plan(conn, sql, _bind(keys, ids)))
+        out[label] = (_time(run, repeat), plan)
+
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Legacy vs migrated schema benchmark")
+    ap.add_argument("--profiles", type=int, default=5)
+    ap.add_argument("--types", type=int, default=40)
+    ap.add_argument("--prompts", type=int, default=200_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite3")
+
+        t0 = time.perf_counter()
+        build_legacy_db(path, args.profiles, args.types, args.prompts, args.seed)
+        print(f"generated {args.prompts} prompts in {time.perf_counter() - t0:.1f}s")
+
+        ids = {"profile": 1, "type": 1}
+
+        conn = sqlite3.connect(path)
+        before = run_suite(conn, ids, DELETES_BEFORE, args.repeat)
+        conn.close()
+
+        t0 = time.perf_counter()
+        db = DB(path)
+        print(f"migrated in {time.perf_counter() - t0:.1f}s")
+        after = run_suite(db.conn, ids, DELETES_AFTER, args.repeat)
+        db.conn.close()
+
+    print()
+    print(f"{'operation':<26}{'before, ms':>12}{'after, ms':>12}{'speedup':>10}")
+    for label, (ms_before, _) in before.items():
+        ms_after = after[label][0]
+        print(f"{label:<26}{ms_before:>12.2f}{ms_after:>12.2f}{ms_before / max(ms_after, 1e-6):>9.1f}x")
+
+    print()
+    for label in before:
+        print(f"== {label}")
+        for line in before[label][1]:
+            print(f"   before: {line}")
+        for line in after[label][1]:
+            print(f"   after:  {line}")
+
+
+if __name__ == "__main__":
+    main()
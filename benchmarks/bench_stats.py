@@ -0,0 +1,76 @@
+# ============================================================
+# Benchmark: materialized stats vs GROUP BY over prompts
+#
+#   python benchmarks/bench_stats.py --prompts 100000
+#
+# Compares DB.profile_stats (reads the stats_* counters) with the
+# same numbers aggregated from the prompts table, and shows what the
+# triggers cost on inserts.
+# ============================================================
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from promptexplorer.db import DB  # noqa: E402
+
+from bench_list_load import fill  # noqa: E402
+
+
+AGGREGATE_SQL = [
+    "SELECT COUNT(*), AVG(length(positive)), AVG(length(negative)) FROM prompts WHERE profile_id=?;",
+    "SELECT type_id, COUNT(*) FROM prompts WHERE profile_id=? GROUP BY type_id;",
+    "SELECT model, COUNT(*) FROM prompts WHERE profile_id=? GROUP BY model;",
+    "SELECT lora, COUNT(*) FROM prompt_loras WHERE profile_id=? GROUP BY lora;",
+    "SELECT date(created_at, 'unixepoch', 'localtime') AS d, COUNT(*) FROM prompts WHERE profile_id=? GROUP BY d;",
+    "SELECT date(updated_at, 'unixepoch', 'localtime') AS d, COUNT(*) FROM prompts WHERE profile_id=? GROUP BY d;",
+]
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Materialized statistics benchmark")
+    ap.add_argument("--prompts", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DB(os.path.join(tmp, "bench.sqlite3"))
+
+        t0 = time.perf_counter()
+        pid = fill(db, args.prompts, args.seed)
+        fill_s = time.perf_counter() - t0
+
+        def aggregate():
+            for sql in AGGREGATE_SQL:
+                db.conn.execute(sql, (pid,)).fetchall()
+
+        group_ms = best_of(aggregate, args.repeat)
+        stats_ms = best_of(lambda: db.profile_stats(pid), args.repeat)
+
+        db.conn.execute("DROP TRIGGER prompts_stats_ai;")
+        t0 = time.perf_counter()
+        fill(db, args.prompts, args.seed)
+        fill_plain_s = time.perf_counter() - t0
+        db.conn.close()
+
+    print(f"GROUP BY over prompts   {group_ms:10.2f} ms")
+    print(f"profile_stats           {stats_ms:10.2f} ms   ({group_ms / max(stats_ms, 1e-6):.0f}x)")
+    print(f"insert {args.prompts} prompts:  {fill_s:.2f}s with stats triggers, {fill_plain_s:.2f}s without")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+# ============================================================
+# Benchmark suite: DB and UI hot paths at several scales
+#
+#   python benchmarks/bench_suite.py --scales 1k,100k --out results.json
+#   python benchmarks/bench_suite.py --scales 1m --data ~/bench-data --baseline results.json
+#
+# For every scale a database is generated with synth.py (kept in --data
+# and reused by later runs with the same arguments) and copied to a
+# scratch file; then, on the largest profile:
+#
+#   list_prompts      all prompts of the profile
+#   get_prompt        one random prompt, cold cache (per call)
+#   upsert_prompt     an edit or a new prompt (per call)
+#   import_profile    the profile into an empty database
+#   export_prompts    the profile to JSONL
+#   refresh_all       MainWindow under the offscreen platform, until every
+#                     DB call it started has come back
+#
+# Results are written as JSON (min / median / max ms per operation and
+# scale, with the commit and the versions), so runs on two commits can
+# be compared: --baseline prints the ratio to an earlier file.
+# ============================================================
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from promptexplorer.db import DB  # noqa: E402
+from promptexplorer.export import export_prompts  # noqa: E402
+
+from synth import generate  # noqa: E402
+
+
+CALLS = 200  # samples of the per-call operations
+
+
+def parse_scale(text: str) -> int:
+    text = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * mult)
+
+
+def scale_name(n: int) -> str:
+    for suffix, mult in (("m", 1_000_000), ("k", 1_000)):
+        if n >= mult and n % mult == 0:
+            return f"{n // mult}{suffix}"
+    return str(n)
+
+
+def summary(samples: list[float]) -> dict[str, float]:
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "n": len(samples),
+    }
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+# ---------------------------
+# Data
+# ---------------------------
+
+def dataset(data_dir: str, prompts: int, args: argparse.Namespace) -> tuple[str, float | None]:
+    # (path, seconds spent generating or None when reused)
+    path = os.path.join(data_dir, f"synth-{prompts}-p{args.profiles}-t{args.types}-s{args.seed}.sqlite3")
+    if os.path.exists(path):
+        return path, None
+    tmp = path + ".part"
+    for f in (tmp, tmp + "-wal", tmp + "-shm"):
+        if os.path.exists(f):
+            os.remove(f)
+    t0 = time.perf_counter()
+    db = DB(tmp)
+    generate(db, args.profiles, args.types, prompts, args.seed)
+    db.close()
+    os.replace(tmp, path)
+    return path, time.perf_counter() - t0
+
+
+def largest_profile(db: DB) -> int:
+    return max((db.stats_total(pid), pid) for pid, _, _ in db.list_profiles())[1]
+
+
+# ---------------------------
+# Operations
+# ---------------------------
+
+def bench_db(db: DB, pid: int, scratch: str, repeat: int, rnd: random.Random) -> dict[str, dict]:
+    out: dict[str, dict] = {}
+
+    out["list_prompts"] = summary([timed(lambda: db.list_prompts(pid, None)) for _ in range(repeat)])
+
+    with db._read() as conn:
+        ids = [r[0] for r in conn.execute("SELECT id FROM prompts WHERE profile_id=?;", (pid,))]
+    samples = []
+    for prompt_id in rnd.sample(ids, min(CALLS, len(ids))):
+        with db._cache_lock:
+            db._prompt_cache.clear()
+        samples.append(timed(lambda: db.get_prompt(prompt_id)))
+    out["get_prompt"] = summary(samples)
+
+    samples = []
+    for i, prompt_id in enumerate(rnd.sample(ids, min(CALLS, len(ids)))):
+        p = db.get_prompt(prompt_id)
+        target = prompt_id if i % 2 else None  # edits and inserts in turn
+        samples.append(timed(lambda: db.upsert_prompt(
+            pid, target, p.type, f"{p.name} (bench {i})", p.description, p.positive + ", bench", p.negative,
+            p.lora, p.model,
+        )))
+    out["upsert_prompt"] = summary(samples)
+
+    samples = []
+    target_path = os.path.join(scratch, "import.sqlite3")
+    for _ in range(repeat):
+        target = DB(target_path)
+        samples.append(timed(lambda: target.import_profile_from_db(db.path, pid)))
+        target.close()
+        for f in (target_path, target_path + "-wal", target_path + "-shm"):
+            if os.path.exists(f):
+                os.remove(f)
+    out["import_profile"] = summary(samples)
+
+    export_path = os.path.join(scratch, "export.jsonl")
+    out["export_prompts"] = summary([
+        timed(lambda: export_prompts(db, pid, None, export_path, "jsonl")) for _ in range(repeat)
+    ])
+    os.remove(export_path)
+    return out
+
+
+def bench_gui(db: DB, pid: int, scratch: str, repeat: int) -> dict[str, dict]:
+    from PySide6.QtCore import QSettings
+    from PySide6.QtGui import QIcon
+    from PySide6.QtWidgets import QApplication
+
+    from promptexplorer.db_executor import DBExecutor
+    from promptexplorer.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    executor = DBExecutor(db)
+    settings = QSettings(os.path.join(scratch, "settings.ini"), QSettings.IniFormat)
+
+    def settle() -> None:
+        # events first: a delivered result may start the next call
+        while True:
+            app.processEvents()
+            if executor.idle():
+                app.processEvents()
+                if executor.idle():
+                    return
+            time.sleep(0.001)
+
+    w = MainWindow(db, executor, QIcon(), None, None, pid, settings, "light")
+    w.external_timer.stop()
+    w.show()
+    settle()
+
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        w.refresh_all()
+        settle()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+
+    w.hide()
+    executor.shutdown()
+    w.deleteLater()
+    app.processEvents()
+    return {"refresh_all": summary(samples)}
+
+
+# ---------------------------
+# Entry point
+# ---------------------------
+
+def print_results(results: dict, baseline: dict | None) -> None:
+    base = (baseline or {}).get("results", {})
+    header = f"{'scale':<8}{'operation':<18}{'median, ms':>12}{'min, ms':>12}{'max, ms':>12}"
+    print(header + ("  vs baseline" if base else ""))
+    for scale, ops in results.items():
+        for op, s in ops.items():
+            line = f"{scale:<8}{op:<18}{s['median']:>12.2f}{s['min']:>12.2f}{s['max']:>12.2f}"
+            old = base.get(scale, {}).get(op)
+            if old:
+                line += f"  {s['median'] / max(old['median'], 1e-9):10.2f}x"
+            print(line)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="DB and UI benchmark suite")
+    ap.add_argument("--scales", default="1k,100k", help="prompts per database, e.g. 1k,100k,1m")
+    ap.add_argument("--profiles", type=int, default=3)
+    ap.add_argument("--types", type=int, default=12)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--repeat", type=int, default=3, help="runs of the whole-profile operations")
+    ap.add_argument("--data", help="keep generated databases here and reuse them (default: a temp dir)")
+    ap.add_argument("--no-gui", action="store_true", help="skip MainWindow.refresh_all")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--baseline", help="an earlier --out file to compare with")
+    args = ap.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results: dict[str, dict] = {}
+    datasets: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data or os.path.join(tmp, "data")
+        os.makedirs(data_dir, exist_ok=True)
+
+        for text in args.scales.split(","):
+            prompts = parse_scale(text)
+            name = scale_name(prompts)
+            path, gen_s = dataset(data_dir, prompts, args)
+            datasets[name] = {"prompts": prompts, "bytes": os.path.getsize(path), "generate_s": gen_s}
+            print(f"{name}: {'generated in %.1fs' % gen_s if gen_s is not None else 'reused'} ({path})",
+                  file=sys.stderr)
+
+            # the operations write: always on a copy
+            scratch = os.path.join(tmp, name)
+            os.makedirs(scratch)
+            work = os.path.join(scratch, "bench.sqlite3")
+            shutil.copyfile(path, work)
+
+            db = DB(work)
+            pid = largest_profile(db)
+            results[name] = bench_db(db, pid, scratch, args.repeat, random.Random(args.seed))
+            if not args.no_gui:
+                results[name].update(bench_gui(db, pid, scratch, args.repeat))
+            db.close()
+            shutil.rmtree(scratch)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "args": vars(args),
+            "datasets": datasets,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    print_results(results, baseline)
+    print(f"written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# ============================================================
+# Benchmark: theme switch and dialog open cost
+#
+#   python benchmarks/bench_theme.py --prompts 20000
+#
+# Opens the main window on a filled profile (offscreen), scrolls the
+# list to the end so every page is loaded, then times theme toggles and
+# PromptDialog opens — with the app-level cached stylesheet and batched
+# list layout, and the old way (raw setStyleSheet, single-pass list
+# layout, dialog re-applying the QSS on itself).
+# ============================================================
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEventLoop, QSettings, QTimer  # noqa: E402
+from PySide6.QtGui import QIcon  # noqa: E402
+from PySide6.QtWidgets import QApplication, QListView  # noqa: E402
+
+from promptexplorer.db import DB  # noqa: E402
+from promptexplorer.db_executor import DBExecutor  # noqa: E402
+from promptexplorer.dialogs.prompt_dialog import PromptDialog  # noqa: E402
+from promptexplorer.main_window import MainWindow  # noqa: E402
+from promptexplorer.theme import add_repolish_hook, apply_theme, theme_qss  # noqa: E402
+
+from bench_list_load import fill  # noqa: E402
+
+
+def pump(ms: int) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def timed(fn, repeat: int) -> float:
+    total = 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        QApplication.processEvents()
+        total += time.perf_counter() - t0
+    return total / repeat * 1000.0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Theme switch benchmark")
+    ap.add_argument("--prompts", type=int, default=20_000)
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    app = QApplication(sys.argv)
+    polish: list[float] = []
+    add_repolish_hook(lambda _theme, ms: polish.append(ms))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DB(os.path.join(tmp, "bench.sqlite3"))
+        pid = fill(db, args.prompts, 1)
+        executor = DBExecutor(db)
+        settings = QSettings(os.path.join(tmp, "settings.ini"), QSettings.IniFormat)
+
+        w = MainWindow(db, executor, QIcon(), None, None, pid, settings, "light")
+        w.resize(1200, 800)
+        w.show()
+        while w.list_model.rowCount() < args.prompts:
+            w.list_model.fetchMore()
+            pump(10)
+        pump(200)
+
+        # warm-up, then the two paths
+        for theme in ("dark", "light"):
+            apply_theme(theme)
+        QApplication.processEvents()
+        polish.clear()
+
+        themes = iter(["dark", "light"] * args.repeat)
+        raw_ms = timed(lambda: app.setStyleSheet(theme_qss(next(themes))), args.repeat * 2)
+
+        themes = iter(["dark", "light"] * args.repeat)
+        cached_ms = timed(lambda: apply_theme(next(themes)), args.repeat * 2)
+
+        # the list laid out in one pass, as before batched layout
+        w.list.setLayoutMode(QListView.SinglePass)
+        themes = iter(["dark", "light"] * args.repeat)
+        single_ms = timed(lambda: apply_theme(next(themes)), args.repeat)
+        w.list.setLayoutMode(QListView.Batched)
+        apply_theme("light")
+
+        def open_dialog(own_qss: bool) -> None:
+            dlg = PromptDialog(["SDXL"], QIcon())
+            if own_qss:
+                dlg.setStyleSheet(theme_qss("light"))
+            dlg.show()
+            dlg.close()
+            dlg.deleteLater()
+
+        open_dialog(False)
+        inherit_ms = own_ms = 0.0
+        for _ in range(args.repeat):
+            inherit_ms += timed(lambda: open_dialog(False), 1) / args.repeat
+            own_ms += timed(lambda: open_dialog(True), 1) / args.repeat
+
+        rows = w.list_model.rowCount()
+        executor.shutdown()
+        db.conn.close()
+
+    print(f"list rows loaded: {rows}")
+    print(f"theme toggle, apply_theme       {cached_ms:8.2f} ms   (re-polish alone {min(polish, default=0.0):.2f} ms best)")
+    print(f"theme toggle, raw setStyleSheet {raw_ms:8.2f} ms")
+    print(f"theme toggle, single-pass list  {single_ms:8.2f} ms")
+    print(f"PromptDialog, inherited QSS     {inherit_ms:8.2f} ms")
+    print(f"PromptDialog, own setStyleSheet {own_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# ============================================================
+# Synthetic dataset: profiles, types and SD-style prompts
+#
+#   python benchmarks/synth.py out.sqlite3 --prompts 100000 --profiles 3 --types 12
+#
+# Seeded: the same arguments give the same prompts (timestamps are
+# relative to the time of the run). Prompts look like real Stable
+# Diffusion ones: 15-80 positive and 5-40 negative tags drawn from a few
+# thousand with a Zipf-like skew (a handful of "masterpiece"-style tags
+# everywhere, a long tail of rare ones), some weighted "(tag:1.2)", 0-3
+# LoRAs, one of a few models, timestamps over the last two years. Rows
+# go in the way DB.import_profile_from_db puts them: prompts with their
+# content hash (the FTS and stats triggers follow), then prompt_loras and
+# prompt_tags.
+# ============================================================
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from promptexplorer.db import DB  # noqa: E402
+from promptexplorer.migrations import insert_tag_rows, tag_rows  # noqa: E402
+from promptexplorer.parsing import content_hash, parse_loras  # noqa: E402
+from promptexplorer.utils import now_ts  # noqa: E402
+
+
+COMMON = [
+    "masterpiece", "best quality", "high quality", "ultra detailed", "highres", "absurdres", "8k",
+    "photorealistic", "1girl", "1boy", "solo", "looking at viewer", "smile", "long hair", "short hair",
+    "outdoors", "indoors", "sky", "cloud", "night", "sunset", "cinematic lighting", "depth of field",
+    "bokeh", "portrait", "full body", "upper body", "detailed face", "sharp focus", "volumetric lighting",
+]
+NEGATIVE = [
+    "lowres", "bad anatomy", "bad hands", "text", "error", "missing fingers", "extra digit",
+    "fewer digits", "cropped", "worst quality", "low quality", "normal quality", "jpeg artifacts",
+    "signature", "watermark", "username", "blurry", "deformed", "disfigured", "extra limbs",
+]
+ADJECTIVES = [
+    "red", "blue", "golden", "silver", "dark", "glowing", "ancient", "ornate", "ruined", "floating",
+    "crystal", "wet", "frozen", "burning", "misty", "neon", "gothic", "tiny", "giant", "shiny",
+]
+NOUNS = [
+    "armor", "cape", "wings", "eyes", "castle", "forest", "city", "dragon", "sword", "dress", "ribbon",
+    "flowers", "lake", "mountains", "street", "throne", "mask", "crown", "jacket", "boots", "helmet",
+    "staff", "book", "lantern", "bridge", "temple", "garden", "window", "rain", "stars",
+]
+MODELS = ["sdxl", "sd15", "pony", "illustrious", "flux", ""]
+LORAS = [f"{a}_{n}" for a in ("add", "detail", "style", "char", "pose") for n in ("v1", "v2", "xl", "lite")]
+TYPE_NAMES = ["Portrait", "Landscape", "Anime", "Fantasy", "Sci-Fi", "Architecture", "Food", "Animals",
+              "Cars", "Fashion", "Horror", "Abstract"]
+
+BATCH = 5_000
+
+
+def vocabulary(rnd: random.Random) -> tuple[list[str], list[float]]:
+    # tags with cumulative weights ~ 1/rank: common ones first
+    tail = [f"{a} {n}" for a in ADJECTIVES for n in NOUNS]
+    tail += [f"{n} {i}" for n in NOUNS for i in range(1, 60)]
+    rnd.shuffle(tail)
+    tags = COMMON + tail
+    cum, total = [], 0.0
+    for rank in range(1, len(tags) + 1):
+        total += 1.0 / rank
+        cum.append(total)
+    return tags, cum
+
+
+def _tag_list(rnd: random.Random, tags: list[str], cum: list[float], k: int) -> str:
+    out = []
+    for tag in dict.fromkeys(rnd.choices(tags, cum_weights=cum, k=k)):
+        if rnd.random() < 0.1:
+            tag = f"({tag}:{rnd.choice((0.8, 0.9, 1.1, 1.2, 1.3))})"
+        out.append(tag)
+    return ", ".join(out)
+
+
+def generate(db: DB, profiles: int, types: int, prompts: int, seed: int = 1) -> list[int]:
+    # Returns the profile ids. Prompts are spread over profiles and types
+    # unevenly, the first ones get the most.
+    rnd = random.Random(seed)
+    tags, cum = vocabulary(rnd)
+    neg_cum = [float(i) for i in range(1, len(NEGATIVE) + 1)]
+
+    shares = [1.0 / (i + 1) for i in range(profiles)]
+    counts = [int(prompts * s / sum(shares)) for s in shares]
+    counts[0] += prompts - sum(counts)
+
+    now = now_ts()
+    vocab: dict[str, int] = {}
+    pids: list[int] = []
+    for n_profile, count in enumerate(counts):
+        pid = db.create_profile(f"Profile {n_profile + 1}")
+        pids.append(pid)
+        # Portrait, ..., Abstract, Portrait 2, ...
+        names = [TYPE_NAMES[i % len(TYPE_NAMES)] + (f" {i // len(TYPE_NAMES) + 1}" if i >= len(TYPE_NAMES) else "")
+                 for i in range(types)]
+        tids = [db.create_type_if_missing(pid, name) for name in names]
+        type_weights = [1.0 / (i + 1) for i in range(types)]
+
+        for start in range(0, count, BATCH):
+            rows = []
+            for i in range(start, min(start + BATCH, count)):
+                positive = _tag_list(rnd, tags, cum, int(min(80, max(15, rnd.lognormvariate(3.5, 0.4)))))
+                negative = _tag_list(rnd, NEGATIVE, neg_cum, rnd.randint(5, 40))
+                lora = " ".join(f"<lora:{name}:{rnd.choice((0.5, 0.7, 0.8, 1))}>"
+                                for name in rnd.sample(LORAS, rnd.choice((0, 0, 1, 1, 2, 3))))
+                model = rnd.choice(MODELS)
+                name = f"{rnd.choice(ADJECTIVES).title()} {rnd.choice(NOUNS)} #{i + 1}"
+                description = "" if rnd.random() < 0.5 else f"{name}: {rnd.choice(COMMON)}, {rnd.choice(NOUNS)}"
+                created = now - rnd.randrange(730 * 86400)
+                updated = created if rnd.random() < 0.7 else rnd.randint(created, now)
+                rows.append((pid, rnd.choices(tids, weights=type_weights)[0], name, description, positive,
+                             negative, lora, model, created, updated,
+                             content_hash(name, description, positive, negative, lora, model)))
+
+            with db._write() as conn:
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM prompts;").fetchone()[0]
+                conn.executemany("""
+                    INSERT INTO prompts(profile_id, type_id, name, description, positive, negative, lora, model,
+                                        created_at, updated_at, content_hash)
+                    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+                """, rows)
+                ids = [r[0] for r in conn.execute("SELECT id FROM prompts WHERE id > ? ORDER BY id;", (last_id,))]
+                loras, tag_batch = [], []
+                for prompt_id, r in zip(ids, rows):
+                    loras.extend((prompt_id, pid, name) for name in parse_loras(r[6]))
+                    tag_batch.extend(tag_rows(prompt_id, pid, r[4], r[5]))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO prompt_loras(prompt_id, profile_id, lora) VALUES(?, ?, ?);", loras
+                )
+                insert_tag_rows(conn, tag_batch, vocab)
+    return pids
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Synthetic PromptExplorer database")
+    ap.add_argument("path")
+    ap.add_argument("--prompts", type=int, default=100_000)
+    ap.add_argument("--profiles", type=int, default=3)
+    ap.add_argument("--types", type=int, default=12)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    if os.path.exists(args.path):
+        sys.exit(f"{args.path} exists")
+    t0 = time.perf_counter()
+    db = DB(args.path)
+    generate(db, args.profiles, args.types, args.prompts, args.seed)
+    db.close()
+    print(f"{args.prompts} prompts in {time.perf_counter() - t0:.1f}s, {os.path.getsize(args.path) / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
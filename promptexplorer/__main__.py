@@ -1,4 +1,10 @@
-from .app import main
+import sys
 
 if __name__ == "__main__":
+    # the CLI must not pay for importing Qt
+    if sys.argv[1:2] == ["cli"]:
+        from .cli import main as cli_main
+        sys.exit(cli_main(sys.argv[2:]))
+
+    from .app import main
     main()
@@ -0,0 +1,99 @@
+from PySide6.QtCore import QRectF, QSize, Qt
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QToolTip, QWidget
+
+
+# ============================================================
+# Activity timeline: created / updated prompts per period
+# ============================================================
+#
+# Paints ProfileStats.activity as pairs of bars, oldest on the left, and
+# shows the exact numbers of the bucket under the mouse in a tooltip.
+# Colors come from the palette, so the chart follows the theme.
+
+BAR_GAP = 0.2  # share of a bucket left empty between neighbours
+
+
+class ActivityChart(QWidget):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # (label, created, updated), oldest first
+        self.rows: list[tuple[str, int, int]] = []
+        self.setMouseTracking(True)
+        self.setMinimumHeight(120)
+
+    def sizeHint(self) -> QSize:
+        return QSize(400, 160)
+
+    def set_activity(self, activity: list[tuple[str, int, int]]) -> None:
+        # activity is newest first, as ProfileStats has it
+        self.rows = list(reversed(activity))
+        self.update()
+
+    # ---------------------------
+    # Geometry
+    # ---------------------------
+    def _plot(self) -> QRectF:
+        fm = self.fontMetrics()
+        return QRectF(self.rect()).adjusted(4, fm.height() + 4, -4, -(fm.height() + 6))
+
+    def _bucket_at(self, x: float) -> int | None:
+        plot = self._plot()
+        if not self.rows or not plot.left() <= x < plot.right():
+            return None
+        return int((x - plot.left()) / plot.width() * len(self.rows))
+
+    # ---------------------------
+    # Painting
+    # ---------------------------
+    def paintEvent(self, _event) -> None:
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        pal = self.palette()
+        fm = self.fontMetrics()
+        plot = self._plot()
+
+        created_color = pal.highlight().color()
+        updated_color = QColor(created_color)
+        updated_color.setAlpha(110)
+
+        # legend
+        p.setPen(pal.text().color())
+        x = plot.left()
+        for color, text in ((created_color, "Создано"), (updated_color, "Обновлено")):
+            p.fillRect(QRectF(x, 2, fm.height() - 4, fm.height() - 4), color)
+            x += fm.height()
+            p.drawText(QRectF(x, 0, fm.horizontalAdvance(text) + 1, fm.height()), Qt.AlignVCenter, text)
+            x += fm.horizontalAdvance(text) + fm.height()
+
+        p.setPen(pal.mid().color())
+        p.drawLine(plot.bottomLeft(), plot.bottomRight())
+        if not self.rows:
+            return
+
+        top = max(max(c, u) for _, c, u in self.rows) or 1
+        step = plot.width() / len(self.rows)
+        bar = step * (1 - BAR_GAP) / 2
+        for i, (_, created, updated) in enumerate(self.rows):
+            x = plot.left() + i * step + step * BAR_GAP / 2
+            for j, (n, color) in enumerate(((created, created_color), (updated, updated_color))):
+                h = plot.height() * n / top
+                p.fillRect(QRectF(x + j * bar, plot.bottom() - h, bar, h), color)
+
+        # labels of the oldest and the newest bucket
+        p.setPen(pal.text().color())
+        label_rect = QRectF(plot.left(), plot.bottom() + 2, plot.width(), fm.height())
+        p.drawText(label_rect, Qt.AlignLeft | Qt.AlignVCenter, self.rows[0][0])
+        p.drawText(label_rect, Qt.AlignRight | Qt.AlignVCenter, self.rows[-1][0])
+        p.drawText(QRectF(plot.left(), 0, plot.width(), fm.height()), Qt.AlignRight | Qt.AlignVCenter, str(top))
+
+    def mouseMoveEvent(self, event) -> None:
+        i = self._bucket_at(event.position().x())
+        if i is None:
+            QToolTip.hideText()
+            return
+        label, created, updated = self.rows[i]
+        QToolTip.showText(
+            event.globalPosition().toPoint(), f"{label}\nСоздано: {created}\nОбновлено: {updated}", self
+        )
@@ -2,19 +2,80 @@
 # PromptExplorer — version 0.9.0.0 beta
 # ============================================================
 
+from .startup_timing import timer  # first: starts the startup clock
+
 import os
 import sys
 
-from PySide6.QtCore import QSettings
-from PySide6.QtGui import QIcon, QFont
+from PySide6.QtCore import QEventLoop, QObject, QEvent, QSettings, Qt
+from PySide6.QtGui import QGuiApplication, QIcon, QFont
 from PySide6.QtWidgets import QApplication
-from PySide6.QtWidgets import QDialog
+from PySide6.QtWidgets import QDialog, QMessageBox
 
-from .constants import APP_NAME, ORG_NAME, THEME_ICON_PX, DB_FILENAME
+from .backup import BackupScheduler
+from .constants import APP_NAME, ORG_NAME, THEME_ICON_PX, DB_FILENAME, STARTUP_LOG
 from .db import DB
-from .dialogs.startup_dialog import StartupDialog
+from .db_executor import DBExecutor, DBFuture, open_db
 from .main_window import MainWindow
-from .utils import app_data_dir, center_dialog, load_hidpi_icon, resource_path, theme_qss
+from .qt_utils import center_dialog, load_hidpi_icon
+from .theme import add_repolish_hook, apply_theme, normalize_theme
+from .utils import app_data_dir, resource_path
+
+timer.mark("imports")
+
+
+# ============================================================
+# Startup helpers
+# ============================================================
+
+class _FirstPaint(QObject):
+    # marks the first paint of the main window, then removes itself
+
+    def eventFilter(self, obj, event) -> bool:
+        if event.type() == QEvent.Paint:
+            timer.mark("first_paint")
+            obj.removeEventFilter(self)
+        return False
+
+
+def _wait(fut: DBFuture) -> DB:
+    # Blocks the startup flow (not the event loop) until the DB is open.
+    result: list = []
+    loop = QEventLoop()
+
+    def done(value) -> None:
+        result.append(value)
+        loop.quit()
+
+    fut.then(done, done)
+    if not result:
+        loop.exec()
+    if isinstance(result[0], Exception):
+        raise result[0]
+    return result[0]
+
+
+def _last_profile(settings: QSettings) -> int | None:
+    # Shift at launch: always show the profile dialog
+    if QGuiApplication.queryKeyboardModifiers() & Qt.ShiftModifier:
+        return None
+    if str(settings.value("open_last_profile", "false")).lower() != "true":
+        return None
+    pid = settings.value("last_profile_id")
+    try:
+        return int(pid) if pid is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _choose_profile(db: DB, executor: DBExecutor, icon: QIcon, settings: QSettings) -> int | None:
+    from .dialogs.startup_dialog import StartupDialog
+
+    sd = StartupDialog(db, executor, icon, settings)
+    center_dialog(sd)
+    if sd.exec() != QDialog.Accepted:
+        return None
+    return sd.selected_profile_id
 
 
 # ============================================================
@@ -28,12 +89,15 @@ def main() -> None:
     app.setOrganizationName(ORG_NAME)
     app.setApplicationName(APP_NAME)
 
+    # %APPDATA%/PromptExplorer — opened (and migrated) on a pool thread
+    # while the UI below is being set up
+    db_path = os.path.join(app_data_dir(), DB_FILENAME)
+    db_future = open_db(db_path)
+
     app.setFont(QFont("Segoe UI", 10))
 
     settings = QSettings(ORG_NAME, APP_NAME)
-    saved_theme = settings.value("ui_theme", "light")
-    if saved_theme not in ("light", "dark"):
-        saved_theme = "light"
+    saved_theme = normalize_theme(settings.value("ui_theme", "light"))
 
     app_icon = QIcon(resource_path("resources/app.ico"))
     app.setWindowIcon(app_icon)
@@ -41,25 +105,67 @@ def main() -> None:
     moon_icon = load_hidpi_icon("resources/moon.png", THEME_ICON_PX)
     sun_icon = load_hidpi_icon("resources/sun.png", THEME_ICON_PX)
 
-    app.setStyleSheet(theme_qss(saved_theme))
-
-    # %APPDATA%/PromptExplorer
-    db_path = os.path.join(app_data_dir(), DB_FILENAME)
-    db = DB(db_path)
-
-    sd = StartupDialog(db, app_icon, saved_theme)
-    center_dialog(sd)
-
-    if sd.exec() != QDialog.Accepted:
-        return
-
-    profile_id = sd.selected_profile_id
-    if profile_id is None:
-        return
-
-    # --- Main window ---
-    w = MainWindow(db, app_icon, moon_icon, sun_icon, profile_id, settings, saved_theme)
-    w.show()
-
-    # main Qt cycle
-    sys.exit(app.exec())
+    # the only stylesheet: windows and dialogs inherit it
+    apply_theme(saved_theme)
+    if timer.enabled:
+        add_repolish_hook(lambda theme, ms: print(f"theme {theme}: re-polish {ms:.1f} ms", file=sys.stderr))
+    timer.mark("qt_ready")
+
+    executor: DBExecutor | None = None
+    backups: BackupScheduler | None = None
+    w: MainWindow | None = None
+
+    try:
+        profile_id = _last_profile(settings)
+
+        # --- Fast path: the shell of the main window is painted before the DB is ready ---
+        if profile_id is not None:
+            w = MainWindow(None, None, app_icon, moon_icon, sun_icon, profile_id, settings, saved_theme)
+            w.installEventFilter(_FirstPaint(w))
+            w.show()
+
+        try:
+            db = _wait(db_future)
+        except Exception as e:
+            QMessageBox.critical(w, "Ошибка!", f"Не удалось открыть базу данных:\n{e}")
+            return
+        executor = DBExecutor(db)
+        timer.mark("db_ready")
+
+        if profile_id is not None and db.get_profile(profile_id) is None:
+            # the remembered profile was deleted: fall back to the dialog
+            # (not close(): closeEvent would ask whether to quit)
+            w.hide()
+            w.deleteLater()
+            w = None
+            profile_id = None
+
+        if profile_id is None:
+            profile_id = _choose_profile(db, executor, app_icon, settings)
+            if profile_id is None:
+                return
+            w = MainWindow(None, None, app_icon, moon_icon, sun_icon, profile_id, settings, saved_theme)
+            w.installEventFilter(_FirstPaint(w))
+            w.show()
+
+        # --- Main window ---
+        def on_interactive() -> None:
+            timer.mark("interactive")
+            timer.finish(os.path.join(app_data_dir(), STARTUP_LOG))
+
+        w.interactive.connect(on_interactive)
+        w.start(db, executor)
+
+        # only now: a restore from the profile dialog must not meet a running copy
+        backups = BackupScheduler(db)
+        backups.start()
+
+        # main Qt cycle
+        code = app.exec()
+    finally:
+        if backups is not None:
+            backups.stop()
+        if executor is not None:
+            executor.shutdown()
+
+    sys.exit(code)
@@ -0,0 +1,217 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+
+from .constants import BACKUP_INTERVAL_H, BACKUP_KEEP, BACKUP_MAX_AGE_DAYS
+from .db import DB, content_digest
+from .export import Progress
+from .models import BackupInfo
+
+
+# ============================================================
+# Backups: rotating snapshots of the database
+# ============================================================
+#
+# A snapshot is a consistent copy made with the SQLite backup API while
+# the app keeps working (DB.backup_to): BACKUP_PAGES pages per step, our
+# edits go in between. Snapshots are kept next to the database:
+#
+#   <db>.backups/<db name>-YYYYmmdd-HHMMSS.sqlite3
+#
+# Written as .part and renamed when complete, so a listed snapshot is
+# always whole. BackupScheduler makes one on a background thread once the
+# newest is BACKUP_INTERVAL_H old and the data changed since; older ones
+# go by count (BACKUP_KEEP) and age (BACKUP_MAX_AGE_DAYS), the newest is
+# always kept. "Changed" is DB.change_token() within a run; on the first
+# check of a run, the content digest of the newest snapshot (db.content_digest).
+
+BACKUP_SUFFIX = ".backups"
+STAMP_FORMAT = "%Y%m%d-%H%M%S"
+RECHECK_S = 60
+
+
+class BackupCancelled(Exception):
+    pass
+
+
+def backup_dir(db_path: str) -> str:
+    return db_path + BACKUP_SUFFIX
+
+
+def _stem(db_path: str) -> str:
+    return os.path.splitext(os.path.basename(db_path))[0]
+
+
+def list_backups(db_path: str) -> list[BackupInfo]:
+    # newest first
+    directory = backup_dir(db_path)
+    pattern = re.compile(re.escape(_stem(db_path)) + r"-(\d{8}-\d{6})(?:-\d+)?\.sqlite3")
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+
+    out: list[BackupInfo] = []
+    for name in names:
+        m = pattern.fullmatch(name)
+        if m is None:
+            continue
+        path = os.path.join(directory, name)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        created = int(time.mktime(time.strptime(m.group(1), STAMP_FORMAT)))
+        out.append(BackupInfo(path, created, size))
+    out.sort(key=lambda b: (b.created_at, b.path), reverse=True)
+    return out
+
+
+def create_backup(db: DB, progress: Progress | None = None) -> BackupInfo:
+    directory = backup_dir(db.path)
+    os.makedirs(directory, exist_ok=True)
+
+    now = int(time.time())
+    name = f"{_stem(db.path)}-{time.strftime(STAMP_FORMAT, time.localtime(now))}"
+    path = os.path.join(directory, f"{name}.sqlite3")
+    n = 1
+    while os.path.exists(path):
+        path = os.path.join(directory, f"{name}-{n}.sqlite3")
+        n += 1
+
+    def step(done: int, total: int) -> None:
+        if progress is not None and not progress(done, total):
+            raise BackupCancelled()
+
+    tmp = path + ".part"
+    try:
+        db.backup_to(tmp, step)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return BackupInfo(path, now, os.path.getsize(path))
+
+
+def prune_backups(db_path: str, keep: int = BACKUP_KEEP, max_age_days: int = BACKUP_MAX_AGE_DAYS) -> int:
+    # Returns the number of snapshots removed.
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for i, b in enumerate(list_backups(db_path)):
+        if i == 0 or (i < keep and b.created_at >= cutoff):
+            continue
+        try:
+            os.remove(b.path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def same_data(db: DB, path: str) -> bool:
+    # the snapshot holds what the database holds now
+    try:
+        src = sqlite3.connect(f"file:{quote(os.path.abspath(path))}?mode=ro", uri=True)
+        try:
+            return content_digest(src) == db.content_digest()
+        finally:
+            src.close()
+    except sqlite3.Error:
+        # unreadable, or made before a column the digest reads
+        return False
+
+
+def restore_backup(db: DB, path: str) -> BackupInfo:
+    # The current state is saved first, so a restore can be undone by
+    # restoring that snapshot. Returns it.
+    current = create_backup(db)
+    db.restore_from(path)
+    return current
+
+
+# ---------------------------
+# Scheduler
+# ---------------------------
+
+class BackupScheduler:
+
+    def __init__(
+        self,
+        db: DB,
+        interval_h: float = BACKUP_INTERVAL_H,
+        keep: int = BACKUP_KEEP,
+        max_age_days: int = BACKUP_MAX_AGE_DAYS,
+    ):
+        self.db = db
+        self.interval_s = interval_h * 3600
+        self.keep = keep
+        self.max_age_days = max_age_days
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # DB.change_token() when the last snapshot started
+        self._token: tuple[int, int, int] | None = None
+
+        self.last_backup: BackupInfo | None = None
+        self.last_error: Exception | None = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="backup", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        # cancels a snapshot in progress (its .part is removed)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_if_due(self) -> BackupInfo | None:
+        backups = list_backups(self.db.path)
+        if backups and time.time() - backups[0].created_at < self.interval_s:
+            return None
+        token = self.db.change_token()
+        if token == self._token:
+            return None
+        if self._token is None and backups and same_data(self.db, backups[0].path):
+            # first check of this run, nothing changed since an earlier run's snapshot
+            self._token = token
+            return None
+
+        info = create_backup(self.db, lambda _done, _total: not self._stop.is_set())
+        # taken before the copy: edits made during it are in the next one
+        self._token = token
+        self.last_backup = info
+        prune_backups(self.db.path, self.keep, self.max_age_days)
+        return info
+
+    def _run(self) -> None:
+        # leftovers of a copy cut short by a crash
+        directory = backup_dir(self.db.path)
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.endswith(".part"):
+                    try:
+                        os.remove(os.path.join(directory, name))
+                    except OSError:
+                        pass
+
+        while not self._stop.is_set():
+            try:
+                self.run_if_due()
+                self.last_error = None
+            except BackupCancelled:
+                return
+            except Exception as e:
+                # disk full, file locked...: tried again later
+                self.last_error = e
+
+            backups = list_backups(self.db.path)
+            wait = backups[0].created_at + self.interval_s - time.time() if backups else 0
+            self._stop.wait(max(wait, RECHECK_S))
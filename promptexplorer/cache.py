@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+# ============================================================
+# Bounded LRU cache
+# ============================================================
+#
+# Not thread-safe on its own: the owner (DB) only touches it under its lock.
+# hits / misses count get() calls; peek() and put() do not.
+
+class LRUCache(Generic[K, V]):
+
+    def __init__(self, capacity: int):
+        self.capacity = max(0, int(capacity))
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._items
+
+    def get(self, key: K) -> V | None:
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        if self.capacity == 0:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._items.pop(key, None)
+
+    def pop_where(self, pred: Callable[[K, V], bool]) -> int:
+        keys = [k for k, v in self._items.items() if pred(k, v)]
+        for k in keys:
+            del self._items[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._items), "capacity": self.capacity, "hits": self.hits, "misses": self.misses}
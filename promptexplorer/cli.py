@@ -0,0 +1,298 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from .constants import APP_NAME, DB_FILENAME
+from .db import DB
+from .models import PromptFilter
+from .utils import app_data_dir, format_ts
+
+
+# ============================================================
+# Headless CLI:  python -m promptexplorer cli <command> ...
+# ============================================================
+#
+# Never imports Qt (directly or through utils / db): batch jobs call this
+# many times and pay only for sqlite3 and the DB layer.
+
+class CliError(Exception):
+    pass
+
+
+def default_db_path() -> str:
+    return os.getenv("PROMPTEXPLORER_DB") or os.path.join(app_data_dir(), DB_FILENAME)
+
+
+def resolve_profile(db: DB, ref: str | None) -> int:
+    profiles = db.list_profiles()
+    if not profiles:
+        raise CliError("no profiles in the database")
+    if ref is None:
+        return profiles[0][0]
+
+    for pid, name, _ in profiles:
+        if ref == str(pid) or ref.casefold() == name.casefold():
+            return pid
+    raise CliError(f"profile not found: {ref}")
+
+
+def resolve_type(db: DB, profile_id: int, ref: str | None) -> int | None:
+    if ref is None:
+        return None
+    for tid, name in db.list_types(profile_id):
+        if ref == str(tid) or ref.casefold() == name.casefold():
+            return tid
+    raise CliError(f"type not found: {ref}")
+
+
+def _emit(rows: list[dict], as_json: bool) -> None:
+    out = sys.stdout
+    for row in rows:
+        if as_json:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            out.write("\t".join(str(v) for v in row.values()) + "\n")
+
+
+# ---------------------------
+# Commands
+# ---------------------------
+
+def cmd_list(db: DB, args: argparse.Namespace) -> int:
+    pid = resolve_profile(db, args.profile)
+    tid = resolve_type(db, pid, args.type)
+    flt = PromptFilter(models=tuple(args.model), loras=tuple(args.lora), date_from=args.since, date_to=args.until)
+    rows = db.list_prompt_summaries(pid, tid, limit=args.limit, flt=flt)
+    _emit(
+        [{"id": r.id, "type": r.type, "name": r.name, "updated_at": format_ts(r.updated_at)} for r in rows], args.json
+    )
+    return 0
+
+
+def cmd_search(db: DB, args: argparse.Namespace) -> int:
+    pid = resolve_profile(db, args.profile)
+    tid = resolve_type(db, pid, args.type)
+    hits = db.search_prompts(pid, " ".join(args.query), tid, limit=args.limit)
+    _emit([{"id": h.id, "type": h.type, "name": h.name, "snippet": h.snippet} for h in hits], args.json)
+    return 0
+
+
+def cmd_tags(db: DB, args: argparse.Namespace) -> int:
+    pid = resolve_profile(db, args.profile)
+    if not args.tags and not args.exclude:
+        _emit([{"tag": tag, "prompts": n} for tag, n in db.top_tags(pid, args.side, args.limit)], args.json)
+        return 0
+
+    tid = resolve_type(db, pid, args.type)
+    rows = db.find_by_tags(pid, args.tags, args.exclude, args.side, tid, limit=args.limit)
+    _emit(
+        [{"id": r.id, "type": r.type, "name": r.name, "updated_at": format_ts(r.updated_at)} for r in rows], args.json
+    )
+    return 0
+
+
+def cmd_dupes(db: DB, args: argparse.Namespace) -> int:
+    from .dedup import find_duplicates
+
+    pid = resolve_profile(db, args.profile)
+    groups = find_duplicates(db, pid, args.threshold)
+    names = {r.id: r.name for r in db.get_prompt_summaries([i for g in groups for i in g.ids])}
+    _emit([
+        {"group": n, "similarity": round(g.similarity, 3), "id": i, "name": names.get(i, "")}
+        for n, g in enumerate(groups, 1) for i in g.ids
+    ], args.json)
+    return 0
+
+
+def cmd_similar(db: DB, args: argparse.Namespace) -> int:
+    from .similar import similar_prompts
+
+    pid = resolve_profile(db, args.profile)
+    found = db.get_prompt_summaries([args.id])
+    if not found:
+        raise CliError(f"prompt not found: {args.id}")
+    # types belong to one profile: the type tells whose prompt it is
+    if found[0].type_id not in {tid for tid, _ in db.list_types(pid)}:
+        raise CliError(f"prompt {args.id} is not in profile {pid}, pick it with --profile")
+    hits = similar_prompts(db, pid, args.id, args.limit)
+    names = {r.id: r.name for r in db.get_prompt_summaries([i for i, _ in hits])}
+    _emit([{"id": i, "similarity": round(score, 3), "name": names.get(i, "")} for i, score in hits], args.json)
+    return 0
+
+
+def cmd_show(db: DB, args: argparse.Namespace) -> int:
+    from .export import prompt_fields, render_prompt_text
+
+    p = db.get_prompt(args.id)
+    if p is None:
+        raise CliError(f"prompt not found: {args.id}")
+    if args.json:
+        sys.stdout.write(json.dumps(prompt_fields(p), ensure_ascii=False) + "\n")
+    else:
+        sys.stdout.write(render_prompt_text(p))
+    return 0
+
+
+def cmd_export(db: DB, args: argparse.Namespace) -> int:
+    from .export import EXPORT_FORMATS, export_prompts
+
+    pid = resolve_profile(db, args.profile)
+    tid = resolve_type(db, pid, args.type)
+    fmt = args.format or {".jsonl": "jsonl", ".csv": "csv"}.get(os.path.splitext(args.path)[1].lower(), "txt")
+    if fmt not in EXPORT_FORMATS:
+        raise CliError(f"unknown format: {fmt}")
+
+    n = export_prompts(db, pid, tid, args.path, fmt)
+    print(f"exported {n} prompts to {args.path}", file=sys.stderr)
+    return 0
+
+
+def cmd_import(db: DB, args: argparse.Namespace) -> int:
+    if not os.path.isfile(args.source):
+        raise CliError(f"no such database: {args.source}")
+    src_profiles = DB.read_profiles_from_db(args.source)
+    if args.source_profile is not None:
+        ext_pid = int(args.source_profile)
+    elif len(src_profiles) == 1:
+        ext_pid = src_profiles[0][0]
+    else:
+        names = ", ".join(f"{pid}: {name}" for pid, name, _ in src_profiles)
+        raise CliError(f"the source has several profiles, pick one with --source-profile ({names})")
+
+    into = resolve_profile(db, args.into) if args.into is not None else None
+    res = db.import_profile_from_db(args.source, ext_pid, into)
+    print(f"profile {res.profile_id}: inserted {res.inserted}, skipped {res.skipped}", file=sys.stderr)
+    return 0
+
+
+def cmd_stats(db: DB, args: argparse.Namespace) -> int:
+    pid = resolve_profile(db, args.profile)
+    st = db.profile_stats(pid, args.period)
+    if args.json:
+        sys.stdout.write(json.dumps(st._asdict(), ensure_ascii=False) + "\n")
+        return 0
+
+    print(f"prompts\t{st.total}")
+    print(f"avg_positive\t{st.avg_positive:.1f}")
+    print(f"avg_negative\t{st.avg_negative:.1f}")
+    for title, rows in (("type", st.by_type), ("model", st.by_model), ("lora", st.by_lora), ("activity", st.activity)):
+        for row in rows:
+            print("\t".join([title, *map(str, row)]))
+    return 0
+
+
+def cmd_vacuum(db: DB, args: argparse.Namespace) -> int:
+    before = os.path.getsize(db.path)
+    db.vacuum()
+    print(f"{before} -> {os.path.getsize(db.path)} bytes", file=sys.stderr)
+    return 0
+
+
+def cmd_backup(db: DB, args: argparse.Namespace) -> int:
+    from .backup import create_backup, list_backups, prune_backups
+
+    if not args.list:
+        info = create_backup(db)
+        removed = prune_backups(db.path)
+        print(f"{info.path} ({info.size} bytes), removed {removed} old", file=sys.stderr)
+    for b in list_backups(db.path):
+        print(f"{format_ts(b.created_at)}\t{b.size}\t{b.path}")
+    return 0
+
+
+# ---------------------------
+# Entry point
+# ---------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m promptexplorer cli", description=f"{APP_NAME} without the GUI")
+    ap.add_argument("--db", default=None, help="database file (default: $PROMPTEXPLORER_DB or the app data dir)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    def command(name: str, fn, help_text: str, profile: bool = True, creates: bool = False) -> argparse.ArgumentParser:
+        # creates: may start a new database; the others refuse a missing --db
+        p = sub.add_parser(name, help=help_text)
+        p.set_defaults(fn=fn, creates=creates)
+        if profile:
+            p.add_argument("-p", "--profile", help="profile id or name (default: the first one)")
+        return p
+
+    p = command("list", cmd_list, "list prompts, newest first")
+    p.add_argument("-t", "--type", help="type id or name")
+    p.add_argument("-m", "--model", action="append", default=[], help="only this model (repeatable: any of them)")
+    p.add_argument("-l", "--lora", action="append", default=[], help="only with this LoRA (repeatable: any of them)")
+    p.add_argument("--since", help="updated on or after YYYY-MM-DD")
+    p.add_argument("--until", help="updated on or before YYYY-MM-DD")
+    p.add_argument("-n", "--limit", type=int, default=-1)
+    p.add_argument("--json", action="store_true", help="JSON lines instead of TSV")
+
+    p = command("search", cmd_search, "full-text search")
+    p.add_argument("query", nargs="+")
+    p.add_argument("-t", "--type", help="type id or name")
+    p.add_argument("-n", "--limit", type=int, default=50)
+    p.add_argument("--json", action="store_true", help="JSON lines instead of TSV")
+
+    p = command("tags", cmd_tags, "prompts with all of the tags and none of --not; no tags: most used tags")
+    p.add_argument("tags", nargs="*")
+    p.add_argument("-x", "--not", dest="exclude", action="append", default=[], help="exclude a tag (repeatable)")
+    p.add_argument("-s", "--side", choices=("positive", "negative", "any"), default="positive")
+    p.add_argument("-t", "--type", help="type id or name")
+    p.add_argument("-n", "--limit", type=int, default=50)
+    p.add_argument("--json", action="store_true", help="JSON lines instead of TSV")
+
+    p = command("dupes", cmd_dupes, "near-duplicate prompts (similar tag sets)")
+    p.add_argument("--threshold", type=float, default=0.8, help="minimal estimated Jaccard similarity")
+    p.add_argument("--json", action="store_true", help="JSON lines instead of TSV")
+
+    p = command("similar", cmd_similar, "prompts closest to the given one (TF-IDF over positive tags)")
+    p.add_argument("id", type=int)
+    p.add_argument("-n", "--limit", type=int, default=20)
+    p.add_argument("--json", action="store_true", help="JSON lines instead of TSV")
+
+    p = command("show", cmd_show, "print one prompt", profile=False)
+    p.add_argument("id", type=int)
+    p.add_argument("--json", action="store_true")
+
+    p = command("export", cmd_export, "export prompts to a file")
+    p.add_argument("path")
+    p.add_argument("-t", "--type", help="type id or name")
+    p.add_argument("-f", "--format", help="txt, jsonl, csv or styles (default: from the extension)")
+
+    p = command("import", cmd_import, "import a profile from another database file", profile=False, creates=True)
+    p.add_argument("source")
+    p.add_argument("--source-profile", help="profile id in the source file")
+    p.add_argument("--into", help="merge into this profile (id or name) instead of creating one")
+
+    p = command("stats", cmd_stats, "profile statistics")
+    p.add_argument("--period", choices=("day", "week", "month"), default="day")
+    p.add_argument("--json", action="store_true")
+
+    command("vacuum", cmd_vacuum, "compact the database file", profile=False)
+
+    p = command("backup", cmd_backup, "snapshot the database now, then list the snapshots", profile=False)
+    p.add_argument("--list", action="store_true", help="only list the snapshots")
+    return ap
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    path = args.db or default_db_path()
+    if not args.creates and not os.path.isfile(path):
+        print(f"error: no such database: {path}", file=sys.stderr)
+        return 1
+    db = None
+    try:
+        db = DB(path)
+        return args.fn(db, args)
+    except BrokenPipeError:
+        # output piped into head & co.: not an error
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (CliError, ValueError, OSError, sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if db is not None:
+            db.close()
@@ -3,9 +3,39 @@
 # ============================================================
 
 APP_NAME = "PromptExplorer"
+APP_VERSION = "0.9.0.0 beta"
 ORG_NAME = "PromptExplorer"
 
 THEME_ICON_PX = 44
 THEME_BTN_SIZE = 48
 
 DB_FILENAME = "promptexplorer.sqlite3"
+
+PAGE_SIZE = 200
+SEARCH_DEBOUNCE_MS = 250
+DB_READER_THREADS = 3
+
+# SQLite connection (see DB.__init__); other processes may use the file too
+DB_BUSY_TIMEOUT_MS = 5000
+DB_WRITE_RETRIES = 3
+DB_CACHE_KIB = 32 * 1024
+DB_MMAP_BYTES = 256 * 1024 * 1024
+# read-only connections: one per reader thread plus the GUI thread
+DB_READ_CONNECTIONS = DB_READER_THREADS + 1
+DB_STATEMENT_CACHE = 256
+EXTERNAL_POLL_MS = 1500
+
+# Snapshots (backup.py): <db>.backups/, one per interval while the data changes
+BACKUP_INTERVAL_H = 24
+BACKUP_KEEP = 10
+BACKUP_MAX_AGE_DAYS = 90
+BACKUP_PAGES = 1024  # copied per step; our writes get in between steps
+BACKUP_STEP_PAUSE_MS = 2
+
+PROMPT_CACHE_SIZE = 256
+PREFETCH_NEIGHBOURS = 3
+SIMILAR_LIMIT = 20
+EXPORT_BATCH = 500
+# Stats tab activity timeline: buckets shown per period
+ACTIVITY_BUCKETS = {"day": 30, "week": 26, "month": 12}
+STARTUP_LOG = "startup_times.jsonl"
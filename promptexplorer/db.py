@@ -1,84 +1,446 @@
+import hashlib
+import json
+import os
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+from urllib.parse import quote
 
-from .models import Prompt
-from .utils import now_iso
+from .cache import LRUCache
+from .constants import (
+    ACTIVITY_BUCKETS, BACKUP_PAGES, BACKUP_STEP_PAUSE_MS, DB_BUSY_TIMEOUT_MS, DB_CACHE_KIB, DB_MMAP_BYTES,
+    DB_READ_CONNECTIONS, DB_STATEMENT_CACHE, DB_WRITE_RETRIES, EXPORT_BATCH, PROMPT_CACHE_SIZE,
+)
+from .migrations import (
+    SCHEMA_VERSION, TAG_NEGATIVE, TAG_POSITIVE, TagRow, epoch_sql, insert_tag_rows, migrate, register_functions,
+    schema_version, tag_rows,
+)
+from .models import (
+    Change, ChangeKind, FacetCounts, ImportResult, ProfileStats, Prompt, PromptFilter, PromptSummary, SearchHit,
+)
+from .parsing import content_hash, normalize_tag, parse_loras
+from .utils import day_range, now_iso, now_ts, period_buckets
 
 
 # ============================================================
 # Database layer (SQLite)
 # ============================================================
 
+# WAL: readers (other processes too) do not block the writer and the
+# writer does not block them. synchronous=NORMAL is safe in WAL mode: an
+# application crash loses nothing, a power cut at most the last commits.
+WRITER_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+)
+
+# every connection, the writer and the pooled readers
+CONNECTION_PRAGMAS = (
+    f"PRAGMA cache_size=-{DB_CACHE_KIB};",
+    f"PRAGMA mmap_size={DB_MMAP_BYTES};",
+    "PRAGMA temp_store=MEMORY;",
+    f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS};",
+)
+
+
+def fts_query(text: str) -> str:
+    # Every word becomes a quoted FTS5 string (no operator injection),
+    # the last one is a prefix query so results follow the typing.
+    words = [w.replace('"', '""') for w in (text or "").split()]
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def content_digest(conn: sqlite3.Connection) -> str:
+    # Profiles, types and prompt contents (content_hash), ids included:
+    # equal digests mean a snapshot would hold the same data.
+    h = hashlib.blake2b(digest_size=16)
+    cur = conn.cursor()
+    cur.row_factory = None
+    for sql in (
+        "SELECT id, name, theme FROM profiles ORDER BY id;",
+        "SELECT id, profile_id, name FROM types ORDER BY id;",
+        "SELECT id, profile_id, type_id, content_hash FROM prompts ORDER BY id;",
+    ):
+        h.update(sql.encode())
+        for row in cur.execute(sql):
+            h.update(repr(row).encode())
+    return h.hexdigest()
+
+
+def _connect(target: str, uri: bool = False) -> sqlite3.Connection:
+    # Any thread may use the connection; the owner (DB or ConnectionPool)
+    # makes sure only one does at a time.
+    conn = sqlite3.connect(
+        target,
+        uri=uri,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,
+        cached_statements=DB_STATEMENT_CACHE,
+    )
+    conn.row_factory = sqlite3.Row
+    for sql in CONNECTION_PRAGMAS:
+        conn.execute(sql)
+    register_functions(conn)
+    return conn
+
+
+# ============================================================
+# Read-only connection pool
+# ============================================================
+#
+# Connections are opened with mode=ro on demand, up to `size`; a caller
+# beyond that waits for one to come back (the wait is measured: stats()).
+# A checked-out connection runs one read transaction, so every statement
+# inside a `with pool.connection()` block sees the same snapshot. Each
+# connection keeps its own prepared statements (cached_statements).
+
+class ConnectionPool:
+
+    def __init__(self, path: str, size: int = DB_READ_CONNECTIONS):
+        self.uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+        self.size = max(1, int(size))
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire()
+        try:
+            conn.execute("BEGIN;")
+            yield conn
+        finally:
+            conn.rollback()
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+        if conn is None:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = _connect(self.uri, uri=True)
+                except BaseException:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                t0 = time.perf_counter()
+                conn = self._idle.get()
+                waited = time.perf_counter() - t0
+                with self._lock:
+                    self.waits += 1
+                    self.wait_total += waited
+                    self.wait_max = max(self.wait_max, waited)
+        with self._lock:
+            self.checkouts += 1
+        return conn
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._opened,
+                "idle": self._idle.qsize(),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_ms_total": self.wait_total * 1000.0,
+                "wait_ms_max": self.wait_max * 1000.0,
+            }
+
+    def close(self) -> None:
+        # idle connections now, checked-out ones when they come back
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# ============================================================
+# DB
+# ============================================================
+
 class DB:
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, cache_size: int = PROMPT_CACHE_SIZE, readers: int = DB_READ_CONNECTIONS):
         self.path = path
-        self.conn = sqlite3.connect(self.path)
-        self.conn.row_factory = sqlite3.Row
-        self._init_schema()
-
-    def _col_exists(self, table: str, col: str) -> bool:
-        cur = self.conn.cursor()
-        cur.execute(f"PRAGMA table_info({table});")
-        return any(r["name"] == col for r in cur.fetchall())
-
-    def _init_schema(self) -> None:
-        cur = self.conn.cursor()
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS profiles(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                theme TEXT NOT NULL DEFAULT 'light',
-                created_at TEXT NOT NULL
-            );
-        """)
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS types(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                profile_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                FOREIGN KEY(profile_id) REFERENCES profiles(id)
-            );
-        """)
-
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS prompts(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                profile_id INTEGER NOT NULL,
-                type_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                description TEXT NOT NULL,
-                positive TEXT NOT NULL,
-                negative TEXT NOT NULL,
-                lora TEXT NOT NULL,
-                model TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY(profile_id) REFERENCES profiles(id),
-                FOREIGN KEY(type_id) REFERENCES types(id)
-            );
-        """)
-
-        self.conn.commit()
-
-        # ---- Migrations for older DB versions ----
-        if not self._col_exists("profiles", "theme"):
-            cur.execute("ALTER TABLE profiles ADD COLUMN theme TEXT NOT NULL DEFAULT 'light';")
-            self.conn.commit()
-
-        if not self._col_exists("types", "profile_id"):
-            cur.execute("ALTER TABLE types ADD COLUMN profile_id INTEGER NOT NULL DEFAULT 1;")
-            self.conn.commit()
+        # One writer connection, used by _write() under self._lock (and by
+        # _read() on the thread inside a _write()); other reads go to the
+        # pool of read-only connections and run in parallel (WAL).
+        self.conn = _connect(self.path)
+        for sql in WRITER_PRAGMAS:
+            self.conn.execute(sql)
+        migrate(self.conn)
+        self.conn.execute("PRAGMA foreign_keys=ON;")
+
+        self._lock = threading.RLock()
+        self._write_depth = 0
+        self._writer_thread: int | None = None
+        self.pool = ConnectionPool(self.path, readers)
+
+        self._listeners: list[Callable[[Change], None]] = []
+        self._changes: list[Change] = []
+
+        # prompt_id -> (profile_id, type_id, Prompt); see get_prompt().
+        # Readers fill it concurrently with writes: a fill is dropped when the
+        # generation moved while its rows were read (they may predate a commit).
+        self._prompt_cache: LRUCache[int, tuple[int, int, Prompt]] = LRUCache(cache_size)
+        self._cache_lock = threading.Lock()
+        self._cache_gen = 0
+
+        # (data_version, snapshot) as of the last poll_external_changes(); None until the first one
+        self._external: tuple[int, tuple] | None = None
+        self._restores = 0
+
+    def close(self) -> None:
+        self.pool.close()
+        with self._lock:
+            self.conn.close()
+
+    # ---------------------------
+    # Change notifications
+    # ---------------------------
+
+    def subscribe(self, listener: Callable[[Change], None]) -> None:
+        # Listeners run on the thread that committed the change (a DBExecutor
+        # worker in the GUI); Qt code must hop threads itself.
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Change], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, kind: ChangeKind, profile_id: int, ids: tuple[int, ...] | list[int] = ()) -> None:
+        # queued until the surrounding transaction commits, dropped on rollback
+        change = Change(kind, int(profile_id), tuple(int(i) for i in ids))
+        self._changes.append(change)
+        # The cache is invalidated right away: after a rollback that only costs a miss.
+        self._invalidate(change)
+
+    def _invalidate(self, change: Change) -> None:
+        cache = self._prompt_cache
+        kind, ids = change.kind, set(change.ids)
+
+        with self._cache_lock:
+            self._cache_gen += 1
+            if kind in (ChangeKind.PROMPTS_UPDATED, ChangeKind.PROMPTS_DELETED):
+                for i in ids:
+                    cache.pop(i)
+            elif kind in (ChangeKind.TYPE_RENAMED, ChangeKind.TYPE_DELETED):
+                # the type name is denormalized into Prompt.type
+                cache.pop_where(lambda _pid, e: e[1] in ids)
+            elif kind in (ChangeKind.PROFILE_DELETED, ChangeKind.PROMPTS_RELOADED):
+                cache.pop_where(lambda _pid, e: e[0] == change.profile_id)
+
+    def _flush_changes(self) -> None:
+        changes, self._changes = self._changes, []
+        # Once more after the commit: a reader that started between _notify()
+        # and the commit read the old rows and may have cached them.
+        for change in changes:
+            self._invalidate(change)
+        for change in changes:
+            for listener in list(self._listeners):
+                listener(change)
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        # inside a _write() on this thread: the writer, which sees its own uncommitted rows
+        if self._writer_thread == threading.get_ident():
+            yield self.conn
+            return
+        with self.pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # One transaction per outermost _write(); nested calls (upsert_prompt ->
+        # create_type_if_missing) join it instead of committing half-way.
+        with self._lock:
+            if self._write_depth == 0 and not self.conn.in_transaction:
+                self._begin_write()
+            self._write_depth += 1
+            self._writer_thread = threading.get_ident()
+            try:
+                yield self.conn
+            except BaseException:
+                self._write_depth -= 1
+                if self._write_depth == 0:
+                    self._writer_thread = None
+                    self.conn.rollback()
+                    self._changes.clear()
+                raise
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer_thread = None
+                try:
+                    self._rebase_external(self.conn)
+                    self.conn.commit()
+                except BaseException:
+                    self.conn.rollback()
+                    self._changes.clear()
+                    raise
+                self._flush_changes()
+
+    def _begin_write(self) -> None:
+        # BEGIN IMMEDIATE takes the write lock up front: reads inside the
+        # transaction see the rows the writes apply to, and a database busy
+        # with another process fails here, before anything is done.
+        # busy_timeout waits for the lock; the retries only cover the busy
+        # cases SQLite reports without waiting (e.g. another connection
+        # recovering the WAL), so a write never waits much longer than the timeout.
+        for attempt in range(DB_WRITE_RETRIES + 1):
+            t0 = time.monotonic()
+            try:
+                self.conn.execute("BEGIN IMMEDIATE;")
+                return
+            except sqlite3.OperationalError as e:
+                busy = getattr(e, "sqlite_errorcode", 0) & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+                waited = (time.monotonic() - t0) * 1000 >= DB_BUSY_TIMEOUT_MS / 2
+                if not busy or waited or attempt == DB_WRITE_RETRIES:
+                    raise
+            time.sleep(0.1 * (attempt + 1))
+
+    # ---------------------------
+    # Changes made by other processes
+    # ---------------------------
+    # PRAGMA data_version changes when another connection commits to the
+    # file, so polling it costs next to nothing. When it moved, a small
+    # snapshot — profiles, types with their prompt counts (stats_type), the
+    # newest updated_at per profile (and the prompts stamped with it), the
+    # highest prompt id — is compared with the previous one and the
+    # difference is sent to the listeners as ordinary Change notifications:
+    #   ids above the old highest one      -> PROMPTS_INSERTED
+    #   updated_at at or after the old max -> PROMPTS_UPDATED (timestamps are
+    #                                         seconds: prompts already at the
+    #                                         old max are not reported again)
+    #   fewer prompts than that explains   -> PROMPTS_RELOADED (deleted ones have no trace)
+    # Our own commits re-take the snapshot (_rebase_external) so they are
+    # not reported twice. Notifications are idempotent for the views anyway.
+
+    def _external_snapshot(self, conn: sqlite3.Connection) -> tuple:
+        profiles = {r[0]: r[1] for r in conn.execute("SELECT id, name FROM profiles;")}
+        types = {r[0]: (r[1], r[2], r[3]) for r in conn.execute("""
+            SELECT t.id, t.profile_id, t.name, COALESCE(s.prompts, 0)
+            FROM types t LEFT JOIN stats_type s ON s.type_id = t.id;
+        """)}
+        newest: dict[int, tuple[int, set[int]]] = {}
+        for pid in profiles:
+            ts = conn.execute("SELECT MAX(updated_at) FROM prompts WHERE profile_id=?;", (pid,)).fetchone()[0] or 0
+            ids = {r[0] for r in conn.execute(
+                "SELECT id FROM prompts WHERE profile_id=? AND updated_at=?;", (pid, ts)
+            )}
+            newest[pid] = (ts, ids)
+        max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM prompts;").fetchone()[0]
+        return profiles, types, newest, max_id
+
+    def _external_changes(self, conn: sqlite3.Connection, old: tuple, new: tuple) -> list[Change]:
+        old_profiles, old_types, old_newest, old_max_id = old
+        profiles, types, _, _ = new
+        out: list[Change] = []
+
+        for pid in profiles.keys() - old_profiles.keys():
+            out.append(Change(ChangeKind.PROFILE_CREATED, pid, (pid,)))
+        for pid in old_profiles.keys() - profiles.keys():
+            out.append(Change(ChangeKind.PROFILE_DELETED, pid, (pid,)))
+
+        inserted: dict[int, list[int]] = {}
+        for r in conn.execute("SELECT id, profile_id FROM prompts WHERE id > ?;", (old_max_id,)):
+            inserted.setdefault(r[1], []).append(r[0])
+
+        for pid in profiles.keys() & old_profiles.keys():
+            created = [t for t, v in types.items() if v[0] == pid and t not in old_types]
+            renamed = [t for t, v in types.items() if v[0] == pid and t in old_types and old_types[t][1] != v[1]]
+            deleted = [t for t, v in old_types.items() if v[0] == pid and t not in types]
+            if created:
+                out.append(Change(ChangeKind.TYPE_CREATED, pid, tuple(created)))
+            if renamed:
+                out.append(Change(ChangeKind.TYPE_RENAMED, pid, tuple(renamed)))
+            if deleted:
+                out.append(Change(ChangeKind.TYPE_DELETED, pid, tuple(deleted)))
+
+            new_ids = inserted.get(pid, [])
+            expected = (
+                sum(v[2] for v in old_types.values() if v[0] == pid)
+                - sum(old_types[t][2] for t in deleted)
+                + len(new_ids)
+            )
+            if sum(v[2] for v in types.values() if v[0] == pid) != expected:
+                out.append(Change(ChangeKind.PROMPTS_RELOADED, pid))
+                continue
+            ts, seen = old_newest[pid]
+            # the ones seen at ts last time only count if they moved past it
+            updated = tuple(r[0] for r in conn.execute(
+                "SELECT id, updated_at FROM prompts WHERE profile_id=? AND updated_at >= ? AND id <= ?;",
+                (pid, ts, old_max_id),
+            ) if r[1] > ts or r[0] not in seen)
+            if new_ids:
+                out.append(Change(ChangeKind.PROMPTS_INSERTED, pid, tuple(new_ids)))
+            if updated:
+                out.append(Change(ChangeKind.PROMPTS_UPDATED, pid, updated))
+        return out
+
+    def _rebase_external(self, conn: sqlite3.Connection) -> None:
+        # inside our write transaction: nobody else can commit until it ends.
+        # If another process committed since the last poll, the snapshot is
+        # kept: the next poll reports its changes (and ours, harmlessly).
+        if self._external is None:
+            return
+        version = int(conn.execute("PRAGMA data_version;").fetchone()[0])
+        if version == self._external[0]:
+            self._external = (version, self._external_snapshot(conn))
+
+    def poll_external_changes(self) -> int:
+        # Returns the number of notifications sent; the first call only
+        # takes the snapshot.
+        with self._lock:
+            conn = self.conn
+            version = int(conn.execute("PRAGMA data_version;").fetchone()[0])
+            if self._external is not None and version == self._external[0]:
+                return 0
+            # one read transaction: the snapshot and the diff queries see the same state
+            conn.execute("BEGIN;")
+            try:
+                snapshot = self._external_snapshot(conn)
+                changes = self._external_changes(conn, self._external[1], snapshot) if self._external else []
+            finally:
+                conn.commit()
+            self._external = (version, snapshot)
+            for change in changes:
+                self._notify(change.kind, change.profile_id, change.ids)
+            self._flush_changes()
+        return len(changes)
 
     # ---------------------------
     # Profiles
     # ---------------------------
 
     def list_profiles(self) -> list[tuple[int, str, str]]:
-        cur = self.conn.cursor()
-        cur.execute("SELECT id, name, theme FROM profiles ORDER BY id ASC;")
-        rows = cur.fetchall()
+        with self._read() as conn:
+            rows = conn.execute("SELECT id, name, theme FROM profiles ORDER BY id ASC;").fetchall()
         out: list[tuple[int, str, str]] = []
         for r in rows:
             theme = r["theme"] if "theme" in r.keys() else "light"
@@ -86,42 +448,39 @@ class DB:
         return out
 
     def create_profile(self, name: str, theme: str = "light") -> int:
-        cur = self.conn.cursor()
-        cur.execute(
-            "INSERT INTO profiles(name, theme, created_at) VALUES(?, ?, ?);",
-            (name, theme, now_iso()),
-        )
-        self.conn.commit()
+        with self._write() as conn:
+            cur = conn.execute(
+                "INSERT INTO profiles(name, theme, created_at) VALUES(?, ?, ?);",
+                (name, theme, now_iso()),
+            )
+            self._notify(ChangeKind.PROFILE_CREATED, cur.lastrowid, (cur.lastrowid,))
         return int(cur.lastrowid)
 
     def delete_profile(self, profile_id: int) -> None:
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM prompts WHERE profile_id=?;", (profile_id,))
-        cur.execute("DELETE FROM types WHERE profile_id=?;", (profile_id,))
-        cur.execute("DELETE FROM profiles WHERE id=?;", (profile_id,))
-        self.conn.commit()
+        # types and prompts go with it via ON DELETE CASCADE
+        with self._write() as conn:
+            conn.execute("DELETE FROM profiles WHERE id=?;", (profile_id,))
+            self._notify(ChangeKind.PROFILE_DELETED, profile_id, (profile_id,))
 
     def get_profile(self, profile_id: int):
-        cur = self.conn.cursor()
-        cur.execute("SELECT * FROM profiles WHERE id=?;", (profile_id,))
-        return cur.fetchone()
+        with self._read() as conn:
+            return conn.execute("SELECT * FROM profiles WHERE id=?;", (profile_id,)).fetchone()
 
     # ---------------------------
     # Types / Categories
     # ---------------------------
 
     def list_types(self, profile_id: int) -> list[tuple[int, str]]:
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT id, name FROM types WHERE profile_id=? ORDER BY name COLLATE NOCASE;",
-            (profile_id,),
-        )
-        return [(int(r["id"]), str(r["name"])) for r in cur.fetchall()]
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT id, name FROM types WHERE profile_id=? ORDER BY name COLLATE NOCASE;",
+                (profile_id,),
+            ).fetchall()
+        return [(int(r["id"]), str(r["name"])) for r in rows]
 
     def get_type_name(self, profile_id: int, type_id: int) -> str:
-        cur = self.conn.cursor()
-        cur.execute("SELECT name FROM types WHERE id=? AND profile_id=?;", (type_id, profile_id))
-        r = cur.fetchone()
+        with self._read() as conn:
+            r = conn.execute("SELECT name FROM types WHERE id=? AND profile_id=?;", (type_id, profile_id)).fetchone()
         return str(r["name"]) if r else ""
 
     def create_type_if_missing(self, profile_id: int, name: str) -> int:
@@ -129,14 +488,13 @@ class DB:
         if not name:
             raise ValueError("Empty type name")
 
-        cur = self.conn.cursor()
-        cur.execute("SELECT id FROM types WHERE profile_id=? AND name=?;", (profile_id, name))
-        row = cur.fetchone()
-        if row:
-            return int(row["id"])
+        with self._write() as conn:
+            row = conn.execute("SELECT id FROM types WHERE profile_id=? AND name=?;", (profile_id, name)).fetchone()
+            if row:
+                return int(row["id"])
 
-        cur.execute("INSERT INTO types(profile_id, name) VALUES(?, ?);", (profile_id, name))
-        self.conn.commit()
+            cur = conn.execute("INSERT INTO types(profile_id, name) VALUES(?, ?);", (profile_id, name))
+            self._notify(ChangeKind.TYPE_CREATED, profile_id, (cur.lastrowid,))
         return int(cur.lastrowid)
 
     def rename_type(self, profile_id: int, type_id: int, new_name: str) -> None:
@@ -144,29 +502,35 @@ class DB:
         if not new_name:
             raise ValueError("Empty type name")
 
-        cur = self.conn.cursor()
-
-        cur.execute("SELECT id FROM types WHERE profile_id=? AND name=?;", (profile_id, new_name))
-        exists = cur.fetchone()
-        if exists and int(exists["id"]) != type_id:
-            raise ValueError("Type already exists")
+        with self._write() as conn:
+            exists = conn.execute(
+                "SELECT id FROM types WHERE profile_id=? AND name=?;", (profile_id, new_name)
+            ).fetchone()
+            if exists and int(exists["id"]) != type_id:
+                raise ValueError("Type already exists")
 
-        cur.execute("UPDATE types SET name=? WHERE id=? AND profile_id=?;", (new_name, type_id, profile_id))
-        self.conn.commit()
+            conn.execute("UPDATE types SET name=? WHERE id=? AND profile_id=?;", (new_name, type_id, profile_id))
+            self._notify(ChangeKind.TYPE_RENAMED, profile_id, (type_id,))
 
     def type_prompt_count(self, profile_id: int, type_id: int) -> int:
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT COUNT(*) AS c FROM prompts WHERE profile_id=? AND type_id=?;",
-            (profile_id, type_id),
-        )
-        return int(cur.fetchone()["c"])
+        with self._read() as conn:
+            r = conn.execute(
+                "SELECT prompts FROM stats_type WHERE profile_id=? AND type_id=?;",
+                (profile_id, type_id),
+            ).fetchone()
+        return int(r["prompts"]) if r else 0
+
+    def type_counts(self, profile_id: int) -> dict[int, int]:
+        # maintained counters (stats_type): types without prompts have no row
+        with self._read() as conn:
+            rows = conn.execute("SELECT type_id, prompts FROM stats_type WHERE profile_id=?;", (profile_id,)).fetchall()
+        return {int(r["type_id"]): int(r["prompts"]) for r in rows}
 
     def delete_type_and_prompts(self, profile_id: int, type_id: int) -> None:
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM prompts WHERE profile_id=? AND type_id=?;", (profile_id, type_id))
-        cur.execute("DELETE FROM types WHERE id=? AND profile_id=?;", (type_id, profile_id))
-        self.conn.commit()
+        # prompts of the type go with it via ON DELETE CASCADE
+        with self._write() as conn:
+            conn.execute("DELETE FROM types WHERE id=? AND profile_id=?;", (type_id, profile_id))
+            self._notify(ChangeKind.TYPE_DELETED, profile_id, (type_id,))
 
     # ---------------------------
     # Prompts
@@ -174,41 +538,163 @@ class DB:
 
     def list_prompts(self, profile_id: int, type_id: int | None) -> list[Prompt]:
 
-        cur = self.conn.cursor()
-
-        if type_id is None:
-            cur.execute("""
-                SELECT p.id, t.name AS type, p.name, p.description, p.positive, p.negative, p.lora, p.model,
-                       p.created_at, p.updated_at
-                FROM prompts p
-                JOIN types t ON t.id = p.type_id
-                WHERE p.profile_id=?
-                ORDER BY p.updated_at DESC;
-            """, (profile_id,))
-        else:
-            cur.execute("""
-                SELECT p.id, t.name AS type, p.name, p.description, p.positive, p.negative, p.lora, p.model,
-                       p.created_at, p.updated_at
-                FROM prompts p
-                JOIN types t ON t.id = p.type_id
-                WHERE p.profile_id=? AND p.type_id=?
-                ORDER BY p.updated_at DESC;
-            """, (profile_id, type_id))
+        sql = """
+            SELECT p.id, t.name AS type, p.name, p.description, p.positive, p.negative, p.lora, p.model,
+                   p.created_at, p.updated_at
+            FROM prompts p
+            JOIN types t ON t.id = p.type_id
+            WHERE p.profile_id=?
+        """
+        params: list = [profile_id]
+        if type_id is not None:
+            sql += " AND p.type_id=?"
+            params.append(type_id)
+        sql += " ORDER BY p.updated_at DESC;"
 
-        rows = cur.fetchall()
-        return [Prompt(**dict(r)) for r in rows]
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(sql, params)
+            return [Prompt(*r) for r in cur.fetchall()]
 
-    def get_prompt(self, prompt_id: int) -> Prompt | None:
-        cur = self.conn.cursor()
-        cur.execute("""
+    def iter_prompts(self, profile_id: int, type_id: int | None, batch: int = EXPORT_BATCH) -> Iterator[Prompt]:
+        # Same order as list_prompts, but read in keyset batches: memory stays
+        # flat and the pooled connection goes back between batches, so a slow
+        # consumer does not hold it (or old WAL frames) for the whole run.
+        sql = """
             SELECT p.id, t.name AS type, p.name, p.description, p.positive, p.negative, p.lora, p.model,
                    p.created_at, p.updated_at
             FROM prompts p
             JOIN types t ON t.id = p.type_id
-            WHERE p.id=?;
-        """, (prompt_id,))
-        r = cur.fetchone()
-        return Prompt(**dict(r)) if r else None
+            WHERE p.profile_id=?
+        """
+        params: list = [profile_id]
+        if type_id is not None:
+            sql += " AND p.type_id=?"
+            params.append(type_id)
+
+        after: tuple[int, int] | None = None
+        while True:
+            page_sql, page_params = sql, list(params)
+            if after is not None:
+                page_sql += " AND (p.updated_at, p.id) < (?, ?)"
+                page_params += [after[0], after[1]]
+            page_sql += " ORDER BY p.updated_at DESC, p.id DESC LIMIT ?;"
+            page_params.append(batch)
+
+            with self._read() as conn:
+                cur = conn.cursor()
+                cur.row_factory = None
+                cur.execute(page_sql, page_params)
+                rows = cur.fetchmany(batch)
+
+            for r in rows:
+                yield Prompt(*r)
+            if len(rows) < batch:
+                return
+            after = (rows[-1][9], rows[-1][0])
+
+    def list_prompt_summaries(
+        self,
+        profile_id: int,
+        type_id: int | None,
+        after: tuple[int, int] | None = None,
+        limit: int = -1,
+        flt: PromptFilter | None = None,
+    ) -> list[PromptSummary]:
+
+        # Keyset pagination on (updated_at, id): every page is an index range scan
+        # that starts right after the last row of the previous page (limit -1 = all).
+        sql = """
+            SELECT p.id, p.type_id, t.name, p.name, p.updated_at
+            FROM prompts p
+            JOIN types t ON t.id = p.type_id
+            WHERE p.profile_id=?
+        """
+        params: list = [profile_id]
+        if type_id is not None:
+            sql += " AND p.type_id=?"
+            params.append(type_id)
+        terms, term_params = self._filter_sql(profile_id, flt)
+        sql += terms
+        params += term_params
+        if after is not None:
+            sql += " AND (p.updated_at, p.id) < (?, ?)"
+            params += [after[0], after[1]]
+        sql += " ORDER BY p.updated_at DESC, p.id DESC LIMIT ?;"
+        params.append(limit)
+
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(sql, params)
+            return list(map(PromptSummary._make, cur.fetchall()))
+
+    def get_prompt_summaries(self, prompt_ids: list[int]) -> list[PromptSummary]:
+        if not prompt_ids:
+            return []
+        marks = ", ".join("?" * len(prompt_ids))
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(f"""
+                SELECT p.id, p.type_id, t.name, p.name, p.updated_at
+                FROM prompts p
+                JOIN types t ON t.id = p.type_id
+                WHERE p.id IN ({marks});
+            """, list(prompt_ids))
+            return list(map(PromptSummary._make, cur.fetchall()))
+
+    _PROMPT_SQL = """
+        SELECT p.profile_id, p.type_id,
+               p.id, t.name AS type, p.name, p.description, p.positive, p.negative, p.lora, p.model,
+               p.created_at, p.updated_at
+        FROM prompts p
+        JOIN types t ON t.id = p.type_id
+    """
+
+    def _cache_rows(self, rows, gen: int) -> list[Prompt]:
+        out = [Prompt(*tuple(r)[2:]) for r in rows]
+        # Not cached: rows a write invalidated after the read began, and rows
+        # read inside a write (uncommitted, it may still roll back).
+        if self._writer_thread == threading.get_ident():
+            return out
+        with self._cache_lock:
+            if gen == self._cache_gen:
+                for r, p in zip(rows, out):
+                    self._prompt_cache.put(p.id, (int(r["profile_id"]), int(r["type_id"]), p))
+        return out
+
+    def get_prompt(self, prompt_id: int) -> Prompt | None:
+        # Read-through; see _cache_rows() for how a stale row is kept out.
+        with self._cache_lock:
+            entry = self._prompt_cache.get(int(prompt_id))
+            gen = self._cache_gen
+        if entry is not None:
+            return entry[2]
+        with self._read() as conn:
+            rows = conn.execute(self._PROMPT_SQL + " WHERE p.id=?;", (prompt_id,)).fetchall()
+        found = self._cache_rows(rows, gen)
+        return found[0] if found else None
+
+    def prefetch_prompts(self, prompt_ids: list[int]) -> int:
+        # warms the cache for rows the user is likely to select next; does not count as misses
+        with self._cache_lock:
+            missing = [int(i) for i in prompt_ids if int(i) not in self._prompt_cache]
+            gen = self._cache_gen
+        if not missing:
+            return 0
+        marks = ",".join("?" * len(missing))
+        with self._read() as conn:
+            rows = conn.execute(self._PROMPT_SQL + f" WHERE p.id IN ({marks});", missing).fetchall()
+        return len(self._cache_rows(rows, gen))
+
+    def prompt_cache_stats(self) -> dict[str, int]:
+        with self._cache_lock:
+            return self._prompt_cache.stats()
+
+    def pool_stats(self) -> dict[str, float]:
+        return self.pool.stats()
 
     def upsert_prompt(
         self,
@@ -223,41 +709,555 @@ class DB:
         model: str,
     ) -> int:
 
-        type_id = self.create_type_if_missing(profile_id, type_name)
-        cur = self.conn.cursor()
+        h = content_hash(name, description, positive, negative, lora, model)
+
+        with self._write() as conn:
+            type_id = self.create_type_if_missing(profile_id, type_name)
+
+            if prompt_id is None:
+                cur = conn.execute("""
+                    INSERT INTO prompts(profile_id, type_id, name, description, positive, negative, lora, model,
+                                        created_at, updated_at, content_hash)
+                    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+                """, (
+                    profile_id, type_id, name, description, positive, negative, lora, model,
+                    now_ts(), now_ts(), h,
+                ))
+                self._set_prompt_loras(conn, profile_id, [(cur.lastrowid, lora)])
+                self._set_prompt_tags(conn, cur.lastrowid, profile_id, positive, negative)
+                self._notify(ChangeKind.PROMPTS_INSERTED, profile_id, (cur.lastrowid,))
+                return int(cur.lastrowid)
 
-        if prompt_id is None:
-            cur.execute("""
-                INSERT INTO prompts(profile_id, type_id, name, description, positive, negative, lora, model, created_at, updated_at)
-                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+            cur = conn.execute("""
+                UPDATE prompts
+                SET type_id=?, name=?, description=?, positive=?, negative=?, lora=?, model=?, updated_at=?,
+                    content_hash=?
+                WHERE id=? AND profile_id=?;
             """, (
-                profile_id, type_id, name, description, positive, negative, lora, model,
-                now_iso(), now_iso(),
+                type_id, name, description, positive, negative, lora, model,
+                now_ts(), h,
+                prompt_id, profile_id,
             ))
-            self.conn.commit()
-            return int(cur.lastrowid)
-
-        cur.execute("""
-            UPDATE prompts
-            SET type_id=?, name=?, description=?, positive=?, negative=?, lora=?, model=?, updated_at=?
-            WHERE id=? AND profile_id=?;
-        """, (
-            type_id, name, description, positive, negative, lora, model,
-            now_iso(),
-            prompt_id, profile_id,
-        ))
-        self.conn.commit()
+            # deleted meanwhile or another profile's: the rollback also drops the type created above
+            if cur.rowcount == 0:
+                raise ValueError("Prompt not found")
+            self._set_prompt_loras(conn, profile_id, [(prompt_id, lora)])
+            self._set_prompt_tags(conn, prompt_id, profile_id, positive, negative)
+            self._notify(ChangeKind.PROMPTS_UPDATED, profile_id, (prompt_id,))
         return int(prompt_id)
 
+    def _set_prompt_loras(self, conn: sqlite3.Connection, profile_id: int, loras: list[tuple[int, str]]) -> None:
+        # prompt_loras is derived from the free-text LoRA field; its triggers keep stats_lora.
+        # loras: (prompt_id, LoRA field) of the prompts to re-derive
+        conn.executemany("DELETE FROM prompt_loras WHERE prompt_id=?;", [(pid,) for pid, _ in loras])
+        conn.executemany(
+            "INSERT OR IGNORE INTO prompt_loras(prompt_id, profile_id, lora) VALUES(?, ?, ?);",
+            [(pid, profile_id, name) for pid, lora in loras for name in parse_loras(lora)],
+        )
+
+    def _set_prompt_tags(
+        self, conn: sqlite3.Connection, prompt_id: int, profile_id: int, positive: str, negative: str
+    ) -> None:
+        # only the difference is written: an edit touches a few index rows
+        old = {(int(r["side"]), str(r["tag"])): int(r["tag_id"]) for r in conn.execute("""
+            SELECT pt.side, pt.tag_id, t.tag FROM prompt_tags pt JOIN tags t ON t.id = pt.tag_id
+            WHERE pt.prompt_id=?;
+        """, (prompt_id,))}
+        new = {(r[2], r[3]): r for r in tag_rows(prompt_id, profile_id, positive, negative)}
+        conn.executemany(
+            "DELETE FROM prompt_tags WHERE prompt_id=? AND side=? AND tag_id=?;",
+            [(prompt_id, side, tag_id) for (side, tag), tag_id in old.items() if (side, tag) not in new],
+        )
+        insert_tag_rows(conn, [r for key, r in new.items() if key not in old])
+
     def delete_prompt(self, profile_id: int, prompt_id: int) -> None:
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM prompts WHERE id=? AND profile_id=?;", (prompt_id, profile_id))
-        self.conn.commit()
+        with self._write() as conn:
+            cur = conn.execute("DELETE FROM prompts WHERE id=? AND profile_id=?;", (prompt_id, profile_id))
+            if cur.rowcount:
+                self._notify(ChangeKind.PROMPTS_DELETED, profile_id, (prompt_id,))
+
+    # ---------------------------
+    # Bulk edits (multi-selection)
+    # ---------------------------
+    # Each is one transaction and one notification, however many prompts it
+    # touches; prompts already in the target state are skipped (and not
+    # reported as changed). Return the number of prompts changed.
+
+    def _owned_rows(self, conn: sqlite3.Connection, profile_id: int, prompt_ids: list[int], cols: str) -> list:
+        # the given prompts of this profile; the ids go in as one JSON array,
+        # so a selection of any size stays a single statement
+        return conn.execute(
+            f"SELECT {cols} FROM prompts WHERE profile_id=? AND id IN (SELECT value FROM json_each(?));",
+            (profile_id, json.dumps([int(i) for i in prompt_ids])),
+        ).fetchall()
+
+    _HASHED_COLS = ("name", "description", "positive", "negative", "lora", "model")
+
+    @classmethod
+    def _rehash(cls, row, **new: str) -> str:
+        # content_hash of a prompts row with some of its fields replaced
+        return content_hash(*(new.get(c, row[c]) for c in cls._HASHED_COLS))
+
+    def delete_prompts(self, profile_id: int, prompt_ids: list[int]) -> int:
+        with self._write() as conn:
+            deleted = [r["id"] for r in self._owned_rows(conn, profile_id, prompt_ids, "id")]
+            conn.executemany("DELETE FROM prompts WHERE id=?;", [(pid,) for pid in deleted])
+            if deleted:
+                self._notify(ChangeKind.PROMPTS_DELETED, profile_id, deleted)
+        return len(deleted)
+
+    def move_prompts(self, profile_id: int, prompt_ids: list[int], type_name: str) -> int:
+        with self._write() as conn:
+            type_id = self.create_type_if_missing(profile_id, type_name)
+            moved = [r["id"] for r in self._owned_rows(conn, profile_id, prompt_ids, "id, type_id")
+                     if r["type_id"] != type_id]
+            ts = now_ts()
+            conn.executemany(
+                "UPDATE prompts SET type_id=?, updated_at=? WHERE id=?;", [(type_id, ts, pid) for pid in moved]
+            )
+            if moved:
+                self._notify(ChangeKind.PROMPTS_UPDATED, profile_id, moved)
+        return len(moved)
+
+    def set_prompts_model(self, profile_id: int, prompt_ids: list[int], model: str) -> int:
+        with self._write() as conn:
+            cols = "id, " + ", ".join(self._HASHED_COLS)
+            rows = [r for r in self._owned_rows(conn, profile_id, prompt_ids, cols) if r["model"] != model]
+            ts = now_ts()
+            conn.executemany(
+                "UPDATE prompts SET model=?, content_hash=?, updated_at=? WHERE id=?;",
+                [(model, self._rehash(r, model=model), ts, r["id"]) for r in rows],
+            )
+            if rows:
+                self._notify(ChangeKind.PROMPTS_UPDATED, profile_id, [r["id"] for r in rows])
+        return len(rows)
+
+    def replace_in_prompts_lora(self, profile_id: int, prompt_ids: list[int], find: str, replace: str) -> int:
+        # plain, case-sensitive text replacement in the LoRA field
+        if not find:
+            raise ValueError("Nothing to find")
+        with self._write() as conn:
+            cols = "id, " + ", ".join(self._HASHED_COLS)
+            changed = [
+                (r, r["lora"].replace(find, replace))
+                for r in self._owned_rows(conn, profile_id, prompt_ids, cols)
+                if find in r["lora"]
+            ]
+            ts = now_ts()
+            conn.executemany(
+                "UPDATE prompts SET lora=?, content_hash=?, updated_at=? WHERE id=?;",
+                [(lora, self._rehash(r, lora=lora), ts, r["id"]) for r, lora in changed],
+            )
+            self._set_prompt_loras(conn, profile_id, [(r["id"], lora) for r, lora in changed])
+            if changed:
+                self._notify(ChangeKind.PROMPTS_UPDATED, profile_id, [r["id"] for r, _ in changed])
+        return len(changed)
+
+    def search_prompts(
+        self,
+        profile_id: int,
+        query: str,
+        type_id: int | None = None,
+        limit: int = 50,
+        offset: int = 0,
+        flt: PromptFilter | None = None,
+    ) -> list[SearchHit]:
+
+        match = fts_query(query)
+        if not match:
+            return []
+
+        # bm25 column weights: name, description, positive, negative, lora, model
+        sql = """
+            SELECT p.id, p.type_id, t.name AS type, p.name,
+                   snippet(prompts_fts, -1, '«', '»', '…', 12) AS snippet,
+                   bm25(prompts_fts, 10.0, 4.0, 1.0, 0.5, 3.0, 3.0) AS rank
+            FROM prompts_fts
+            JOIN prompts p ON p.id = prompts_fts.rowid
+            JOIN types t ON t.id = p.type_id
+            WHERE prompts_fts MATCH ? AND p.profile_id=?
+        """
+        params: list = [match, profile_id]
+        if type_id is not None:
+            sql += " AND p.type_id=?"
+            params.append(type_id)
+        terms, term_params = self._filter_sql(profile_id, flt)
+        sql += terms
+        params += term_params
+        sql += " ORDER BY rank LIMIT ? OFFSET ?;"
+        params += [limit, offset]
+
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(sql, params)
+            return list(map(SearchHit._make, cur.fetchall()))
+
+    # ---------------------------
+    # Facets (PromptFilter)
+    # ---------------------------
+    def _filter_sql(self, profile_id: int, flt: PromptFilter | None, skip: str = "") -> tuple[str, list]:
+        # " AND ..." terms on prompts p; skip = "type" / "model" / "lora"
+        # leaves that facet out, for its own counts
+        if flt is None:
+            return "", []
+        terms: list[str] = []
+        params: list = []
+        if flt.type_ids and skip != "type":
+            terms.append(f"p.type_id IN ({', '.join('?' * len(flt.type_ids))})")
+            params += flt.type_ids
+        if flt.models and skip != "model":
+            terms.append(f"p.model IN ({', '.join('?' * len(flt.models))})")
+            params += flt.models
+        if flt.loras and skip != "lora":
+            # a range scan of idx_prompt_loras_lora per LoRA
+            terms.append(
+                "p.id IN (SELECT prompt_id FROM prompt_loras"
+                f" WHERE profile_id=? AND lora IN ({', '.join('?' * len(flt.loras))}))"
+            )
+            params += [profile_id, *flt.loras]
+        start, end = day_range(flt.date_from, flt.date_to)
+        if start is not None:
+            terms.append("p.updated_at >= ?")
+            params.append(start)
+        if end is not None:
+            terms.append("p.updated_at < ?")
+            params.append(end)
+        return "".join(f" AND {t}" for t in terms), params
+
+    def facet_counts(self, profile_id: int, type_id: int | None = None, flt: PromptFilter | None = None) -> FacetCounts:
+        # All facets in one compound statement. Each facet is counted under
+        # the other facets only (so alternatives stay visible); a facet with
+        # nothing else to apply reads its stats_* counters instead.
+        base = "p.profile_id=?" + (" AND p.type_id=?" if type_id is not None else "")
+        base_params: list = [profile_id] + ([type_id] if type_id is not None else [])
+
+        parts: list[str] = []
+        params: list = []
+        for facet in ("type", "model", "lora", "total"):
+            terms, term_params = self._filter_sql(profile_id, flt, skip=facet)
+            if not terms and type_id is None:
+                parts.append({
+                    "type": "SELECT 0, s.type_id, t.name, s.prompts FROM stats_type s"
+                            " JOIN types t ON t.id = s.type_id WHERE s.profile_id=?",
+                    "model": "SELECT 1, NULL, model, prompts FROM stats_model WHERE profile_id=?",
+                    "lora": "SELECT 2, NULL, lora, prompts FROM stats_lora WHERE profile_id=?",
+                    "total": "SELECT 3, NULL, NULL, prompts FROM stats_profile WHERE profile_id=?",
+                }[facet])
+                params.append(profile_id)
+                continue
+            parts.append({
+                "type": f"SELECT 0, p.type_id, t.name, COUNT(*) FROM prompts p JOIN types t ON t.id = p.type_id"
+                        f" WHERE {base}{terms} GROUP BY p.type_id",
+                "model": f"SELECT 1, NULL, p.model, COUNT(*) FROM prompts p WHERE {base}{terms} GROUP BY p.model",
+                # an id list from a covering index, not a join to the wide prompt rows
+                "lora": f"SELECT 2, NULL, l.lora, COUNT(*) FROM prompt_loras l WHERE l.profile_id=?"
+                        f" AND l.prompt_id IN (SELECT p.id FROM prompts p WHERE {base}{terms}) GROUP BY l.lora",
+                "total": f"SELECT 3, NULL, NULL, COUNT(*) FROM prompts p WHERE {base}{terms}",
+            }[facet])
+            params += ([profile_id] if facet == "lora" else []) + base_params + term_params
+
+        types: list[tuple[int, str, int]] = []
+        models: list[tuple[str, int]] = []
+        loras: list[tuple[str, int]] = []
+        total = 0
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            for facet, key, value, n in cur.execute(" UNION ALL ".join(parts) + ";", params):
+                if facet == 0:
+                    types.append((int(key), str(value), int(n)))
+                elif facet == 1:
+                    models.append((str(value), int(n)))
+                elif facet == 2:
+                    loras.append((str(value), int(n)))
+                else:
+                    total = int(n)
+
+        types.sort(key=lambda r: (-r[2], r[1].lower()))
+        models.sort(key=lambda r: (-r[1], r[0].lower()))
+        loras.sort(key=lambda r: (-r[1], r[0].lower()))
+        return FacetCounts(types, models, loras, total)
+
+    def matching_prompt_summaries(
+        self, profile_id: int, prompt_ids: list[int], type_id: int | None = None, flt: PromptFilter | None = None
+    ) -> list[PromptSummary]:
+        # the given prompts that pass the type / facet filter (edits of a filtered list)
+        if not prompt_ids:
+            return []
+        sql = f"""
+            SELECT p.id, p.type_id, t.name, p.name, p.updated_at
+            FROM prompts p
+            JOIN types t ON t.id = p.type_id
+            WHERE p.id IN ({', '.join('?' * len(prompt_ids))}) AND p.profile_id=?
+        """
+        params: list = [*prompt_ids, profile_id]
+        if type_id is not None:
+            sql += " AND p.type_id=?"
+            params.append(type_id)
+        terms, term_params = self._filter_sql(profile_id, flt)
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(sql + terms + ";", params + term_params)
+            return list(map(PromptSummary._make, cur.fetchall()))
+
+    # ---------------------------
+    # Tag index (prompt_tags)
+    # ---------------------------
+    TAG_SIDES = {"positive": (TAG_POSITIVE,), "negative": (TAG_NEGATIVE,), "any": (TAG_POSITIVE, TAG_NEGATIVE)}
+
+    def _tag_filter_sql(
+        self, profile_id: int, include: list[str], exclude: list[str], side: str
+    ) -> tuple[str, list]:
+        # prompt ids as a compound select: every term is a range scan of
+        # idx_prompt_tags_tag, combined with INTERSECT / EXCEPT
+        sides = self.TAG_SIDES[side]
+        term = (
+            "SELECT prompt_id FROM prompt_tags"
+            f" WHERE profile_id=? AND side IN ({', '.join('?' * len(sides))})"
+            " AND tag_id=(SELECT id FROM tags WHERE tag=?)"
+        )
+        include = [t for t in map(normalize_tag, include) if t]
+        exclude = [t for t in map(normalize_tag, exclude) if t]
+
+        if include:
+            sql = " INTERSECT ".join([term] * len(include))
+            params = [v for tag in include for v in (profile_id, *sides, tag)]
+        else:
+            sql = "SELECT id FROM prompts WHERE profile_id=?"
+            params = [profile_id]
+        for tag in exclude:
+            sql += " EXCEPT " + term
+            params += [profile_id, *sides, tag]
+        return sql, params
+
+    def find_by_tags(
+        self,
+        profile_id: int,
+        include: list[str],
+        exclude: list[str] = (),
+        side: str = "positive",
+        type_id: int | None = None,
+        limit: int = -1,
+    ) -> list[PromptSummary]:
+        # include: all of these tags, exclude: none of them; side: positive / negative / any
+        ids_sql, params = self._tag_filter_sql(profile_id, list(include), list(exclude), side)
+        sql = f"""
+            SELECT p.id, p.type_id, t.name, p.name, p.updated_at
+            FROM prompts p
+            JOIN types t ON t.id = p.type_id
+            WHERE p.id IN ({ids_sql})
+        """
+        if type_id is not None:
+            sql += " AND p.type_id=?"
+            params.append(type_id)
+        sql += " ORDER BY p.updated_at DESC, p.id DESC LIMIT ?;"
+        params.append(limit)
+
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(sql, params)
+            return list(map(PromptSummary._make, cur.fetchall()))
+
+    def top_tags(self, profile_id: int, side: str = "positive", limit: int = 50) -> list[tuple[str, int]]:
+        sides = self.TAG_SIDES[side]
+        with self._read() as conn:
+            rows = conn.execute(f"""
+                SELECT t.tag, COUNT(*) AS c FROM prompt_tags pt
+                JOIN tags t ON t.id = pt.tag_id
+                WHERE pt.profile_id=? AND pt.side IN ({', '.join('?' * len(sides))})
+                GROUP BY pt.tag_id ORDER BY c DESC, t.tag LIMIT ?;
+            """, (profile_id, *sides, limit)).fetchall()
+        return [(str(r["tag"]), int(r["c"])) for r in rows]
+
+    # ---------------------------
+    # MinHash signatures (prompt_minhash, see dedup.py)
+    # ---------------------------
+    def stale_minhash(self, profile_id: int) -> list[tuple[int, int]]:
+        # (prompt id, updated_at) of prompts without an up-to-date signature
+        with self._read() as conn:
+            rows = conn.execute("""
+                SELECT p.id, p.updated_at FROM prompts p
+                LEFT JOIN prompt_minhash m ON m.prompt_id = p.id
+                WHERE p.profile_id=? AND (m.prompt_id IS NULL OR m.updated_at <> p.updated_at)
+                ORDER BY p.id;
+            """, (profile_id,)).fetchall()
+        return [(int(r[0]), int(r[1])) for r in rows]
+
+    def prompt_tag_keys(self, prompt_ids: list[int]) -> dict[int, list[int]]:
+        # tags of both sides as integers: tag_id * 2 + side
+        out: dict[int, list[int]] = {}
+        if not prompt_ids:
+            return out
+        marks = ", ".join("?" * len(prompt_ids))
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            for pid, key in cur.execute(
+                f"SELECT prompt_id, tag_id * 2 + side FROM prompt_tags WHERE prompt_id IN ({marks});", list(prompt_ids)
+            ):
+                out.setdefault(pid, []).append(key)
+        return out
+
+    def store_minhash(self, rows: list[tuple[int, int, int, bytes]]) -> None:
+        # (prompt_id, profile_id, updated_at, sig)
+        with self._write() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO prompt_minhash(prompt_id, profile_id, updated_at, sig) VALUES(?, ?, ?, ?);",
+                rows,
+            )
+
+    def minhash_signatures(self, profile_id: int) -> list[tuple[int, bytes]]:
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(
+                "SELECT prompt_id, sig FROM prompt_minhash WHERE profile_id=? AND length(sig) > 0 ORDER BY prompt_id;",
+                (profile_id,),
+            )
+            return cur.fetchall()
+
+    # ---------------------------
+    # TF-IDF index (see similar.py)
+    # ---------------------------
+    def change_token(self) -> tuple[int, int, int]:
+        # Differs after any write: ours (total_changes), another
+        # connection's commit (data_version), a restore (neither of them).
+        with self._lock:
+            return (
+                self.conn.total_changes,
+                int(self.conn.execute("PRAGMA data_version;").fetchone()[0]),
+                self._restores,
+            )
+
+    def prompt_hashes(self, profile_id: int) -> list[tuple[int, str]]:
+        # (prompt id, content_hash): an index-only scan of idx_prompts_profile_hash
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute("SELECT id, content_hash FROM prompts WHERE profile_id=?;", (profile_id,))
+            return cur.fetchall()
 
     def stats_total(self, profile_id: int) -> int:
-        cur = self.conn.cursor()
-        cur.execute("SELECT COUNT(*) AS total FROM prompts WHERE profile_id=?;", (profile_id,))
-        return int(cur.fetchone()["total"])
+        with self._read() as conn:
+            r = conn.execute("SELECT prompts FROM stats_profile WHERE profile_id=?;", (profile_id,)).fetchone()
+        return int(r["prompts"]) if r else 0
+
+    def profile_stats(self, profile_id: int, period: str = "day") -> ProfileStats:
+        # Reads the stats_* counters (see migrations, v4): a handful of small
+        # rows. The activity timeline counts two index ranges per bucket,
+        # (profile_id, created_at) and (profile_id, updated_at): bucket edges
+        # are local midnights, computed here, so SQLite never converts a date.
+        buckets = period_buckets(period, ACTIVITY_BUCKETS[period])
+        activity_sql = f"""
+            WITH b(i, lo, hi) AS (VALUES {", ".join(["(?, ?, ?)"] * len(buckets))})
+            SELECT
+                (SELECT COUNT(*) FROM prompts WHERE profile_id=? AND created_at >= b.lo AND created_at < b.hi),
+                (SELECT COUNT(*) FROM prompts WHERE profile_id=? AND updated_at >= b.lo AND updated_at < b.hi)
+            FROM b ORDER BY b.i;
+        """
+        activity_params = [v for i, (_, lo, hi) in enumerate(buckets) for v in (i, lo, hi)] + [profile_id, profile_id]
+
+        with self._read() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+
+            r = cur.execute(
+                "SELECT prompts, positive_len, negative_len FROM stats_profile WHERE profile_id=?;", (profile_id,)
+            ).fetchone()
+            total, pos_len, neg_len = r if r else (0, 0, 0)
+
+            by_type = cur.execute("""
+                SELECT t.name, COALESCE(s.prompts, 0) AS n
+                FROM types t
+                LEFT JOIN stats_type s ON s.type_id = t.id
+                WHERE t.profile_id=?
+                ORDER BY n DESC, t.name COLLATE NOCASE;
+            """, (profile_id,)).fetchall()
+            by_model = cur.execute(
+                "SELECT model, prompts FROM stats_model WHERE profile_id=? ORDER BY prompts DESC, model;",
+                (profile_id,),
+            ).fetchall()
+            by_lora = cur.execute(
+                "SELECT lora, prompts FROM stats_lora WHERE profile_id=? ORDER BY prompts DESC, lora;",
+                (profile_id,),
+            ).fetchall()
+            counts = cur.execute(activity_sql, activity_params).fetchall()
+            activity = [(label, created, updated) for (label, _, _), (created, updated) in zip(buckets, counts)]
+
+        return ProfileStats(
+            total=int(total),
+            avg_positive=pos_len / total if total else 0.0,
+            avg_negative=neg_len / total if total else 0.0,
+            by_type=by_type,
+            by_model=by_model,
+            by_lora=by_lora,
+            activity=activity,
+        )
+
+    # ---------------------------
+    # Backup / restore (see backup.py)
+    # ---------------------------
+
+    def backup_to(self, target_path: str, progress: Callable[[int, int], object] | None = None) -> None:
+        # Copies BACKUP_PAGES pages per step from the writer connection
+        # without holding self._lock: the steps interleave with our writes
+        # (one waits for the other only for a step), and the backup API
+        # carries those writes over instead of starting again. A step that
+        # meets an open write transaction waits for it to end. Commits of
+        # other processes do restart the copy. An exception raised by
+        # progress(done, total) aborts it.
+        target = sqlite3.connect(target_path)
+        try:
+            def step(_status: int, remaining: int, total: int) -> None:
+                if progress is not None:
+                    progress(total - remaining, total)
+                time.sleep(BACKUP_STEP_PAUSE_MS / 1000)
+
+            self.conn.backup(target, pages=BACKUP_PAGES, progress=step)
+            # a snapshot is one self-contained file
+            target.execute("PRAGMA journal_mode=DELETE;")
+        finally:
+            target.close()
+
+    def content_digest(self) -> str:
+        with self._read() as conn:
+            return content_digest(conn)
+
+    def restore_from(self, source_path: str) -> None:
+        # Replaces the whole content with a snapshot, in place: the file
+        # stays open here and in the reader pool.
+        src = sqlite3.connect(f"file:{quote(os.path.abspath(source_path))}?mode=ro", uri=True)
+        try:
+            if src.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='profiles';").fetchone() is None:
+                raise ValueError("Not a PromptExplorer database")
+            if schema_version(src) > SCHEMA_VERSION:
+                raise ValueError("The backup was made by a newer version")
+            with self._lock:
+                src.backup(self.conn)
+                self.conn.execute("PRAGMA journal_mode=WAL;")
+                migrate(self.conn)
+                self._restores += 1
+
+                with self._cache_lock:
+                    self._cache_gen += 1
+                    self._prompt_cache.clear()
+                self._external = None
+                for (pid,) in self.conn.execute("SELECT id FROM profiles;").fetchall():
+                    self._notify(ChangeKind.PROMPTS_RELOADED, pid)
+                self._flush_changes()
+        finally:
+            src.close()
+
+    def vacuum(self) -> None:
+        with self._write() as conn:
+            conn.execute("INSERT INTO prompts_fts(prompts_fts) VALUES('optimize');")
+        with self._lock:
+            # VACUUM cannot run inside a transaction
+            self.conn.execute("VACUUM;")
+            self.conn.execute("PRAGMA optimize;")
 
     # ---------------------------
     # Import profiles from external DB
@@ -266,84 +1266,140 @@ class DB:
     @staticmethod
     def read_profiles_from_db(db_path: str) -> list[tuple[int, str, str]]:
 
-        conn = sqlite3.connect(db_path)
+        # read-only: a mistyped path must not leave an empty database behind
+        conn = sqlite3.connect(f"file:{quote(os.path.abspath(db_path))}?mode=ro", uri=True)
         conn.row_factory = sqlite3.Row
         cur = conn.cursor()
 
         try:
-            cur.execute("SELECT id, name, theme FROM profiles ORDER BY id ASC;")
-            rows = cur.fetchall()
-            res = []
-            for r in rows:
-                theme = r["theme"] if "theme" in r.keys() else "light"
-                res.append((int(r["id"]), str(r["name"]), str(theme)))
-        except sqlite3.OperationalError:
-            cur.execute("SELECT id, name FROM profiles ORDER BY id ASC;")
-            res = [(int(r["id"]), str(r["name"]), "light") for r in cur.fetchall()]
-
-        conn.close()
+            try:
+                cur.execute("SELECT id, name, theme FROM profiles ORDER BY id ASC;")
+                rows = cur.fetchall()
+                res = []
+                for r in rows:
+                    theme = r["theme"] if "theme" in r.keys() else "light"
+                    res.append((int(r["id"]), str(r["name"]), str(theme)))
+            except sqlite3.OperationalError:
+                cur.execute("SELECT id, name FROM profiles ORDER BY id ASC;")
+                res = [(int(r["id"]), str(r["name"]), "light") for r in cur.fetchall()]
+        finally:
+            conn.close()
         return res
 
-    def import_profile_from_db(self, external_db_path: str, external_profile_id: int) -> int:
+    def import_profile_from_db(
+        self,
+        external_db_path: str,
+        external_profile_id: int,
+        into_profile_id: int | None = None,
+    ) -> ImportResult:
+        # Set-based copy through ATTACH, in one transaction. Prompts whose
+        # content hash is already in the target profile (or repeats inside the
+        # source) are skipped, so importing the same profile twice into it is
+        # a no-op. into_profile_id=None creates a new profile.
+        # ATTACH would create a missing file
+        if not os.path.isfile(external_db_path):
+            raise ValueError("Database file not found")
+        if os.path.samefile(external_db_path, self.path):
+            raise ValueError("Cannot import from the open database itself")
 
-        ext = sqlite3.connect(external_db_path)
-        ext.row_factory = sqlite3.Row
-        ec = ext.cursor()
+        with self._lock:
+            # ATTACH is not allowed inside a transaction
+            self.conn.execute("ATTACH DATABASE ? AS ext;", (external_db_path,))
+            try:
+                return self._import_attached(int(external_profile_id), into_profile_id)
+            finally:
+                self.conn.execute("DROP TABLE IF EXISTS temp.import_types;")
+                self.conn.execute("DROP TABLE IF EXISTS temp.import_rows;")
+                self.conn.execute("DETACH DATABASE ext;")
 
-        # --- profile ---
-        try:
-            ec.execute("SELECT id, name, theme FROM profiles WHERE id=?;", (external_profile_id,))
-            p = ec.fetchone()
-            if not p:
-                raise ValueError("Profile not found")
-            theme = p["theme"] if "theme" in p.keys() else "light"
-            new_profile_id = self.create_profile(str(p["name"]), theme)
-        except sqlite3.OperationalError:
-            ec.execute("SELECT id, name FROM profiles WHERE id=?;", (external_profile_id,))
-            p = ec.fetchone()
+    def _import_attached(self, ext_pid: int, into_profile_id: int | None) -> ImportResult:
+        with self._write() as conn:
+            profile_cols = {r[1] for r in conn.execute("PRAGMA ext.table_info(profiles);").fetchall()}
+            type_cols = {r[1] for r in conn.execute("PRAGMA ext.table_info(types);").fetchall()}
+
+            theme_col = "theme" if "theme" in profile_cols else "'light'"
+            p = conn.execute(f"SELECT name, {theme_col} AS theme FROM ext.profiles WHERE id=?;", (ext_pid,)).fetchone()
             if not p:
                 raise ValueError("Profile not found")
-            new_profile_id = self.create_profile(str(p["name"]), "light")
 
-        ec.execute("PRAGMA table_info(types);")
-        type_cols = [r["name"] for r in ec.fetchall()]
-        has_type_profile = "profile_id" in type_cols
+            if into_profile_id is None:
+                pid = self.create_profile(str(p["name"]), str(p["theme"] or "light"))
+            else:
+                pid = int(into_profile_id)
 
-        # --- types ---
-        if has_type_profile:
-            ec.execute("SELECT id, name FROM types WHERE profile_id=?;", (external_profile_id,))
-        else:
-            ec.execute("SELECT id, name FROM types;")
-
-        old_to_new_type: dict[int, int] = {}
-        for r in ec.fetchall():
-            new_tid = self.create_type_if_missing(new_profile_id, str(r["name"]))
-            old_to_new_type[int(r["id"])] = new_tid
-
-        # --- prompts ---
-        ec.execute("""
-            SELECT id, type_id, name, description, positive, negative, lora, model, created_at, updated_at
-            FROM prompts
-            WHERE profile_id=?;
-        """, (external_profile_id,))
-        rows = ec.fetchall()
-
-        cur = self.conn.cursor()
-        for r in rows:
-            old_tid = int(r["type_id"])
-            new_tid = old_to_new_type.get(old_tid) or self.create_type_if_missing(new_profile_id, "Imported")
+            # --- types: old databases have no types.profile_id (one shared list) ---
+            type_filter = "WHERE e.profile_id = :ext" if "profile_id" in type_cols else ""
+            conn.execute(f"""
+                CREATE TEMP TABLE import_types AS
+                SELECT e.id AS ext_id, COALESCE(NULLIF(trim(e.name), ''), 'Imported') AS name
+                FROM ext.types e {type_filter};
+            """, {"ext": ext_pid})
 
-            cur.execute("""
-                INSERT INTO prompts(profile_id, type_id, name, description, positive, negative, lora, model, created_at, updated_at)
-                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
-            """, (
-                new_profile_id, new_tid,
-                str(r["name"]), str(r["description"]),
-                str(r["positive"]), str(r["negative"]),
-                str(r["lora"]), str(r["model"]),
-                str(r["created_at"]), str(r["updated_at"]),
-            ))
+            # --- prompts, with hashes; a prompt of an unknown type goes to "Imported" ---
+            # timestamps are text in files older than v9
+            conn.execute(f"""
+                CREATE TEMP TABLE import_rows AS
+                SELECT COALESCE(it.name, 'Imported') AS type_name,
+                       e.name, e.description, e.positive, e.negative, e.lora, e.model,
+                       {epoch_sql('e.created_at')} AS created_at, {epoch_sql('e.updated_at')} AS updated_at,
+                       content_hash(e.name, e.description, e.positive, e.negative, e.lora, e.model) AS h
+                FROM ext.prompts e
+                LEFT JOIN temp.import_types it ON it.ext_id = e.type_id
+                WHERE e.profile_id = ?
+                ORDER BY e.id;
+            """, (ext_pid,))
+            conn.execute("""
+                DELETE FROM temp.import_rows
+                WHERE rowid NOT IN (SELECT MIN(rowid) FROM temp.import_rows GROUP BY h)
+                   OR h IN (SELECT content_hash FROM main.prompts WHERE profile_id = ?);
+            """, (pid,))
+            total = conn.execute("SELECT COUNT(*) FROM ext.prompts WHERE profile_id=?;", (ext_pid,)).fetchone()[0]
+
+            # new types only for prompts that are actually imported (and every source type for a new profile)
+            last_type_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM main.types;").fetchone()[0]
+            conn.execute("""
+                INSERT OR IGNORE INTO main.types(profile_id, name)
+                SELECT ?, name FROM (
+                    SELECT type_name AS name FROM temp.import_rows
+                    UNION
+                    SELECT name FROM temp.import_types WHERE ?
+                ) ORDER BY name;
+            """, (pid, into_profile_id is None))
+            new_types = [r[0] for r in conn.execute(
+                "SELECT id FROM main.types WHERE profile_id=? AND id > ?;", (pid, last_type_id)
+            ).fetchall()]
+
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM main.prompts;").fetchone()[0]
+            conn.execute("""
+                INSERT INTO main.prompts(profile_id, type_id, name, description, positive, negative, lora, model,
+                                         created_at, updated_at, content_hash)
+                SELECT :pid, t.id, r.name, r.description, r.positive, r.negative, r.lora, r.model,
+                       r.created_at, r.updated_at, r.h
+                FROM temp.import_rows r
+                JOIN main.types t ON t.profile_id = :pid AND t.name = r.type_name
+                ORDER BY r.rowid;
+            """, {"pid": pid})
+
+            new_ids: list[int] = []
+            loras: list[tuple[int, int, str]] = []
+            tags: list[TagRow] = []
+            for prompt_id, lora, positive, negative in conn.execute(
+                "SELECT id, lora, positive, negative FROM main.prompts WHERE profile_id=? AND id > ? ORDER BY id;",
+                (pid, last_id),
+            ).fetchall():
+                new_ids.append(int(prompt_id))
+                loras.extend((prompt_id, pid, name) for name in parse_loras(lora))
+                tags.extend(tag_rows(prompt_id, pid, positive, negative))
+            conn.executemany(
+                "INSERT OR IGNORE INTO prompt_loras(prompt_id, profile_id, lora) VALUES(?, ?, ?);", loras
+            )
+            insert_tag_rows(conn, tags)
+
+            # a new profile is announced by create_profile() already
+            if into_profile_id is not None:
+                if new_types:
+                    self._notify(ChangeKind.TYPE_CREATED, pid, new_types)
+                if new_ids:
+                    self._notify(ChangeKind.PROMPTS_INSERTED, pid, new_ids)
 
-        self.conn.commit()
-        ext.close()
-        return int(new_profile_id)
+        return ImportResult(pid, len(new_ids), int(total) - len(new_ids))
@@ -0,0 +1,189 @@
+import sys
+from typing import Any, Callable
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from .constants import DB_READER_THREADS
+from .db import DB
+from .models import Change
+
+
+# ============================================================
+# Background DB executor
+# ============================================================
+#
+# DB calls run on worker threads: writes on a single-thread pool (so they
+# keep their order), reads on a small pool. Every call returns a DBFuture
+# whose signals are emitted back on the GUI thread (the future lives there,
+# so Qt queues the delivery). Calls submitted under a key cancel the
+# previous pending call with the same key — e.g. a prompt page for a type
+# the user has already left.
+#
+# DB change notifications are re-emitted as the `changed` signal, so views
+# receive them on the GUI thread.
+
+class DBFuture(QObject):
+
+    # emitted by the worker: (ok, value), or None when skipped as cancelled
+    _outcome = Signal(object)
+    # emitted on the GUI thread after the callbacks have run
+    done = Signal()
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._cancelled = False
+        self._on_done: list[Callable[[Any], None]] = []
+        self._on_error: list[Callable[[Exception], None]] = []
+        # Connected before the job starts, so a fast worker cannot emit into
+        # the void; the slot runs queued on the thread the future lives in.
+        self._outcome.connect(self._deliver)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def then(
+        self,
+        on_done: Callable[[Any], None],
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> "DBFuture":
+        self._on_done.append(on_done)
+        if on_error is not None:
+            self._on_error.append(on_error)
+        return self
+
+    def _deliver(self, outcome: tuple[bool, Any] | None) -> None:
+        # Delivery is skipped once the future is cancelled, even if the
+        # worker had already produced a result.
+        # A callback that raises is reported like any uncaught slot error;
+        # the others still run and `done` is still emitted, so the executor
+        # does not count the call as pending forever.
+        try:
+            if outcome is not None and not self._cancelled:
+                ok, value = outcome
+                for cb in (self._on_done if ok else self._on_error):
+                    try:
+                        cb(value)
+                    except Exception:
+                        sys.excepthook(*sys.exc_info())
+        finally:
+            self.done.emit()
+
+
+class TaskProgress(QObject):
+
+    # Passed to long DB jobs as progress(done, total) -> keep going?
+    # The worker calls it; `changed` is delivered queued on the GUI thread.
+    changed = Signal(int, int)
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def __call__(self, done: int, total: int) -> bool:
+        self.changed.emit(done, total)
+        return not self._cancelled
+
+
+class _Job(QRunnable):
+
+    def __init__(self, future: DBFuture, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        super().__init__()
+        self.setAutoDelete(True)
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self) -> None:
+        if self.future.cancelled:
+            self.future._outcome.emit(None)
+            return
+        try:
+            res = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.future._outcome.emit((False, e))
+        else:
+            self.future._outcome.emit((True, res))
+
+
+class DBExecutor(QObject):
+
+    changed = Signal(object)
+
+    def __init__(self, db: DB, readers: int = DB_READER_THREADS, parent: QObject | None = None):
+        super().__init__(parent)
+        self.db = db
+        self.db.subscribe(self._on_db_change)
+
+        self._writer = QThreadPool(self)
+        self._writer.setMaxThreadCount(1)
+
+        self._readers = QThreadPool(self)
+        self._readers.setMaxThreadCount(max(1, readers))
+
+        self._pending: set[DBFuture] = set()
+        self._latest: dict[str, DBFuture] = {}
+
+    def read(self, fn: Callable[..., Any], *args, key: str | None = None, **kwargs) -> DBFuture:
+        return self._submit(self._readers, fn, args, kwargs, key)
+
+    def write(self, fn: Callable[..., Any], *args, key: str | None = None, **kwargs) -> DBFuture:
+        return self._submit(self._writer, fn, args, kwargs, key)
+
+    def cancel(self, key: str) -> None:
+        fut = self._latest.pop(key, None)
+        if fut is not None:
+            fut.cancel()
+
+    def idle(self) -> bool:
+        # every submitted call has been delivered (or dropped as cancelled)
+        return not self._pending
+
+    def _on_db_change(self, change: Change) -> None:
+        # called on the committing worker thread; queued to the GUI by Qt
+        self.changed.emit(change)
+
+    def shutdown(self) -> None:
+        self.db.unsubscribe(self._on_db_change)
+        for fut in self._pending:
+            fut.cancel()
+        self._readers.waitForDone()
+        self._writer.waitForDone()
+
+    def _submit(self, pool: QThreadPool, fn, args: tuple, kwargs: dict, key: str | None) -> DBFuture:
+        fut = DBFuture(self)
+        if key is not None:
+            self.cancel(key)
+            self._latest[key] = fut
+
+        # keep the future alive until its result has been delivered
+        self._pending.add(fut)
+        fut.done.connect(lambda: self._forget(fut, key))
+
+        pool.start(_Job(fut, fn, args, kwargs))
+        return fut
+
+    def _forget(self, fut: DBFuture, key: str | None) -> None:
+        self._pending.discard(fut)
+        if key is not None and self._latest.get(key) is fut:
+            del self._latest[key]
+        fut.deleteLater()
+
+
+def open_db(path: str, parent: QObject | None = None) -> DBFuture:
+    # Opening may migrate (and rebuild) a large file: done on a pool thread.
+    # The caller keeps the future until it has fired.
+    fut = DBFuture(parent)
+    QThreadPool.globalInstance().start(_Job(fut, DB, (path,), {}))
+    return fut
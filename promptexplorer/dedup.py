@@ -0,0 +1,115 @@
+import numpy as np
+
+from .db import DB
+from .export import Progress
+from .models import DuplicateGroup
+
+
+# ============================================================
+# Near-duplicate detection: MinHash signatures + LSH banding
+# ============================================================
+#
+# A prompt is the set of its tags (prompt_tags, both sides). Its MinHash
+# signature — NUM_PERM minima of random linear hashes of the tag keys —
+# estimates the Jaccard similarity of two prompts as the share of equal
+# positions. Signatures live in prompt_minhash and are recomputed only
+# for prompts whose updated_at changed.
+#
+# Candidates come from LSH: a signature is cut into BANDS bands of ROWS
+# values and prompts with an identical band land in one bucket. With
+# 16 x 4 a pair at similarity 0.8 shares a bucket with p > 0.999, at 0.3
+# with p < 0.13. Within a bucket every member is checked against the
+# first one only, so a bucket costs O(size), never O(size^2); chains of
+# near-duplicates are joined through union-find.
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# hash family h(x) = (a * x + b) mod P; a, x < 2^31 keeps a * x in uint64
+_P = np.uint64((1 << 31) - 1)
+_SEED = 20240601  # stored signatures depend on it: never change
+
+_rng = np.random.default_rng(_SEED)
+_A = _rng.integers(1, int(_P), NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, int(_P), NUM_PERM, dtype=np.uint64)[:, None]
+
+REFRESH_BATCH = 500
+
+
+class DedupCancelled(Exception):
+    pass
+
+
+def signature(keys: list[int]) -> np.ndarray:
+    x = np.asarray(keys, dtype=np.uint64)[None, :] % _P
+    return ((_A * x + _B) % _P).min(axis=1).astype(np.uint32)
+
+
+def refresh_signatures(db: DB, profile_id: int, progress: Progress | None = None) -> int:
+    # Returns the number of signatures (re)computed.
+    stale = db.stale_minhash(profile_id)
+    for start in range(0, len(stale), REFRESH_BATCH):
+        batch = stale[start:start + REFRESH_BATCH]
+        keys = db.prompt_tag_keys([pid for pid, _ in batch])
+        db.store_minhash([
+            (pid, profile_id, updated_at, signature(keys[pid]).tobytes() if pid in keys else b"")
+            for pid, updated_at in batch
+        ])
+        if progress is not None and not progress(start + len(batch), len(stale)):
+            raise DedupCancelled()
+    return len(stale)
+
+
+def find_duplicates(
+    db: DB,
+    profile_id: int,
+    threshold: float = 0.8,
+    progress: Progress | None = None,
+) -> list[DuplicateGroup]:
+    refresh_signatures(db, profile_id, progress)
+
+    rows = db.minhash_signatures(profile_id)
+    if len(rows) < 2:
+        return []
+    ids = np.array([pid for pid, _ in rows], dtype=np.int64)
+    sigs = np.frombuffer(b"".join(sig for _, sig in rows), dtype=np.uint32).reshape(len(rows), NUM_PERM)
+
+    parent = list(range(len(rows)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(BANDS):
+        cols = np.ascontiguousarray(sigs[:, band * ROWS:(band + 1) * ROWS])
+        keys = cols.view(np.dtype((np.void, cols.dtype.itemsize * ROWS))).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # buckets = runs of equal keys in the sorted order; only runs of 2+ matter
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        for lo, hi in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+            first, rest = order[lo], order[lo + 1:hi]
+            sim = (sigs[rest] == sigs[first]).mean(axis=1)
+            for m in rest[sim >= threshold]:
+                a, b = root(int(first)), root(int(m))
+                if a != b:
+                    parent[max(a, b)] = min(a, b)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(rows)):
+        clusters.setdefault(root(i), []).append(i)
+
+    groups: list[DuplicateGroup] = []
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        # members are in id order: the first one is the oldest prompt
+        sim = (sigs[members[1:]] == sigs[members[0]]).mean(axis=1)
+        groups.append(DuplicateGroup(tuple(int(ids[i]) for i in members), float(sim.min())))
+
+    groups.sort(key=lambda g: (-len(g.ids), -g.similarity, g.ids[0]))
+    return groups
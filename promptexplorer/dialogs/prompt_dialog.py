@@ -1,4 +1,4 @@
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QAbstractItemModel, Qt
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import (
     QComboBox,
@@ -10,24 +10,25 @@ from PySide6.QtWidgets import (
     QPlainTextEdit,
     QVBoxLayout,
     QCompleter,
+    QWidget,
 )
 
 from ..models import Prompt
-from ..utils import theme_qss
 
 
 # ============================================================
 # Dialog: Create / Edit prompt
 # ============================================================
+#
+# Built once per main window and reused: load() resets the fields for
+# the next prompt. The type combo shares the window's TypeListModel.
 
 class PromptDialog(QDialog):
 
-    def __init__(self, types: list[str], icon: QIcon, theme: str, existing: Prompt | None = None):
-        super().__init__()
+    def __init__(self, types: QAbstractItemModel, icon: QIcon, parent: QWidget | None = None):
+        super().__init__(parent)
 
-        self.setWindowTitle("Редактировать промт" if existing else "Новый промт")
         self.setWindowIcon(icon)
-        self.setStyleSheet(theme_qss(theme))
         # ---------------------------
         # Type combobox (editable + search)
         # ---------------------------
@@ -35,7 +36,7 @@ class PromptDialog(QDialog):
         self.type.setEditable(True)
         self.type.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)  # Qt6-правильно
         self.type.setMaxVisibleItems(12)
-        self.type.addItems(types)
+        self.type.setModel(types)
 
         if hasattr(self.type, "setAutoCompletion"):
             self.type.setAutoCompletion(False)
@@ -95,19 +96,25 @@ class PromptDialog(QDialog):
 
         self.setMinimumWidth(640)
 
-        # ---------------------------
-        # If editing — prefill the fields
-        # ---------------------------
         self.prompt_id: int | None = None
-        if existing:
-            self.prompt_id = existing.id
-            self.name.setText(existing.name)
-            self.type.setCurrentText(existing.type)
-            self.model.setText(existing.model)
-            self.lora.setPlainText(existing.lora)
-            self.description.setPlainText(existing.description)
-            self.positive.setPlainText(existing.positive)
-            self.negative.setPlainText(existing.negative)
+        self.load(None)
+
+    def load(self, existing: Prompt | None) -> None:
+        # If editing — prefill the fields, otherwise clear what the last use left
+        self.setWindowTitle("Редактировать промт" if existing else "Новый промт")
+        self.prompt_id = existing.id if existing else None
+
+        self.name.setText(existing.name if existing else "")
+        self.type.setCurrentIndex(-1)
+        self.type.setEditText(existing.type if existing else "")
+        self.model.setText(existing.model if existing else "")
+        # setPlainText also drops the undo history of the previous prompt
+        self.lora.setPlainText(existing.lora if existing else "")
+        self.description.setPlainText(existing.description if existing else "")
+        self.positive.setPlainText(existing.positive if existing else "")
+        self.negative.setPlainText(existing.negative if existing else "")
+
+        self.name.setFocus()
 
     def _validate_then_accept(self) -> None:
         if not self.name.text().strip():
@@ -1,21 +1,26 @@
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QSettings
 from PySide6.QtGui import QCursor, QIcon
 from PySide6.QtWidgets import (
     QApplication,
+    QCheckBox,
     QComboBox,
     QDialog,
     QFileDialog,
     QHBoxLayout,
     QLabel,
     QMessageBox,
+    QProgressDialog,
     QPushButton,
     QToolTip,
     QVBoxLayout,
     QInputDialog,
 )
 
+from ..backup import list_backups, restore_backup
 from ..db import DB
-from ..utils import theme_qss
+from ..db_executor import DBExecutor
+from ..models import BackupInfo, ImportResult
+from ..utils import format_ts
 
 
 # ============================================================
@@ -24,14 +29,16 @@ from ..utils import theme_qss
 
 class StartupDialog(QDialog):
 
-    def __init__(self, db: DB, icon: QIcon, theme: str):
+    def __init__(self, db: DB, executor: DBExecutor, icon: QIcon, settings: QSettings):
         super().__init__()
         self.db = db
+        self.executor = executor
+        self.settings = settings
+        self.busy: QProgressDialog | None = None
         self.selected_profile_id: int | None = None
 
         self.setWindowTitle("Выбор профиля")
         self.setWindowIcon(icon)
-        self.setStyleSheet(theme_qss(theme))
 
         self.copy_path_text = r"%APPDATA%/PromptExplorer"
         self.info = QLabel(
@@ -45,32 +52,41 @@ class StartupDialog(QDialog):
 
         self.profile_combo = QComboBox()
 
+        # Shift held at launch shows this dialog anyway
+        self.open_last = QCheckBox("Открывать этот профиль сразу при запуске (Shift — показать выбор)")
+        self.open_last.setChecked(str(settings.value("open_last_profile", "false")).lower() == "true")
+
         self.btn_continue = QPushButton("Продолжить")
         self.btn_new = QPushButton("Создать новый профиль")
         self.btn_import = QPushButton("Импорт профиля (из БД)")
         self.btn_delete = QPushButton("Удалить профиль")
+        self.btn_restore = QPushButton("Восстановить из копии…")
 
         self.btn_continue.clicked.connect(self.on_continue)
         self.btn_new.clicked.connect(self.on_new)
         self.btn_import.clicked.connect(self.on_import)
         self.btn_delete.clicked.connect(self.on_delete)
+        self.btn_restore.clicked.connect(self.on_restore)
 
         layout = QVBoxLayout(self)
         layout.addWidget(self.info)
         layout.addWidget(self.profile_combo)
+        layout.addWidget(self.open_last)
         row = QHBoxLayout()
         row.addWidget(self.btn_new)
         row.addWidget(self.btn_import)
         row.addWidget(self.btn_delete)
+        row.addWidget(self.btn_restore)
         row.addStretch(1)
         row.addWidget(self.btn_continue)
         layout.addLayout(row)
 
         self.setMinimumWidth(780)
 
+        self.btn_continue.setEnabled(False)
+        self.btn_delete.setEnabled(False)
         self.reload_profiles()
 
-        self.btn_delete.setEnabled(self.profile_combo.currentData() is not None)
         self.profile_combo.currentIndexChanged.connect(
             lambda: self.btn_delete.setEnabled(self.profile_combo.currentData() is not None)
         )
@@ -82,9 +98,13 @@ class StartupDialog(QDialog):
         QApplication.clipboard().setText(self.copy_path_text)
         QToolTip.showText(QCursor.pos(), "Скопировано!")
 
-    def reload_profiles(self) -> None:
+    def reload_profiles(self, select_pid: int | None = None) -> None:
+        self.executor.read(self.db.list_profiles, key="startup_profiles").then(
+            lambda profiles: self._fill_profiles(profiles, select_pid), self.on_db_error
+        )
+
+    def _fill_profiles(self, profiles: list[tuple[int, str, str]], select_pid: int | None) -> None:
         self.profile_combo.clear()
-        profiles = self.db.list_profiles()
 
         if not profiles:
             self.profile_combo.setEnabled(False)
@@ -99,11 +119,38 @@ class StartupDialog(QDialog):
         for pid, name, _theme in profiles:
             self.profile_combo.addItem(name, pid)
 
+        idx = self.profile_combo.findData(select_pid)
+        if idx >= 0:
+            self.profile_combo.setCurrentIndex(idx)
+        self.btn_delete.setEnabled(self.profile_combo.currentData() is not None)
+
+    def on_db_error(self, err: Exception) -> None:
+        QMessageBox.critical(self, "Ошибка!", str(err))
+
+    def _set_busy(self, text: str | None) -> None:
+        # long DB work runs on the executor; the dialog only shows progress
+        for b in (self.btn_continue, self.btn_new, self.btn_import, self.btn_delete, self.btn_restore):
+            b.setEnabled(text is None)
+
+        if text is None:
+            if self.busy is not None:
+                self.busy.close()
+                self.busy = None
+            return
+
+        self.busy = QProgressDialog(text, "", 0, 0, self)
+        self.busy.setWindowTitle("Подождите")
+        self.busy.setCancelButton(None)
+        self.busy.setWindowModality(Qt.WindowModal)
+        self.busy.setMinimumDuration(300)
+
     def on_continue(self) -> None:
         pid = self.profile_combo.currentData()
         if pid is None:
             return
         self.selected_profile_id = int(pid)
+        self.settings.setValue("open_last_profile", self.open_last.isChecked())
+        self.settings.setValue("last_profile_id", self.selected_profile_id)
         self.accept()
 
     def on_new(self) -> None:
@@ -114,12 +161,9 @@ class StartupDialog(QDialog):
         if not name:
             return
 
-        pid = self.db.create_profile(name, "light")
-        self.reload_profiles()
-
-        idx = self.profile_combo.findData(pid)
-        if idx >= 0:
-            self.profile_combo.setCurrentIndex(idx)
+        self.executor.write(self.db.create_profile, name, "light").then(
+            lambda pid: self.reload_profiles(select_pid=pid), self.on_db_error
+        )
 
     def on_import(self) -> None:
         path, _ = QFileDialog.getOpenFileName(
@@ -131,12 +175,12 @@ class StartupDialog(QDialog):
         if not path:
             return
 
-        try:
-            profiles = DB.read_profiles_from_db(path)
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка!", f"Некорректный файл базы данных.\n\n{e}")
-            return
+        self.executor.read(DB.read_profiles_from_db, path).then(
+            lambda profiles: self._choose_import(path, profiles),
+            lambda e: QMessageBox.critical(self, "Ошибка!", f"Некорректный файл базы данных.\n\n{e}"),
+        )
 
+    def _choose_import(self, path: str, profiles: list[tuple[int, str, str]]) -> None:
         if not profiles:
             QMessageBox.warning(self, "Пусто", "В выбранной базе нет профилей.")
             return
@@ -147,17 +191,40 @@ class StartupDialog(QDialog):
             return
 
         ext_pid = int(choice.split(":")[0])
+        ext_name = next(name for pid, name, _ in profiles if pid == ext_pid)
 
-        try:
-            new_pid = self.db.import_profile_from_db(path, ext_pid)
-        except Exception as e:
+        # a profile with the same name: merge into it, duplicates are skipped
+        into_pid = None
+        idx = self.profile_combo.findText(ext_name)
+        if idx >= 0:
+            r = QMessageBox.question(
+                self,
+                "Импорт профиля",
+                f"Профиль «{ext_name}» уже есть.\n\n"
+                "Да — добавить в него недостающие промты (дубликаты пропускаются).\n"
+                "Нет — создать отдельный профиль.",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel,
+            )
+            if r == QMessageBox.Cancel:
+                return
+            if r == QMessageBox.Yes:
+                into_pid = int(self.profile_combo.itemData(idx))
+
+        def done(res: ImportResult) -> None:
+            self._set_busy(None)
+            self.reload_profiles(select_pid=res.profile_id)
+            QMessageBox.information(
+                self,
+                "Импорт",
+                f"Импортировано промтов: {res.inserted}\nПропущено дубликатов: {res.skipped}",
+            )
+
+        def failed(e: Exception) -> None:
+            self._set_busy(None)
             QMessageBox.critical(self, "Ошибка!", f"Не смог импортировать профиль.\n\n{e}")
-            return
 
-        self.reload_profiles()
-        idx = self.profile_combo.findData(new_pid)
-        if idx >= 0:
-            self.profile_combo.setCurrentIndex(idx)
+        self._set_busy("Импорт профиля…")
+        self.executor.write(self.db.import_profile_from_db, path, ext_pid, into_pid).then(done, failed)
 
     def on_delete(self) -> None:
 
@@ -177,10 +244,49 @@ class StartupDialog(QDialog):
         if r != QMessageBox.Yes:
             return
 
-        try:
-            self.db.delete_profile(pid)
-        except Exception as e:
+        def done(_) -> None:
+            self._set_busy(None)
+            self.reload_profiles()
+
+        def failed(e: Exception) -> None:
+            self._set_busy(None)
             QMessageBox.critical(self, "Ошибка!", f"Не смог удалить профиль.\n\n{e}")
+
+        self._set_busy("Удаление профиля…")
+        self.executor.write(self.db.delete_profile, pid).then(done, failed)
+
+    def on_restore(self) -> None:
+        self.executor.read(list_backups, self.db.path).then(self._choose_backup, self.on_db_error)
+
+    def _choose_backup(self, backups: list[BackupInfo]) -> None:
+        if not backups:
+            QMessageBox.information(self, "Восстановление", "Резервных копий пока нет.")
             return
 
-        self.reload_profiles()
+        items = [f"{format_ts(b.created_at)}  ({b.size / (1024 * 1024):.1f} МБ)" for b in backups]
+        choice, ok = QInputDialog.getItem(self, "Восстановление", "Выбери копию:", items, 0, False)
+        if not ok or not choice:
+            return
+        backup = backups[items.index(choice)]
+
+        r = QMessageBox.question(
+            self,
+            "Восстановление",
+            f"Заменить все профили состоянием на {format_ts(backup.created_at)}?\n\n"
+            "Текущее состояние сначала сохраняется отдельной копией.",
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        if r != QMessageBox.Yes:
+            return
+
+        def done(_current: BackupInfo) -> None:
+            self._set_busy(None)
+            self.reload_profiles(select_pid=self.profile_combo.currentData())
+            QMessageBox.information(self, "Восстановление", "База восстановлена из копии.")
+
+        def failed(e: Exception) -> None:
+            self._set_busy(None)
+            QMessageBox.critical(self, "Ошибка!", f"Не смог восстановить копию.\n\n{e}")
+
+        self._set_busy("Восстановление из копии…")
+        self.executor.write(restore_backup, self.db, backup.path).then(done, failed)
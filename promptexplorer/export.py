@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import os
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+from .constants import APP_NAME
+from .db import DB
+from .models import Prompt
+from .utils import format_ts, now_iso
+
+
+# ============================================================
+# Streaming export
+# ============================================================
+#
+# Prompts are read in batches (DB.iter_prompts), rendered one by one into
+# text chunks and written as they come, so memory does not grow with the
+# number of prompts. The file is written next to the target as .part and
+# renamed at the end; a cancelled or failed export leaves nothing behind.
+
+class ExportCancelled(Exception):
+    pass
+
+
+# progress(done, total) -> False to cancel
+Progress = Callable[[int, int], bool]
+
+PROGRESS_EVERY = 500
+
+
+def render_prompt_text(p: Prompt) -> str:
+    return "\n".join([
+        f"Name: {p.name}",
+        "",
+        f"Type: {p.type}",
+        "",
+        f"Model: {p.model}",
+        "",
+        f"LoRA: {p.lora}".rstrip(),
+        "",
+        "",
+        f"Описание: {p.description}",
+        "",
+        "",
+        "Positive:",
+        p.positive,
+        "",
+        "",
+        "Negative:",
+        p.negative,
+        "",
+    ])
+
+
+def prompt_fields(p: Prompt) -> dict:
+    # files keep the text timestamps they always had
+    return {**p._asdict(), "created_at": format_ts(p.created_at), "updated_at": format_ts(p.updated_at)}
+
+
+# ---------------------------
+# Formats: each yields the file contents chunk by chunk
+# ---------------------------
+
+def _txt_chunks(prompts: Iterable[Prompt], header: list[str]) -> Iterator[str]:
+    yield "\n".join(header)
+    for p in prompts:
+        yield "\n" + render_prompt_text(p) + "\n" + "-" * 60 + "\n"
+
+
+def _jsonl_chunks(prompts: Iterable[Prompt], header: list[str]) -> Iterator[str]:
+    for p in prompts:
+        yield json.dumps(prompt_fields(p), ensure_ascii=False) + "\n"
+
+
+def _csv_rows(rows: Iterable[list[str]]) -> Iterator[str]:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    for row in rows:
+        w.writerow(row)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+CSV_FIELDS = ["id", "type", "name", "description", "positive", "negative", "lora", "model", "created_at", "updated_at"]
+
+
+def _csv_table(prompts: Iterable[Prompt]) -> Iterator[list[str]]:
+    yield CSV_FIELDS
+    for p in prompts:
+        fields = prompt_fields(p)
+        yield [str(fields[f]) for f in CSV_FIELDS]
+
+
+def _csv_chunks(prompts: Iterable[Prompt], header: list[str]) -> Iterator[str]:
+    yield from _csv_rows(_csv_table(prompts))
+
+
+def _styles_table(prompts: Iterable[Prompt]) -> Iterator[list[str]]:
+    # AUTOMATIC1111 styles.csv: name, prompt, negative_prompt
+    yield ["name", "prompt", "negative_prompt"]
+    for p in prompts:
+        positive = ", ".join(part for part in (p.positive.strip(), p.lora.strip()) if part)
+        yield [f"{p.type} / {p.name}", positive, p.negative]
+
+
+def _styles_chunks(prompts: Iterable[Prompt], header: list[str]) -> Iterator[str]:
+    yield from _csv_rows(_styles_table(prompts))
+
+
+class ExportFormat(NamedTuple):
+    title: str          # file dialog filter
+    encoding: str
+    newline: str | None  # "" for csv: the csv module writes its own line ends
+    chunks: Callable[[Iterable[Prompt], list[str]], Iterator[str]]
+
+
+EXPORT_FORMATS: dict[str, ExportFormat] = {
+    "txt": ExportFormat("Text files (*.txt)", "utf-8", None, _txt_chunks),
+    "jsonl": ExportFormat("JSON Lines (*.jsonl)", "utf-8", None, _jsonl_chunks),
+    "csv": ExportFormat("CSV (*.csv)", "utf-8-sig", "", _csv_chunks),
+    "styles": ExportFormat("A1111 styles.csv (*.csv)", "utf-8-sig", "", _styles_chunks),
+}
+
+
+def export_prompts(
+    db: DB,
+    profile_id: int,
+    type_id: int | None,
+    path: str,
+    fmt: str = "txt",
+    progress: Progress | None = None,
+) -> int:
+    spec = EXPORT_FORMATS[fmt]
+
+    profile = db.get_profile(profile_id)
+    if type_id is None:
+        total = db.stats_total(profile_id)
+        filter_name = "All"
+    else:
+        total = db.type_prompt_count(profile_id, type_id)
+        filter_name = db.get_type_name(profile_id, type_id)
+
+    header = [
+        f"{APP_NAME} — экспорт промтов",
+        f"Профиль: {profile['name'] if profile else ''}",
+        f"Дата: {now_iso()}",
+        f"Фильтр: {filter_name}",
+        "=" * 60,
+        "",
+    ]
+
+    done = 0
+
+    def counted() -> Iterator[Prompt]:
+        nonlocal done
+        for p in db.iter_prompts(profile_id, type_id):
+            yield p
+            done += 1
+            if progress is not None and done % PROGRESS_EVERY == 0 and not progress(done, total):
+                raise ExportCancelled()
+
+    tmp = path + ".part"
+    try:
+        with open(tmp, "w", encoding=spec.encoding, newline=spec.newline) as f:
+            for chunk in spec.chunks(counted(), header):
+                f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    if progress is not None:
+        progress(done, total)
+    return done
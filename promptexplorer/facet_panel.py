@@ -0,0 +1,160 @@
+from PySide6.QtCore import QDate, Qt, Signal
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QCheckBox,
+    QDateEdit,
+    QListWidget,
+    QListWidgetItem,
+    QPushButton,
+    QTabWidget,
+    QLabel,
+)
+
+from .models import FacetCounts, PromptFilter
+
+
+# ============================================================
+# Facet panel: types, models, LoRAs and a date range
+# ============================================================
+#
+# Only keeps the selection and shows the counts it is given
+# (DB.facet_counts, one query per refresh); MainWindow turns filter()
+# into list queries. A checked value stays listed with 0 when the other
+# facets leave it nothing, so it can still be unchecked.
+
+NO_MODEL = "(без модели)"
+
+
+class FacetPanel(QWidget):
+
+    # the selection changed (not emitted by set_counts)
+    changed = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.use_from = QCheckBox("С")
+        self.use_to = QCheckBox("по")
+        self.date_from = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.date_to = QDateEdit(QDate.currentDate())
+        for check, edit in ((self.use_from, self.date_from), (self.use_to, self.date_to)):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.setEnabled(False)
+            check.toggled.connect(edit.setEnabled)
+            check.toggled.connect(lambda _on: self.changed.emit())
+            edit.dateChanged.connect(lambda _d, check=check: check.isChecked() and self.changed.emit())
+
+        dates = QHBoxLayout()
+        dates.setContentsMargins(0, 0, 0, 0)
+        dates.addWidget(self.use_from)
+        dates.addWidget(self.date_from, 1)
+        dates.addWidget(self.use_to)
+        dates.addWidget(self.date_to, 1)
+
+        self.types = self._make_list()
+        self.models = self._make_list()
+        self.loras = self._make_list()
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.types, "Типы")
+        self.tabs.addTab(self.models, "Модели")
+        self.tabs.addTab(self.loras, "LoRA")
+
+        self.total = QLabel("")
+        self.total.setObjectName("Hint")
+        self.btn_reset = QPushButton("Сбросить")
+        self.btn_reset.clicked.connect(self.reset)
+
+        bottom = QHBoxLayout()
+        bottom.setContentsMargins(0, 0, 0, 0)
+        bottom.addWidget(self.total, 1)
+        bottom.addWidget(self.btn_reset)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel("Изменён:"))
+        layout.addLayout(dates)
+        layout.addWidget(self.tabs, 1)
+        layout.addLayout(bottom)
+
+    def _make_list(self) -> QListWidget:
+        lst = QListWidget()
+        lst.itemChanged.connect(lambda _item: self.changed.emit())
+        return lst
+
+    # ---------------------------
+    # Selection
+    # ---------------------------
+    @staticmethod
+    def _checked(lst: QListWidget) -> tuple:
+        return tuple(
+            lst.item(i).data(Qt.UserRole)
+            for i in range(lst.count())
+            if lst.item(i).checkState() == Qt.Checked
+        )
+
+    def filter(self) -> PromptFilter:
+        return PromptFilter(
+            type_ids=self._checked(self.types),
+            models=self._checked(self.models),
+            loras=self._checked(self.loras),
+            date_from=self.date_from.date().toString("yyyy-MM-dd") if self.use_from.isChecked() else None,
+            date_to=self.date_to.date().toString("yyyy-MM-dd") if self.use_to.isChecked() else None,
+        )
+
+    def is_active(self) -> bool:
+        return self.filter() != PromptFilter()
+
+    def reset(self) -> None:
+        # one "changed" for the whole reset
+        self.blockSignals(True)
+        for lst in (self.types, self.models, self.loras):
+            for i in range(lst.count()):
+                lst.item(i).setCheckState(Qt.Unchecked)
+        self.use_from.setChecked(False)
+        self.use_to.setChecked(False)
+        self.blockSignals(False)
+        self.changed.emit()
+
+    def clear(self) -> None:
+        # another profile: its values are different
+        self.blockSignals(True)
+        for lst in (self.types, self.models, self.loras):
+            lst.clear()
+        self.use_from.setChecked(False)
+        self.use_to.setChecked(False)
+        self.blockSignals(False)
+        self.total.setText("")
+
+    # ---------------------------
+    # Counts
+    # ---------------------------
+    def set_counts(self, counts: FacetCounts) -> None:
+        self._fill(self.types, [(tid, name, n) for tid, name, n in counts.types])
+        self._fill(self.models, [(m, m or NO_MODEL, n) for m, n in counts.models])
+        self._fill(self.loras, [(name, name, n) for name, n in counts.loras])
+        self.total.setText(f"Промтов: {counts.total}")
+
+    def _fill(self, lst: QListWidget, values: list[tuple[object, str, int]]) -> None:
+        checked = set(self._checked(lst))
+        shown = {key for key, _, _ in values}
+        labels = {lst.item(i).data(Qt.UserRole): lst.item(i).data(Qt.UserRole + 1) for i in range(lst.count())}
+        values = values + [(key, labels.get(key, str(key)), 0) for key in checked if key not in shown]
+
+        scroll = lst.verticalScrollBar().value()
+        lst.blockSignals(True)
+        lst.setUpdatesEnabled(False)
+        lst.clear()
+        for key, label, n in values:
+            item = QListWidgetItem(f"{label}  ({n})")
+            item.setData(Qt.UserRole, key)
+            item.setData(Qt.UserRole + 1, label)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if key in checked else Qt.Unchecked)
+            lst.addItem(item)
+        lst.verticalScrollBar().setValue(scroll)
+        lst.setUpdatesEnabled(True)
+        lst.blockSignals(False)
@@ -1,16 +1,21 @@
-from PySide6.QtCore import Qt, QPoint, QSize, QSettings
+from PySide6.QtCore import Qt, QModelIndex, QPoint, QSize, QSettings, QTimer, Signal
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QMainWindow,
     QWidget,
     QSplitter,
     QVBoxLayout,
     QHBoxLayout,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
+    QGridLayout,
+    QHeaderView,
+    QTableWidget,
+    QTableWidgetItem,
     QTreeWidget,
     QTreeWidgetItem,
     QLabel,
+    QLineEdit,
     QPushButton,
     QTextEdit,
     QMessageBox,
@@ -19,16 +24,29 @@ from PySide6.QtWidgets import (
     QTabWidget,
     QInputDialog,
     QComboBox,
+    QDoubleSpinBox,
     QToolBar,
     QMenu,
+    QProgressDialog,
     QSizePolicy,
 )
 
-from .constants import APP_NAME, THEME_ICON_PX, THEME_BTN_SIZE
+from .constants import (
+    APP_NAME, THEME_ICON_PX, THEME_BTN_SIZE, SEARCH_DEBOUNCE_MS, PREFETCH_NEIGHBOURS, PAGE_SIZE, SIMILAR_LIMIT,
+    EXTERNAL_POLL_MS,
+)
+from .activity_chart import ActivityChart
 from .db import DB
-from .models import Prompt
+from . import export
+from .db_executor import DBExecutor, TaskProgress
+from .models import Change, ChangeKind, DuplicateGroup, FacetCounts, ProfileStats, Prompt, PromptFilter, PromptSummary
 from .dialogs.prompt_dialog import PromptDialog
-from .utils import center_dialog, now_iso, theme_qss
+from .facet_panel import FacetPanel
+from .prompt_list_model import FetchPage, PromptListModel
+from .qt_utils import center_dialog
+from .theme import apply_theme, normalize_theme
+from .type_list_model import TypeListModel
+from .utils import format_ts
 
 
 # ============================================================
@@ -37,9 +55,13 @@ from .utils import center_dialog, now_iso, theme_qss
 
 class MainWindow(QMainWindow):
 
+    # the first prompt page of the first profile is on screen
+    interactive = Signal()
+
     def __init__(
         self,
-        db: DB,
+        db: DB | None,
+        executor: DBExecutor | None,
         icon: QIcon,
         moon_icon: QIcon | None,
         sun_icon: QIcon | None,
@@ -50,19 +72,24 @@ class MainWindow(QMainWindow):
         super().__init__()
 
         self.db = db
+        self.executor = executor
         self.icon = icon
         self.moon_icon = moon_icon
         self.sun_icon = sun_icon
         self.settings = settings
 
         self.profile_id = int(profile_id)
-        self.theme = theme if theme in ("light", "dark") else "light"
+        self.theme = normalize_theme(theme)
 
         self.apply_theme()
 
-        prof = self.db.get_profile(self.profile_id)
-        self.profile_name = prof["name"] if prof else "Unknown"
-        self.setWindowTitle(f"{APP_NAME} — {self.profile_name}")
+        self.profile_name = ""
+        # prompt created by this window: selected once its row shows up
+        self._pending_select: int | None = None
+        # type names of the profile, kept in sync with the tree; feeds the prompt dialog
+        self.type_names = TypeListModel(self)
+        self._prompt_dialog: PromptDialog | None = None
+        self.setWindowTitle(APP_NAME)
         self.setWindowIcon(icon)
 
         self.resize(1200, 720)
@@ -74,8 +101,43 @@ class MainWindow(QMainWindow):
 
         self._build_prompts_tab()
         self._build_stats_tab()
+        self._build_dupes_tab()
+
+        # Without a DB yet this is an (inactive) shell that can be painted
+        # right away; app.main() calls start() once the DB is open.
+        self._started = False
+        if db is not None and executor is not None:
+            self.start(db, executor)
+        else:
+            self.tabs.setEnabled(False)
+            self.profile_combo.setEnabled(False)
 
+    def start(self, db: DB, executor: DBExecutor) -> None:
+        self.db = db
+        self.executor = executor
+        self.list_model.executor = executor
+
+        self.tabs.setEnabled(True)
+        self.profile_combo.setEnabled(True)
+
+        self.settings.setValue("last_profile_id", self.profile_id)
+        self.executor.changed.connect(self.on_db_changed)
+        self.reload_profiles_into_combo()
         self.refresh_all()
+        # built on the first idle turn, so the first "new prompt" opens at once
+        QTimer.singleShot(0, self.prompt_dialog)
+
+        # scripts / another window writing the same file: their commits come
+        # back through on_db_changed like ours (DB.poll_external_changes)
+        self.poll_external_changes()
+        self.external_timer = QTimer(self)
+        self.external_timer.setInterval(EXTERNAL_POLL_MS)
+        self.external_timer.timeout.connect(self.poll_external_changes)
+        self.external_timer.start()
+
+    def poll_external_changes(self) -> None:
+        # a failed poll (file busy, gone) is simply tried again on the next tick
+        self.executor.read(self.db.poll_external_changes, key="external").then(lambda _n: None, lambda _e: None)
 
     # ---------------------------
     # Window close confirmation
@@ -96,8 +158,8 @@ class MainWindow(QMainWindow):
     # Theme handling
     # ---------------------------
     def apply_theme(self) -> None:
-        from PySide6.QtWidgets import QApplication
-        QApplication.instance().setStyleSheet(theme_qss(self.theme))
+        # app-wide; dialogs inherit it
+        apply_theme(self.theme)
 
     def update_theme_button(self) -> None:
         if self.theme == "light":
@@ -152,14 +214,16 @@ class MainWindow(QMainWindow):
 
         tb.addWidget(self.theme_btn)
 
-        self.reload_profiles_into_combo()
         self.update_theme_button()
 
     def reload_profiles_into_combo(self) -> None:
+        self.executor.read(self.db.list_profiles, key="profiles").then(self._fill_profiles, self.on_db_error)
+
+    def _fill_profiles(self, profiles: list[tuple[int, str, str]]) -> None:
         self.profile_combo.blockSignals(True)
         self.profile_combo.clear()
 
-        for pid, name, _ in self.db.list_profiles():
+        for pid, name, _ in profiles:
             self.profile_combo.addItem(name, pid)
 
         idx = self.profile_combo.findData(self.profile_id)
@@ -167,6 +231,11 @@ class MainWindow(QMainWindow):
             self.profile_combo.setCurrentIndex(idx)
 
         self.profile_combo.blockSignals(False)
+        self._set_profile_name(self.profile_combo.currentText() if idx >= 0 else "Unknown")
+
+    def _set_profile_name(self, name: str) -> None:
+        self.profile_name = name
+        self.setWindowTitle(f"{APP_NAME} — {self.profile_name}")
 
     def on_profile_changed(self) -> None:
         pid = self.profile_combo.currentData()
@@ -174,13 +243,14 @@ class MainWindow(QMainWindow):
             return
 
         self.profile_id = int(pid)
-
-        prof = self.db.get_profile(self.profile_id)
-        self.profile_name = prof["name"] if prof else "Unknown"
-        self.setWindowTitle(f"{APP_NAME} — {self.profile_name}")
+        self.settings.setValue("last_profile_id", self.profile_id)
+        self._set_profile_name(self.profile_combo.currentText())
 
         self.refresh_all()
 
+    def on_db_error(self, err: Exception) -> None:
+        QMessageBox.warning(self, "Ошибка!", str(err))
+
     # ---------------------------
     # UI helpers
     # ---------------------------
@@ -194,6 +264,17 @@ class MainWindow(QMainWindow):
 
         return card
 
+    def _make_list_view(self, model: PromptListModel) -> QListView:
+        view = QListView()
+        # uniform rows: Qt lays out the list without measuring every item
+        view.setUniformItemSizes(True)
+        # a relayout (theme switch, resize) is done a page of rows per
+        # event-loop turn instead of all rows at once
+        view.setLayoutMode(QListView.Batched)
+        view.setBatchSize(PAGE_SIZE)
+        view.setModel(model)
+        return view
+
     # ---------------------------
     # Tabs build
     # ---------------------------
@@ -213,18 +294,58 @@ class MainWindow(QMainWindow):
 
         self.tree = QTreeWidget()
         self.tree.setHeaderHidden(True)
+        # name | prompt count
+        self.tree.setColumnCount(2)
+        self.tree.header().setStretchLastSection(False)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.tree.itemSelectionChanged.connect(self.on_type_changed)
 
         # (rename/delete)
         self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self.on_type_context_menu)
 
-        left_layout.addWidget(self.btn_add_type)
-        left_layout.addWidget(self.tree)
+        # model / LoRA / type / date facets, applied on top of the selected type
+        self.facets = FacetPanel()
+        self.facets.changed.connect(self.on_filter_changed)
 
-        # ---- middle: prompts list ----
-        self.list = QListWidget()
-        self.list.currentItemChanged.connect(self.on_prompt_selected)
+        left_split = QSplitter(Qt.Vertical)
+        left_split.addWidget(self.tree)
+        left_split.addWidget(self.facets)
+        left_split.setStretchFactor(0, 1)
+        left_split.setStretchFactor(1, 1)
+
+        left_layout.addWidget(self.btn_add_type)
+        left_layout.addWidget(left_split)
+
+        # ---- middle: search + prompts list ----
+        mid_col = QWidget()
+        mid_layout = QVBoxLayout(mid_col)
+        mid_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Поиск: имя, описание, теги, LoRA, модель…")
+        self.search.setClearButtonEnabled(True)
+
+        # debounce: one query after the user pauses typing
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.refresh_list)
+        self.search.textChanged.connect(lambda _txt: self.search_timer.start())
+
+        self.list_model = PromptListModel(self.executor, parent=self)
+        self.list_model.firstPageLoaded.connect(self.on_list_loaded)
+        self.list_model.firstPageFailed.connect(self.on_list_failed)
+        self.list = self._make_list_view(self.list_model)
+        self.list.selectionModel().currentChanged.connect(self.on_prompt_selected)
+        # Ctrl / Shift + click: bulk edits of the selected prompts
+        self.list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.list.customContextMenuRequested.connect(self.on_list_context_menu)
+
+        mid_layout.addWidget(self.search)
+        mid_layout.addWidget(self.list)
 
         # ---- right: buttons + detail ----
         right = QWidget()
@@ -237,23 +358,40 @@ class MainWindow(QMainWindow):
         self.btn_new = QPushButton("Создать")
         self.btn_edit = QPushButton("Редактировать")
         self.btn_del = QPushButton("Удалить")
-        self.btn_export = QPushButton("Выгрузить .txt")
+        self.btn_bulk = QPushButton("Выбранные")
+        self.btn_export = QPushButton("Выгрузить…")
 
         self.btn_new.clicked.connect(self.create_prompt)
         self.btn_edit.clicked.connect(self.edit_prompt)
         self.btn_del.clicked.connect(self.delete_prompt)
+        self.btn_bulk.setMenu(self._make_bulk_menu())
         self.btn_export.clicked.connect(self.export_prompts)
 
-        for b in (self.btn_new, self.btn_edit, self.btn_del, self.btn_export):
+        for b in (self.btn_new, self.btn_edit, self.btn_del, self.btn_bulk, self.btn_export):
             btn_row.addWidget(b)
         btn_row.addStretch(1)
 
+        # similar prompts: computed only while their tab is shown
+        self.similar_tree = QTreeWidget()
+        self.similar_tree.setHeaderLabels(["Промт", "Тип", "Сходство"])
+        self.similar_tree.setRootIsDecorated(False)
+        self.similar_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.similar_tree.header().setStretchLastSection(False)
+        self.similar_tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.similar_tree.header().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        self.similar_tree.itemDoubleClicked.connect(self.on_prompt_item_double_clicked)
+
+        self.detail_tabs = QTabWidget()
+        self.detail_tabs.addTab(self.detail, "Промт")
+        self.detail_tabs.addTab(self.similar_tree, "Похожие")
+        self.detail_tabs.currentChanged.connect(lambda _i: self.refresh_similar())
+
         r.addLayout(btn_row)
-        r.addWidget(self.detail)
+        r.addWidget(self.detail_tabs)
 
         # ---- splitter composition ----
         splitter.addWidget(self._wrap_card(left_col))
-        splitter.addWidget(self._wrap_card(self.list))
+        splitter.addWidget(self._wrap_card(mid_col))
         splitter.addWidget(self._wrap_card(right))
 
         splitter.setStretchFactor(0, 1)
@@ -264,43 +402,155 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(page, "Промты")
 
     def _build_stats_tab(self) -> None:
-        page = QWidget()
-        layout = QVBoxLayout(page)
+        # Only the page: its tables are built the first time it is shown.
+        self.stats_page = QWidget()
+        self.stats_built = False
+        self._stats_dirty = True
+        self.tabs.addTab(self.stats_page, "Статистика")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+
+    def _build_stats_content(self) -> None:
+        self.stats_built = True
+        layout = QVBoxLayout(self.stats_page)
 
         self.stats_label = QLabel("")
         self.stats_label.setObjectName("Hint")
         self.stats_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
 
-        self.stats_list = QListWidget()
-        self.stats_list.itemSelectionChanged.connect(self.on_stats_selected)
-
-        self.stats_detail = QTextEdit()
-        self.stats_detail.setReadOnly(True)
-
-        layout.addWidget(self._wrap_card(self.stats_label))
-        layout.addWidget(self._wrap_card(self.stats_list))
-        layout.addWidget(self._wrap_card(self.stats_detail))
+        self.stats_period = QComboBox()
+        self.stats_period.addItem("По дням", "day")
+        self.stats_period.addItem("По неделям", "week")
+        self.stats_period.addItem("По месяцам", "month")
+        self.stats_period.currentIndexChanged.connect(lambda _i: self.refresh_stats())
+
+        head = QWidget()
+        head_layout = QHBoxLayout(head)
+        head_layout.setContentsMargins(0, 0, 0, 0)
+        head_layout.addWidget(self.stats_label, 1)
+        head_layout.addWidget(QLabel("Активность:"))
+        head_layout.addWidget(self.stats_period)
+
+        self.stats_types = self._make_stats_table(["Тип", "Промтов"])
+        self.stats_models = self._make_stats_table(["Модель", "Промтов"])
+        self.stats_loras = self._make_stats_table(["LoRA", "Промтов"])
+        self.stats_activity = self._make_stats_table(["Период", "Создано", "Обновлено"])
+
+        grid = QGridLayout()
+        for i, table in enumerate((self.stats_types, self.stats_models, self.stats_loras, self.stats_activity)):
+            grid.addWidget(self._wrap_card(table), i // 2, i % 2)
+        self.stats_chart = ActivityChart()
+        grid.addWidget(self._wrap_card(self.stats_chart), 2, 0, 1, 2)
+
+        layout.addWidget(self._wrap_card(head))
+        layout.addLayout(grid, 1)
+
+    def _build_dupes_tab(self) -> None:
+        page = QWidget()
+        layout = QVBoxLayout(page)
 
-        self.tabs.addTab(page, "Статистика")
+        hint = QLabel("Почти одинаковые промты: сравниваются наборы тегов positive / negative.")
+        hint.setObjectName("Hint")
+
+        self.dup_threshold = QDoubleSpinBox()
+        self.dup_threshold.setRange(0.5, 1.0)
+        self.dup_threshold.setSingleStep(0.05)
+        self.dup_threshold.setValue(0.8)
+        self.dup_threshold.setToolTip("Минимальное сходство наборов тегов (Жаккар)")
+
+        self.btn_find_dupes = QPushButton("Найти дубликаты")
+        self.btn_find_dupes.clicked.connect(self.find_duplicates)
+
+        head = QWidget()
+        head_layout = QHBoxLayout(head)
+        head_layout.setContentsMargins(0, 0, 0, 0)
+        head_layout.addWidget(hint, 1)
+        head_layout.addWidget(QLabel("Сходство от:"))
+        head_layout.addWidget(self.dup_threshold)
+        head_layout.addWidget(self.btn_find_dupes)
+
+        self.dup_tree = QTreeWidget()
+        self.dup_tree.setHeaderLabels(["Промт", "Тип", "Изменён"])
+        self.dup_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.dup_tree.header().setStretchLastSection(False)
+        self.dup_tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.dup_tree.header().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        self.dup_tree.itemDoubleClicked.connect(self.on_prompt_item_double_clicked)
+
+        self.btn_dup_keep = QPushButton("Оставить выбранный, удалить остальные")
+        self.btn_dup_keep.clicked.connect(self.keep_selected_duplicate)
+        self.btn_dup_delete = QPushButton("Удалить выбранный")
+        self.btn_dup_delete.clicked.connect(self.delete_selected_duplicate)
+
+        actions = QHBoxLayout()
+        actions.addStretch(1)
+        actions.addWidget(self.btn_dup_keep)
+        actions.addWidget(self.btn_dup_delete)
+
+        body = QWidget()
+        body_layout = QVBoxLayout(body)
+        body_layout.setContentsMargins(0, 0, 0, 0)
+        body_layout.addWidget(self.dup_tree, 1)
+        body_layout.addLayout(actions)
+
+        layout.addWidget(self._wrap_card(head))
+        layout.addWidget(self._wrap_card(body), 1)
+        self.tabs.addTab(page, "Дубликаты")
+
+    def _make_stats_table(self, headers: list[str]) -> QTableWidget:
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectRows)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        for col in range(1, len(headers)):
+            table.horizontalHeader().setSectionResizeMode(col, QHeaderView.ResizeToContents)
+        return table
 
     # ---------------------------
     # Types / category logic
     # ---------------------------
-    def refresh_types(self) -> None:
+    def refresh_types(self, select_name: str | None = None) -> None:
+        self.executor.read(self.db.list_types, self.profile_id, key="types").then(
+            lambda types: self._fill_types(types, select_name), self.on_db_error
+        )
+
+    def _fill_types(self, types: list[tuple[int, str]], select_name: str | None) -> None:
         self.tree.clear()
+        self.type_names.reset(types)
 
         # All: type_id = None
         all_item = QTreeWidgetItem(["All"])
         all_item.setData(0, Qt.UserRole, None)
         self.tree.addTopLevelItem(all_item)
 
-        for tid, name in self.db.list_types(self.profile_id):
+        current = all_item
+        for tid, name in types:
             it = QTreeWidgetItem([name])
             it.setData(0, Qt.UserRole, tid)
             self.tree.addTopLevelItem(it)
+            if name == select_name:
+                current = it
 
         self.tree.expandAll()
-        self.tree.setCurrentItem(all_item)
+        # selecting the type (re)loads the prompt list
+        self.tree.setCurrentItem(current)
+        self.refresh_type_counts()
+
+    def refresh_type_counts(self) -> None:
+        # one read of the stats_type counters for all types; bursts of
+        # changes collapse into the last request
+        self.executor.read(self.db.type_counts, self.profile_id, key="type_counts").then(
+            self._apply_type_counts, self.on_db_error
+        )
+
+    def _apply_type_counts(self, counts: dict[int, int]) -> None:
+        total = sum(counts.values())
+        for i in range(self.tree.topLevelItemCount()):
+            it = self.tree.topLevelItem(i)
+            tid = it.data(0, Qt.UserRole)
+            it.setText(1, str(total if tid is None else counts.get(tid, 0)))
+            it.setTextAlignment(1, Qt.AlignRight | Qt.AlignVCenter)
 
     def current_type_id(self) -> int | None:
         it = self.tree.currentItem()
@@ -316,17 +566,10 @@ class MainWindow(QMainWindow):
         if not name:
             return
 
-        try:
-            self.db.create_type_if_missing(self.profile_id, name)
-        except Exception as e:
-            QMessageBox.warning(self, "Ошибка!", f"Не смог создать тип:\n{e}")
-            return
-
-        self.refresh_types()
-
-        items = self.tree.findItems(name, Qt.MatchExactly | Qt.MatchRecursive, 0)
-        if items:
-            self.tree.setCurrentItem(items[0])
+        self.executor.write(self.db.create_type_if_missing, self.profile_id, name).then(
+            lambda tid: self.tree.setCurrentItem(self._insert_type_item(tid, name)),
+            lambda e: QMessageBox.warning(self, "Ошибка!", f"Не смог создать тип:\n{e}"),
+        )
 
     def on_type_context_menu(self, pos: QPoint) -> None:
         item = self.tree.itemAt(pos)
@@ -348,7 +591,11 @@ class MainWindow(QMainWindow):
             self.delete_type(int(type_id))
 
     def rename_type(self, type_id: int) -> None:
-        old_name = self.db.get_type_name(self.profile_id, type_id)
+        self.executor.read(self.db.get_type_name, self.profile_id, type_id).then(
+            lambda old_name: self._rename_type(type_id, old_name), self.on_db_error
+        )
+
+    def _rename_type(self, type_id: int, old_name: str) -> None:
         new_name, ok = QInputDialog.getText(self, "Переименовать тип", "Новое имя:", text=old_name)
         if not ok:
             return
@@ -356,21 +603,23 @@ class MainWindow(QMainWindow):
         if not new_name:
             return
 
-        try:
-            self.db.rename_type(self.profile_id, type_id, new_name)
-        except ValueError:
-            QMessageBox.warning(self, "Ошибка!", "Такое имя уже есть.")
-            return
-        except Exception as e:
-            QMessageBox.warning(self, "Ошибка!", str(e))
-            return
+        def failed(e: Exception) -> None:
+            if isinstance(e, ValueError):
+                QMessageBox.warning(self, "Ошибка!", "Такое имя уже есть.")
+            else:
+                QMessageBox.warning(self, "Ошибка!", str(e))
 
-        self.refresh_all()
+        self.executor.write(self.db.rename_type, self.profile_id, type_id, new_name).then(lambda _: None, failed)
 
     def delete_type(self, type_id: int) -> None:
-        name = self.db.get_type_name(self.profile_id, type_id)
-        cnt = self.db.type_prompt_count(self.profile_id, type_id)
+        profile_id = self.profile_id
 
+        def load() -> tuple[str, int]:
+            return self.db.get_type_name(profile_id, type_id), self.db.type_prompt_count(profile_id, type_id)
+
+        self.executor.read(load).then(lambda r: self._delete_type(type_id, *r), self.on_db_error)
+
+    def _delete_type(self, type_id: int, name: str, cnt: int) -> None:
         if cnt > 0:
             r = QMessageBox.question(
                 self,
@@ -389,184 +638,571 @@ class MainWindow(QMainWindow):
         if r != QMessageBox.Yes:
             return
 
-        self.db.delete_type_and_prompts(self.profile_id, type_id)
-        self.refresh_all()
+        self.executor.write(self.db.delete_type_and_prompts, self.profile_id, type_id).then(
+            lambda _: None, self.on_db_error
+        )
 
     # ---------------------------
     # Prompts list / detail / stats
     # ---------------------------
-    def refresh_list(self) -> None:
-        self.list.clear()
+    def _list_source(self, type_id: int | None, flt: PromptFilter) -> FetchPage:
+        profile_id = self.profile_id
 
-        type_id = self.current_type_id()
-        prompts = self.db.list_prompts(self.profile_id, type_id)
+        def fetch(after, limit):
+            rows = self.db.list_prompt_summaries(profile_id, type_id, after, limit, flt)
+            cursor = (rows[-1].updated_at, rows[-1].id) if len(rows) == limit else None
+            return rows, cursor
+
+        return fetch
+
+    def _search_source(self, query: str, type_id: int | None, flt: PromptFilter) -> FetchPage:
+        profile_id = self.profile_id
+
+        def fetch(offset, limit):
+            offset = offset or 0
+            hits = self.db.search_prompts(profile_id, query, type_id, limit, offset, flt)
+            cursor = offset + len(hits) if len(hits) == limit else None
+            return hits, cursor
+
+        return fetch
 
-        for p in prompts:
-            it = QListWidgetItem(f"[{p.type}] {p.name}")
-            it.setData(Qt.UserRole, p.id)
-            self.list.addItem(it)
+    def refresh_list(self) -> None:
+        type_id = self.current_type_id()
+        query = self.search.text().strip()
+        flt = self.facets.filter()
 
-        if self.list.count() > 0:
-            self.list.setCurrentRow(0)
+        if query:
+            self.list_model.set_source(self._search_source(query, type_id, flt))
         else:
-            self.detail.setPlainText("Создайте промт.")
+            self.list_model.set_source(self._list_source(type_id, flt))
 
-    def refresh_stats(self) -> None:
-        total = self.db.stats_total(self.profile_id)
-        self.stats_label.setText(f"Профиль: {self.profile_name}\nВсего промтов: {total}")
+    def on_filter_changed(self) -> None:
+        self.refresh_list()
+        self.refresh_facets()
 
-        self.stats_list.clear()
-        for p in self.db.list_prompts(self.profile_id, None):
-            it = QListWidgetItem(f"[{p.type}] {p.name}")
-            it.setData(Qt.UserRole, p.id)
-            self.stats_list.addItem(it)
+    def refresh_facets(self) -> None:
+        # every facet's counts in one query; arrow keys in the tree: only the last one
+        if self.executor is None:
+            return
+        self.executor.read(
+            self.db.facet_counts, self.profile_id, self.current_type_id(), self.facets.filter(), key="facets"
+        ).then(self._apply_facet_counts, self.on_db_error)
+
+    def _apply_facet_counts(self, counts: FacetCounts) -> None:
+        self.facets.set_counts(counts)
+
+    def _mark_interactive(self) -> None:
+        # the first list of the session is in (or failed): startup is over
+        if not self._started:
+            self._started = True
+            self.interactive.emit()
 
-        if self.stats_list.count() == 0:
-            self.stats_detail.setPlainText("Пока пусто.")
+    def on_list_loaded(self, count: int) -> None:
+        self._mark_interactive()
+
+        if count > 0:
+            self.list.setCurrentIndex(self.list_model.index(0))
+            return
+        self.similar_tree.clear()
+        if self.search.text().strip():
+            self.detail.setPlainText("Ничего не найдено.")
         else:
-            self.stats_list.setCurrentRow(0)
+            self.detail.setPlainText("Создайте промт.")
+
+    def on_list_failed(self, err: Exception) -> None:
+        self._mark_interactive()
+        self.on_db_error(err)
+
+    def refresh_stats(self) -> None:
+        # the counters are materialized (stats_* tables), but there is no point
+        # re-reading them for a hidden tab: it is refreshed when shown
+        if self.tabs.currentWidget() is not self.stats_page or self.executor is None:
+            self._stats_dirty = True
+            return
+        if not self.stats_built:
+            self._build_stats_content()
+        self._stats_dirty = False
+        self.executor.read(
+            self.db.profile_stats, self.profile_id, self.stats_period.currentData(), key="stats"
+        ).then(self._fill_stats, self.on_db_error)
+
+    def on_tab_changed(self, _index: int) -> None:
+        if self._stats_dirty:
+            self.refresh_stats()
+
+    def _fill_stats(self, st: ProfileStats) -> None:
+        self.stats_label.setText(
+            f"Профиль: {self.profile_name}\n"
+            f"Всего промтов: {st.total}\n"
+            f"Средняя длина: positive {st.avg_positive:.0f}, negative {st.avg_negative:.0f} симв."
+        )
+        self._fill_table(self.stats_types, st.by_type)
+        self._fill_table(self.stats_models, [(m or "—", n) for m, n in st.by_model])
+        self._fill_table(self.stats_loras, st.by_lora)
+        self._fill_table(self.stats_activity, st.activity)
+        self.stats_chart.set_activity(st.activity)
+
+    def _fill_table(self, table: QTableWidget, rows: list[tuple]) -> None:
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                item = QTableWidgetItem(str(value))
+                if isinstance(value, int):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(r, c, item)
+        table.setUpdatesEnabled(True)
 
     def refresh_all(self) -> None:
+        # duplicate groups, similar prompts and facet values belong to the previous profile
+        self.dup_tree.clear()
+        self.similar_tree.clear()
+        self.facets.clear()
+        # the prompt list follows: refresh_types re-selects a type
         self.refresh_types()
-        self.refresh_list()
         self.refresh_stats()
 
     def on_type_changed(self) -> None:
         self.refresh_list()
+        self.refresh_facets()
 
-    def on_prompt_selected(self, current: QListWidgetItem, prev: QListWidgetItem) -> None:
-        if not current:
-            return
-        pid = int(current.data(Qt.UserRole))
-        p = self.db.get_prompt(pid)
-        self.detail.setPlainText(self.render_prompt_text(p) if p else "Промт не найден.")
+    def _show_prompt(self, target: QTextEdit, p: Prompt | None) -> None:
+        target.setPlainText(export.render_prompt_text(p) if p else "Промт не найден.")
 
-    def on_stats_selected(self) -> None:
-        item = self.stats_list.currentItem()
-        if not item:
+    def on_prompt_selected(self, current: QModelIndex, prev: QModelIndex) -> None:
+        if not current.isValid():
             return
-        pid = int(item.data(Qt.UserRole))
-        p = self.db.get_prompt(pid)
-        self.stats_detail.setPlainText(self.render_prompt_text(p) if p else "Промт не найден.")
+        pid = int(current.data(PromptListModel.IdRole))
+        # holding an arrow key: only the last selection is loaded
+        self.executor.read(self.db.get_prompt, pid, key="detail").then(
+            lambda p: self._show_prompt(self.detail, p), self.on_db_error
+        )
+        self._prefetch_around(self.list_model, current.row())
+        self.refresh_similar()
+
+    def _prefetch_around(self, model: PromptListModel, row: int) -> None:
+        # rows next to the selection are the likely next ones (arrow keys)
+        ids = [
+            model.prompt_id(r)
+            for r in range(row - PREFETCH_NEIGHBOURS, row + PREFETCH_NEIGHBOURS + 1)
+            if r != row and model.prompt_id(r) is not None
+        ]
+        if ids:
+            self.executor.read(self.db.prefetch_prompts, ids, key=f"prefetch-{id(model)}")
 
     def selected_prompt_id(self) -> int | None:
-        item = self.list.currentItem()
-        return int(item.data(Qt.UserRole)) if item else None
+        return self.list_model.prompt_id(self.list.currentIndex().row())
+
+    def selected_prompt_ids(self) -> list[int]:
+        # the whole multi-selection, in list order; the current row if nothing is selected
+        rows = sorted(ix.row() for ix in self.list.selectionModel().selectedIndexes())
+        ids = [pid for pid in map(self.list_model.prompt_id, rows) if pid is not None]
+        if not ids and self.selected_prompt_id() is not None:
+            ids = [self.selected_prompt_id()]
+        return ids
 
     # ---------------------------
-    # CRUD for prompts
+    # Incremental updates (DB change events)
     # ---------------------------
-    def create_prompt(self) -> None:
-        types = [name for _, name in self.db.list_types(self.profile_id)]
-        dlg = PromptDialog(types, self.icon, self.theme, existing=None)
-        center_dialog(dlg, self)
+    def on_db_changed(self, change: Change) -> None:
+        kind = change.kind
 
-        if dlg.exec() != QDialog.Accepted:
+        if kind in (ChangeKind.PROFILE_CREATED, ChangeKind.PROFILE_DELETED):
+            self.reload_profiles_into_combo()
+            return
+        if change.profile_id != self.profile_id:
             return
 
-        d = dlg.data()
-        self.db.upsert_prompt(self.profile_id, None, **d)
-        self.refresh_all()
+        if kind in (ChangeKind.PROMPTS_INSERTED, ChangeKind.PROMPTS_UPDATED) and len(change.ids) > PAGE_SIZE:
+            # a bulk change (import, bulk edit): cheaper to page the list again
+            self.refresh_list()
+        elif kind in (ChangeKind.PROMPTS_INSERTED, ChangeKind.PROMPTS_UPDATED):
+            # only the rows still passing the type / facet filter come back
+            self.executor.read(
+                self.db.matching_prompt_summaries,
+                self.profile_id, list(change.ids), self.current_type_id(), self.facets.filter(),
+            ).then(lambda rows: self._apply_prompt_rows(kind, change.ids, rows), self.on_db_error)
+        elif kind == ChangeKind.PROMPTS_DELETED:
+            self.list_model.remove_ids(change.ids)
+            self._remove_dup_ids(change.ids)
+        elif kind == ChangeKind.PROMPTS_RELOADED:
+            # changed by another process, deleted ones unknown: the list is paged again
+            self.refresh_list()
+        elif kind in (ChangeKind.TYPE_CREATED, ChangeKind.TYPE_RENAMED):
+            for tid in change.ids:
+                self.executor.read(self.db.get_type_name, self.profile_id, tid).then(
+                    lambda name, tid=tid: self._apply_type_name(tid, name), self.on_db_error
+                )
+        elif kind == ChangeKind.TYPE_DELETED:
+            for tid in change.ids:
+                self._remove_type_item(tid)
+                self.list_model.remove_type(tid)
+
+        if kind in (
+            ChangeKind.PROMPTS_INSERTED, ChangeKind.PROMPTS_UPDATED, ChangeKind.PROMPTS_DELETED,
+            ChangeKind.PROMPTS_RELOADED,
+        ):
+            self.refresh_similar()
+        self.refresh_type_counts()
+        self.refresh_facets()
+        self.refresh_stats()
+
+    def _apply_prompt_rows(self, kind: ChangeKind, changed: tuple[int, ...], rows: list[PromptSummary]) -> None:
+        ids = {r.id for r in rows}
+
+        self.list_model.patch(rows)
+        # edited out of the selected type or the facets
+        self.list_model.remove_ids([i for i in changed if i not in ids])
+
+        # search results keep their ranking: edits are patched, new rows wait for the next query
+        if kind == ChangeKind.PROMPTS_INSERTED and not self.search.text().strip():
+            self.list_model.prepend(rows)
+        elif kind == ChangeKind.PROMPTS_UPDATED and self.selected_prompt_id() in ids:
+            self.executor.read(self.db.get_prompt, self.selected_prompt_id(), key="detail").then(
+                lambda p: self._show_prompt(self.detail, p), self.on_db_error
+            )
+
+        if self._pending_select in ids:
+            row = self.list_model.row_of(self._pending_select)
+            if row >= 0:
+                self.list.setCurrentIndex(self.list_model.index(row))
+            self._pending_select = None
+
+    def _type_item(self, type_id: int) -> QTreeWidgetItem | None:
+        for i in range(self.tree.topLevelItemCount()):
+            it = self.tree.topLevelItem(i)
+            if it.data(0, Qt.UserRole) == type_id:
+                return it
+        return None
+
+    def _insert_type_item(self, type_id: int, name: str) -> QTreeWidgetItem:
+        it = self._type_item(type_id)
+        if it is not None:
+            return it
+
+        # keep the case-insensitive order of list_types; row 0 is "All"
+        pos = 1
+        while pos < self.tree.topLevelItemCount() and self.tree.topLevelItem(pos).text(0).lower() <= name.lower():
+            pos += 1
+
+        it = QTreeWidgetItem([name])
+        it.setData(0, Qt.UserRole, type_id)
+        self.tree.insertTopLevelItem(pos, it)
+        self.type_names.upsert(type_id, name)
+        return it
+
+    def _apply_type_name(self, type_id: int, name: str) -> None:
+        if not name:
+            return
+        it = self._type_item(type_id)
+        if it is None:
+            self._insert_type_item(type_id, name)
+            return
+
+        it.setText(0, name)
+        self.type_names.upsert(type_id, name)
+        self.list_model.rename_type(type_id, name)
+
+    def _remove_type_item(self, type_id: int) -> None:
+        self.type_names.remove(type_id)
+        it = self._type_item(type_id)
+        if it is None:
+            return
+        if it is self.tree.currentItem():
+            # back to "All"; selecting it reloads the list
+            self.tree.setCurrentItem(self.tree.topLevelItem(0))
+        self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(it))
+
+    # ---------------------------
+    # CRUD for prompts
+    # ---------------------------
+    def prompt_dialog(self) -> PromptDialog:
+        # one dialog for every create / edit
+        if self._prompt_dialog is None:
+            self._prompt_dialog = PromptDialog(self.type_names, self.icon, parent=self)
+            self._prompt_dialog.ensurePolished()
+            self._prompt_dialog.adjustSize()
+        return self._prompt_dialog
+
+    def create_prompt(self) -> None:
+        self._open_prompt_dialog(None)
 
     def edit_prompt(self) -> None:
         pid = self.selected_prompt_id()
         if pid is None:
             return
 
-        p = self.db.get_prompt(pid)
-        if not p:
-            return
+        self.executor.read(self.db.get_prompt, pid).then(
+            lambda p: self._open_prompt_dialog(p) if p else None, self.on_db_error
+        )
 
-        types = [name for _, name in self.db.list_types(self.profile_id)]
-        dlg = PromptDialog(types, self.icon, self.theme, existing=p)
+    def _open_prompt_dialog(self, existing: Prompt | None) -> None:
+        dlg = self.prompt_dialog()
+        if dlg.isVisible():
+            return
+        dlg.load(existing)
         center_dialog(dlg, self)
 
         if dlg.exec() != QDialog.Accepted:
             return
 
         d = dlg.data()
-        self.db.upsert_prompt(self.profile_id, pid, **d)
-        self.refresh_all()
+        pid = existing.id if existing else None
+        self.executor.write(self.db.upsert_prompt, self.profile_id, pid, **d).then(
+            self._select_when_listed, self.on_db_error
+        )
+
+    def _select_when_listed(self, prompt_id: int) -> None:
+        row = self.list_model.row_of(prompt_id)
+        if row >= 0:
+            self.list.setCurrentIndex(self.list_model.index(row))
+        else:
+            self._pending_select = prompt_id
 
     def delete_prompt(self) -> None:
-        pid = self.selected_prompt_id()
-        if pid is None:
+        ids = self.selected_prompt_ids()
+        if not ids:
             return
 
         r = QMessageBox.question(
             self,
             "Удалить",
-            "Вы уверены?",
+            "Вы уверены?" if len(ids) == 1 else f"Удалить выбранные промты ({len(ids)})?",
             QMessageBox.Yes | QMessageBox.No,
         )
         if r != QMessageBox.Yes:
             return
 
-        self.db.delete_prompt(self.profile_id, pid)
-        self.refresh_all()
+        self.executor.write(self.db.delete_prompts, self.profile_id, ids).then(lambda _: None, self.on_db_error)
+
+    # ---------------------------
+    # Bulk edits of the selected prompts
+    # ---------------------------
+    # One DB call (one transaction) per action; the list, counters and
+    # facets follow from its single change notification.
+
+    def _make_bulk_menu(self) -> QMenu:
+        menu = QMenu(self)
+        menu.addAction("Переместить в тип…", self.bulk_move)
+        menu.addAction("Задать модель…", self.bulk_set_model)
+        menu.addAction("Заменить в LoRA…", self.bulk_replace_lora)
+        menu.addSeparator()
+        menu.addAction("Удалить", self.delete_prompt)
+        return menu
+
+    def on_list_context_menu(self, pos: QPoint) -> None:
+        if self.selected_prompt_ids():
+            self.btn_bulk.menu().exec(self.list.viewport().mapToGlobal(pos))
+
+    def _run_bulk(self, fn, *args) -> None:
+        ids = self.selected_prompt_ids()
+        if ids:
+            self.executor.write(fn, self.profile_id, ids, *args).then(lambda _n: None, self.on_db_error)
+
+    def bulk_move(self) -> None:
+        n = len(self.selected_prompt_ids())
+        if not n:
+            return
+        name, ok = QInputDialog.getItem(
+            self, "Переместить", f"Тип для выбранных промтов ({n}):", self.type_names.names(), 0, True
+        )
+        name = (name or "").strip()
+        if ok and name:
+            self._run_bulk(self.db.move_prompts, name)
+
+    def bulk_set_model(self) -> None:
+        n = len(self.selected_prompt_ids())
+        if not n:
+            return
+        model, ok = QInputDialog.getText(self, "Модель", f"Модель для выбранных промтов ({n}):")
+        if ok:
+            self._run_bulk(self.db.set_prompts_model, (model or "").strip())
+
+    def bulk_replace_lora(self) -> None:
+        if not self.selected_prompt_ids():
+            return
+        find, ok = QInputDialog.getText(self, "Заменить в LoRA", "Найти:")
+        if not ok or not find:
+            return
+        replace, ok = QInputDialog.getText(self, "Заменить в LoRA", f"Заменить «{find}» на:")
+        if ok:
+            self._run_bulk(self.db.replace_in_prompts_lora, find, replace)
+
+    # ---------------------------
+    # Near-duplicates (review tab)
+    # ---------------------------
+    def find_duplicates(self) -> None:
+        from . import dedup  # numpy: loaded on first use, not at startup
+
+        dlg = QProgressDialog("Подписи промтов…", "Отмена", 0, 0, self)
+        dlg.setWindowTitle("Дубликаты")
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setAttribute(Qt.WA_DeleteOnClose)
+        dlg.setMinimumDuration(300)
+
+        progress = TaskProgress(dlg)
+        progress.changed.connect(lambda done, total: (dlg.setMaximum(max(total, done)), dlg.setValue(done)))
+        dlg.canceled.connect(progress.cancel)
+
+        def found(groups: list[DuplicateGroup]) -> None:
+            ids = [pid for g in groups for pid in g.ids]
+            self.executor.read(self.db.get_prompt_summaries, ids).then(
+                lambda rows: (dlg.close(), self._fill_dupes(groups, rows)), failed
+            )
+
+        def failed(e: Exception) -> None:
+            dlg.close()
+            if not isinstance(e, dedup.DedupCancelled):
+                self.on_db_error(e)
+
+        # a write: stale signatures are stored on the way
+        self.executor.write(
+            dedup.find_duplicates, self.db, self.profile_id, self.dup_threshold.value(), progress
+        ).then(found, failed)
+
+    def _fill_dupes(self, groups: list[DuplicateGroup], rows: list[PromptSummary]) -> None:
+        by_id = {r.id: r for r in rows}
+        self.dup_tree.clear()
+        for n, g in enumerate(groups, 1):
+            group = QTreeWidgetItem([f"Группа {n}: промтов {len(g.ids)}, сходство ≥ {g.similarity:.2f}"])
+            self.dup_tree.addTopLevelItem(group)
+            group.setFirstColumnSpanned(True)
+            for pid in g.ids:
+                r = by_id.get(pid)
+                if r is None:
+                    continue
+                it = QTreeWidgetItem([r.name, r.type, format_ts(r.updated_at)])
+                it.setData(0, Qt.UserRole, pid)
+                group.addChild(it)
+        self.dup_tree.expandAll()
+        if not groups:
+            self.dup_tree.addTopLevelItem(QTreeWidgetItem(["Похожих промтов не найдено."]))
+
+    def _remove_dup_ids(self, prompt_ids) -> None:
+        gone = set(prompt_ids)
+        for i in reversed(range(self.dup_tree.topLevelItemCount())):
+            group = self.dup_tree.topLevelItem(i)
+            if group.childCount() == 0:
+                continue  # "nothing found"
+            for j in reversed(range(group.childCount())):
+                if group.child(j).data(0, Qt.UserRole) in gone:
+                    group.removeChild(group.child(j))
+            # a group of one is no longer a duplicate
+            if group.childCount() < 2:
+                self.dup_tree.takeTopLevelItem(i)
+
+    def _selected_duplicate(self) -> tuple[int, list[int]] | None:
+        # (selected prompt id, ids of its group)
+        it = self.dup_tree.currentItem()
+        if it is None or it.parent() is None:
+            return None
+        group = it.parent()
+        return it.data(0, Qt.UserRole), [group.child(j).data(0, Qt.UserRole) for j in range(group.childCount())]
+
+    def keep_selected_duplicate(self) -> None:
+        sel = self._selected_duplicate()
+        if sel is None:
+            return
+        keep, ids = sel
+        others = [pid for pid in ids if pid != keep]
+        r = QMessageBox.question(
+            self, "Объединить", f"Оставить выбранный промт и удалить остальные ({len(others)})?",
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        if r == QMessageBox.Yes:
+            self.executor.write(self.db.delete_prompts, self.profile_id, others).then(lambda _: None, self.on_db_error)
+
+    def delete_selected_duplicate(self) -> None:
+        sel = self._selected_duplicate()
+        if sel is None:
+            return
+        r = QMessageBox.question(self, "Удалить", "Вы уверены?", QMessageBox.Yes | QMessageBox.No)
+        if r == QMessageBox.Yes:
+            self.executor.write(self.db.delete_prompts, self.profile_id, [sel[0]]).then(
+                lambda _: None, self.on_db_error
+            )
+
+    def on_prompt_item_double_clicked(self, item: QTreeWidgetItem, _column: int) -> None:
+        pid = item.data(0, Qt.UserRole)
+        if pid is None:
+            return
+        self.executor.read(self.db.get_prompt, pid).then(
+            lambda p: self._open_prompt_dialog(p) if p else None, self.on_db_error
+        )
+
+    # ---------------------------
+    # Similar prompts (TF-IDF, see similar.py)
+    # ---------------------------
+    def refresh_similar(self) -> None:
+        if self.detail_tabs.currentWidget() is not self.similar_tree or self.executor is None:
+            return
+        pid = self.selected_prompt_id()
+        if pid is None:
+            self.similar_tree.clear()
+            return
+        from . import similar  # numpy: loaded on first use, not at startup
+
+        def found(hits: list[tuple[int, float]]) -> None:
+            self.executor.read(self.db.get_prompt_summaries, [i for i, _ in hits], key="similar").then(
+                lambda rows: self._fill_similar(hits, rows), self.on_db_error
+            )
+
+        # the first call after an edit syncs the on-disk matrix; arrow keys: only the last one
+        self.executor.read(
+            similar.similar_prompts, self.db, self.profile_id, pid, SIMILAR_LIMIT, key="similar"
+        ).then(found, self.on_db_error)
+
+    def _fill_similar(self, hits: list[tuple[int, float]], rows: list[PromptSummary]) -> None:
+        by_id = {r.id: r for r in rows}
+        self.similar_tree.clear()
+        for pid, score in hits:
+            r = by_id.get(pid)
+            if r is None:
+                continue
+            it = QTreeWidgetItem([r.name, r.type, f"{score:.2f}"])
+            it.setData(0, Qt.UserRole, pid)
+            it.setTextAlignment(2, Qt.AlignRight | Qt.AlignVCenter)
+            self.similar_tree.addTopLevelItem(it)
+        if not hits:
+            self.similar_tree.addTopLevelItem(QTreeWidgetItem(["Похожих промтов нет."]))
 
     # ---------------------------
     # Export
     # ---------------------------
     def export_prompts(self) -> None:
-        path, _ = QFileDialog.getSaveFileName(
+        filters = {spec.title: fmt for fmt, spec in export.EXPORT_FORMATS.items()}
+        path, chosen = QFileDialog.getSaveFileName(
             self,
             "Сохранить выгрузку",
             "prompts_export.txt",
-            "Text files (*.txt)",
+            ";;".join(filters),
         )
         if not path:
             return
 
-        type_id = self.current_type_id()
-        prompts = self.db.list_prompts(self.profile_id, type_id)
-
-        header = [
-            f"{APP_NAME} — экспорт промтов",
-            f"Профиль: {self.profile_name}",
-            f"Дата: {now_iso()}",
-            f"Фильтр: {'All' if type_id is None else self.db.get_type_name(self.profile_id, type_id)}",
-            "=" * 60,
-            "",
-        ]
+        dlg = QProgressDialog("Выгрузка промтов…", "Отмена", 0, 0, self)
+        dlg.setWindowTitle("Экспорт")
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setAttribute(Qt.WA_DeleteOnClose)
+        dlg.setMinimumDuration(300)
 
-        blocks: list[str] = []
-        for p in prompts:
-            blocks.append(self.render_prompt_text(p))
-            blocks.append("-" * 60)
-            blocks.append("")
+        progress = TaskProgress(dlg)
+        progress.changed.connect(lambda done, total: (dlg.setMaximum(max(total, done)), dlg.setValue(done)))
+        dlg.canceled.connect(progress.cancel)
 
-        content = "\n".join(header + blocks).rstrip() + "\n"
+        def done(count: int) -> None:
+            dlg.close()
+            QMessageBox.information(self, "Готово", f"Выгрузил {count} промтов:\n{path}")
 
-        try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(content)
-            QMessageBox.information(self, "Готово", f"Выгрузил:\n{path}")
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка!", f"Не смог сохранить файл:\n{e}")
+        def failed(e: Exception) -> None:
+            dlg.close()
+            if isinstance(e, export.ExportCancelled):
+                QMessageBox.information(self, "Экспорт", "Выгрузка отменена.")
+            else:
+                QMessageBox.critical(self, "Ошибка!", f"Не смог сохранить файл:\n{e}")
 
-    # ---------------------------
-    # Render helper
-    # ---------------------------
-    def render_prompt_text(self, p: Prompt) -> str:
-        return "\n".join([
-            f"Name: {p.name}",
-            "",
-            f"Type: {p.type}",
-            "",
-            f"Model: {p.model}",
-            "",
-            f"LoRA: {p.lora}".rstrip(),
-            "",
-            "",
-            f"Описание: {p.description}",
-            "",
-            "",
-            "Positive:",
-            p.positive,
-            "",
-            "",
-            "Negative:",
-            p.negative,
-            "",
-        ])
+        # a read: runs on a reader thread, the DB lock is taken per batch only
+        self.executor.read(
+            export.export_prompts, self.db, self.profile_id, self.current_type_id(), path,
+            filters.get(chosen, "txt"), progress,
+        ).then(done, failed)
@@ -0,0 +1,662 @@
+import sqlite3
+from typing import Callable, Iterator
+
+from .parsing import content_hash, parse_loras, parse_tags
+
+
+# ============================================================
+# Schema migrations (PRAGMA user_version)
+# ============================================================
+#
+# Every entry of MIGRATIONS moves the schema one version forward:
+# MIGRATIONS[0] produces user_version 1, MIGRATIONS[1] -> 2 and so on.
+# Steps run inside a transaction with foreign keys switched off, so a
+# step may rebuild tables the way SQLite recommends (create new, copy,
+# drop, rename). Never edit a released step — append a new one.
+
+def _col_exists(conn: sqlite3.Connection, table: str, col: str) -> bool:
+    cur = conn.cursor()
+    cur.execute(f"PRAGMA table_info({table});")
+    return any(r[1] == col for r in cur.fetchall())
+
+
+def _sequence(conn: sqlite3.Connection, table: str) -> int | None:
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name=?;", (table,)).fetchone()
+    return None if row is None else int(row[0])
+
+
+def _restore_sequence(conn: sqlite3.Connection, table: str, seq: int | None) -> None:
+    # A rebuilt AUTOINCREMENT table only remembers its largest copied id:
+    # without this, ids of deleted rows would be handed out again.
+    if seq is None:
+        return
+    cur = conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name=?;", (seq, table))
+    if cur.rowcount == 0:
+        # nothing was copied
+        conn.execute("INSERT INTO sqlite_sequence(name, seq) VALUES(?, ?);", (table, seq))
+
+
+# ---------------------------
+# v1: indexes, unique type names, ON DELETE CASCADE
+# ---------------------------
+
+def _m001_indexes_and_cascade(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+
+    # Unversioned databases (and fresh files) start from the legacy layout.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS profiles(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            theme TEXT NOT NULL DEFAULT 'light',
+            created_at TEXT NOT NULL
+        );
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS types(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_id INTEGER NOT NULL,
+            name TEXT NOT NULL
+        );
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS prompts(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_id INTEGER NOT NULL,
+            type_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL,
+            positive TEXT NOT NULL,
+            negative TEXT NOT NULL,
+            lora TEXT NOT NULL,
+            model TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+    """)
+
+    if not _col_exists(conn, "profiles", "theme"):
+        cur.execute("ALTER TABLE profiles ADD COLUMN theme TEXT NOT NULL DEFAULT 'light';")
+
+    if not _col_exists(conn, "types", "profile_id"):
+        cur.execute("ALTER TABLE types ADD COLUMN profile_id INTEGER NOT NULL DEFAULT 1;")
+
+    # Duplicate type names inside one profile are merged into the oldest type,
+    # otherwise the UNIQUE(profile_id, name) constraint below cannot be built.
+    cur.execute("""
+        UPDATE prompts
+        SET type_id = (
+            SELECT MIN(d.id) FROM types t
+            JOIN types d ON d.profile_id = t.profile_id AND d.name = t.name
+            WHERE t.id = prompts.type_id
+        )
+        WHERE type_id IN (
+            SELECT t.id FROM types t
+            WHERE EXISTS(
+                SELECT 1 FROM types d
+                WHERE d.profile_id = t.profile_id AND d.name = t.name AND d.id < t.id
+            )
+        );
+    """)
+    cur.execute("""
+        DELETE FROM types
+        WHERE EXISTS(
+            SELECT 1 FROM types d
+            WHERE d.profile_id = types.profile_id AND d.name = types.name AND d.id < types.id
+        );
+    """)
+
+    # Rebuild with real foreign keys (SQLite cannot ALTER a constraint in place).
+    types_seq, prompts_seq = _sequence(conn, "types"), _sequence(conn, "prompts")
+    cur.execute("""
+        CREATE TABLE types_new(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            UNIQUE(profile_id, name)
+        );
+    """)
+    cur.execute("INSERT INTO types_new(id, profile_id, name) SELECT id, profile_id, name FROM types;")
+    cur.execute("DROP TABLE types;")
+    cur.execute("ALTER TABLE types_new RENAME TO types;")
+    _restore_sequence(conn, "types", types_seq)
+
+    cur.execute("""
+        CREATE TABLE prompts_new(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+            type_id INTEGER NOT NULL REFERENCES types(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL,
+            positive TEXT NOT NULL,
+            negative TEXT NOT NULL,
+            lora TEXT NOT NULL,
+            model TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+    """)
+    cur.execute("""
+        INSERT INTO prompts_new(id, profile_id, type_id, name, description, positive, negative, lora, model,
+                                created_at, updated_at)
+        SELECT id, profile_id, type_id, name, description, positive, negative, lora, model, created_at, updated_at
+        FROM prompts;
+    """)
+    cur.execute("DROP TABLE prompts;")
+    cur.execute("ALTER TABLE prompts_new RENAME TO prompts;")
+    _restore_sequence(conn, "prompts", prompts_seq)
+
+    # (profile_id, type_id, updated_at) serves the per-type list ordered by date,
+    # (profile_id, updated_at) the "All" list and the profile-wide counters,
+    # (type_id) the cascade from types.
+    cur.execute("CREATE INDEX idx_prompts_profile_type_updated ON prompts(profile_id, type_id, updated_at);")
+    cur.execute("CREATE INDEX idx_prompts_profile_updated ON prompts(profile_id, updated_at);")
+    cur.execute("CREATE INDEX idx_prompts_type ON prompts(type_id);")
+
+
+# ---------------------------
+# v2: full-text search (FTS5, external content = prompts)
+# ---------------------------
+
+FTS_COLUMNS = "name, description, positive, negative, lora, model"
+
+FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER prompts_fts_ai AFTER INSERT ON prompts BEGIN
+        INSERT INTO prompts_fts(rowid, {FTS_COLUMNS})
+        VALUES(new.id, new.name, new.description, new.positive, new.negative, new.lora, new.model);
+    END;
+    """,
+    f"""
+    CREATE TRIGGER prompts_fts_ad AFTER DELETE ON prompts BEGIN
+        INSERT INTO prompts_fts(prompts_fts, rowid, {FTS_COLUMNS})
+        VALUES('delete', old.id, old.name, old.description, old.positive, old.negative, old.lora, old.model);
+    END;
+    """,
+    f"""
+    CREATE TRIGGER prompts_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON prompts BEGIN
+        INSERT INTO prompts_fts(prompts_fts, rowid, {FTS_COLUMNS})
+        VALUES('delete', old.id, old.name, old.description, old.positive, old.negative, old.lora, old.model);
+        INSERT INTO prompts_fts(rowid, {FTS_COLUMNS})
+        VALUES(new.id, new.name, new.description, new.positive, new.negative, new.lora, new.model);
+    END;
+    """,
+]
+
+
+def _m002_fts(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    cur.execute(f"""
+        CREATE VIRTUAL TABLE prompts_fts USING fts5(
+            {FTS_COLUMNS},
+            content='prompts',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+    """)
+    for sql in FTS_TRIGGERS:
+        cur.execute(sql)
+    cur.execute("INSERT INTO prompts_fts(prompts_fts) VALUES('rebuild');")
+
+
+# ---------------------------
+# v3: covering indexes for the summary projection
+# ---------------------------
+
+def _m003_summary_indexes(conn: sqlite3.Connection) -> None:
+    # The list panes read (id, type_id, name, updated_at) only. With these columns
+    # in the index the wide rows (positive / negative texts) are never touched,
+    # and id after updated_at keeps the keyset order (updated_at, id) sort-free.
+    cur = conn.cursor()
+    cur.execute("DROP INDEX IF EXISTS idx_prompts_profile_type_updated;")
+    cur.execute("DROP INDEX IF EXISTS idx_prompts_profile_updated;")
+    cur.execute("""
+        CREATE INDEX idx_prompts_profile_type_updated
+        ON prompts(profile_id, type_id, updated_at, id, name);
+    """)
+    cur.execute("""
+        CREATE INDEX idx_prompts_profile_updated
+        ON prompts(profile_id, updated_at, id, type_id, name);
+    """)
+
+
+# ---------------------------
+# v4: materialized statistics (kept up to date by triggers)
+# ---------------------------
+#
+# stats_* hold running counters per profile, so the Stats tab reads a few
+# small rows instead of aggregating prompts. A row disappears when its
+# counter drops to zero. LoRA names are parsed in Python (parse_loras) into
+# prompt_loras; its triggers maintain stats_lora.
+
+STATS_TABLES = [
+    """
+    CREATE TABLE stats_profile(
+        profile_id INTEGER PRIMARY KEY,
+        prompts INTEGER NOT NULL,
+        positive_len INTEGER NOT NULL,
+        negative_len INTEGER NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE stats_type(
+        type_id INTEGER PRIMARY KEY,
+        profile_id INTEGER NOT NULL,
+        prompts INTEGER NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE stats_model(
+        profile_id INTEGER NOT NULL,
+        model TEXT NOT NULL,
+        prompts INTEGER NOT NULL,
+        PRIMARY KEY(profile_id, model)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE stats_day(
+        profile_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        created INTEGER NOT NULL,
+        updated INTEGER NOT NULL,
+        PRIMARY KEY(profile_id, day)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE prompt_loras(
+        prompt_id INTEGER NOT NULL REFERENCES prompts(id) ON DELETE CASCADE,
+        profile_id INTEGER NOT NULL,
+        lora TEXT NOT NULL COLLATE NOCASE,
+        PRIMARY KEY(prompt_id, lora)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE stats_lora(
+        profile_id INTEGER NOT NULL,
+        lora TEXT NOT NULL COLLATE NOCASE,
+        prompts INTEGER NOT NULL,
+        PRIMARY KEY(profile_id, lora)
+    ) WITHOUT ROWID;
+    """,
+]
+
+
+def _stats_add(row: str, days: bool = True) -> str:
+    sql = f"""
+        INSERT INTO stats_profile(profile_id, prompts, positive_len, negative_len)
+        VALUES({row}.profile_id, 1, length({row}.positive), length({row}.negative))
+        ON CONFLICT(profile_id) DO UPDATE SET
+            prompts = prompts + 1,
+            positive_len = positive_len + excluded.positive_len,
+            negative_len = negative_len + excluded.negative_len;
+        INSERT INTO stats_type(type_id, profile_id, prompts) VALUES({row}.type_id, {row}.profile_id, 1)
+        ON CONFLICT(type_id) DO UPDATE SET prompts = prompts + 1;
+        INSERT INTO stats_model(profile_id, model, prompts) VALUES({row}.profile_id, {row}.model, 1)
+        ON CONFLICT(profile_id, model) DO UPDATE SET prompts = prompts + 1;
+    """
+    # stats_day is gone since v9
+    if days:
+        sql += f"""
+        INSERT INTO stats_day(profile_id, day, created, updated) VALUES({row}.profile_id, substr({row}.created_at, 1, 10), 1, 0)
+        ON CONFLICT(profile_id, day) DO UPDATE SET created = created + 1;
+        INSERT INTO stats_day(profile_id, day, created, updated) VALUES({row}.profile_id, substr({row}.updated_at, 1, 10), 0, 1)
+        ON CONFLICT(profile_id, day) DO UPDATE SET updated = updated + 1;
+    """
+    return sql
+
+
+def _stats_remove(row: str, days: bool = True) -> str:
+    sql = f"""
+        UPDATE stats_profile SET
+            prompts = prompts - 1,
+            positive_len = positive_len - length({row}.positive),
+            negative_len = negative_len - length({row}.negative)
+        WHERE profile_id = {row}.profile_id;
+        DELETE FROM stats_profile WHERE profile_id = {row}.profile_id AND prompts <= 0;
+        UPDATE stats_type SET prompts = prompts - 1 WHERE type_id = {row}.type_id;
+        DELETE FROM stats_type WHERE type_id = {row}.type_id AND prompts <= 0;
+        UPDATE stats_model SET prompts = prompts - 1 WHERE profile_id = {row}.profile_id AND model = {row}.model;
+        DELETE FROM stats_model WHERE profile_id = {row}.profile_id AND model = {row}.model AND prompts <= 0;
+    """
+    if days:
+        sql += f"""
+        UPDATE stats_day SET created = created - 1
+        WHERE profile_id = {row}.profile_id AND day = substr({row}.created_at, 1, 10);
+        UPDATE stats_day SET updated = updated - 1
+        WHERE profile_id = {row}.profile_id AND day = substr({row}.updated_at, 1, 10);
+        DELETE FROM stats_day
+        WHERE profile_id = {row}.profile_id
+          AND day IN (substr({row}.created_at, 1, 10), substr({row}.updated_at, 1, 10))
+          AND created <= 0 AND updated <= 0;
+    """
+    return sql
+
+
+STATS_COLUMNS = "profile_id, type_id, model, positive, negative, created_at, updated_at"
+
+STATS_TRIGGERS = [
+    f"CREATE TRIGGER prompts_stats_ai AFTER INSERT ON prompts BEGIN {_stats_add('new')} END;",
+    f"CREATE TRIGGER prompts_stats_ad AFTER DELETE ON prompts BEGIN {_stats_remove('old')} END;",
+    f"""
+    CREATE TRIGGER prompts_stats_au AFTER UPDATE OF {STATS_COLUMNS} ON prompts BEGIN
+        {_stats_remove('old')}
+        {_stats_add('new')}
+    END;
+    """,
+    """
+    CREATE TRIGGER prompt_loras_stats_ai AFTER INSERT ON prompt_loras BEGIN
+        INSERT INTO stats_lora(profile_id, lora, prompts) VALUES(new.profile_id, new.lora, 1)
+        ON CONFLICT(profile_id, lora) DO UPDATE SET prompts = prompts + 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER prompt_loras_stats_ad AFTER DELETE ON prompt_loras BEGIN
+        UPDATE stats_lora SET prompts = prompts - 1 WHERE profile_id = old.profile_id AND lora = old.lora;
+        DELETE FROM stats_lora WHERE profile_id = old.profile_id AND lora = old.lora AND prompts <= 0;
+    END;
+    """,
+]
+
+
+def _m004_stats(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    for sql in STATS_TABLES:
+        cur.execute(sql)
+
+    cur.execute("""
+        INSERT INTO stats_profile(profile_id, prompts, positive_len, negative_len)
+        SELECT profile_id, COUNT(*), SUM(length(positive)), SUM(length(negative))
+        FROM prompts GROUP BY profile_id;
+    """)
+    cur.execute("""
+        INSERT INTO stats_type(type_id, profile_id, prompts)
+        SELECT type_id, profile_id, COUNT(*) FROM prompts GROUP BY type_id;
+    """)
+    cur.execute("""
+        INSERT INTO stats_model(profile_id, model, prompts)
+        SELECT profile_id, model, COUNT(*) FROM prompts GROUP BY profile_id, model;
+    """)
+    cur.execute("""
+        INSERT INTO stats_day(profile_id, day, created, updated)
+        SELECT profile_id, day, SUM(c), SUM(u) FROM (
+            SELECT profile_id, substr(created_at, 1, 10) AS day, 1 AS c, 0 AS u FROM prompts
+            UNION ALL
+            SELECT profile_id, substr(updated_at, 1, 10), 0, 1 FROM prompts
+        )
+        GROUP BY profile_id, day;
+    """)
+
+    # the LoRA triggers fill stats_lora during the backfill below
+    for sql in STATS_TRIGGERS:
+        cur.execute(sql)
+
+    rows = cur.execute("SELECT id, profile_id, lora FROM prompts WHERE lora <> '';").fetchall()
+    cur.executemany(
+        "INSERT OR IGNORE INTO prompt_loras(prompt_id, profile_id, lora) VALUES(?, ?, ?);",
+        ((r[0], r[1], name) for r in rows for name in parse_loras(r[2])),
+    )
+
+
+# ---------------------------
+# v5: content hash for duplicate detection
+# ---------------------------
+#
+# content_hash is computed in Python (parsing.content_hash) — by the DB
+# methods that write prompts and, for set-based copies, through the SQL
+# function of the same name registered on the connection. No trigger
+# depends on it, so other SQLite tools can still write the file.
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    conn.create_function("content_hash", 6, content_hash, deterministic=True)
+
+
+def _m005_content_hash(conn: sqlite3.Connection) -> None:
+    register_functions(conn)
+    cur = conn.cursor()
+    cur.execute("ALTER TABLE prompts ADD COLUMN content_hash TEXT;")
+    cur.execute("UPDATE prompts SET content_hash = content_hash(name, description, positive, negative, lora, model);")
+    cur.execute("CREATE INDEX idx_prompts_profile_hash ON prompts(profile_id, content_hash);")
+
+
+# ---------------------------
+# v6: tag index (tags, prompt_tags)
+# ---------------------------
+#
+# Inverted index of the normalized tags of positive / negative
+# (parsing.parse_tags). Tag texts are stored once, in tags; prompt_tags
+# holds integers only. Like prompt_loras it is filled in Python by the DB
+# methods that write prompts and emptied by ON DELETE CASCADE; unused
+# tags stay in the dictionary. idx_prompt_tags_tag gives, per tag, the
+# prompt ids in order: tag filters are INTERSECT / EXCEPT of index range
+# scans.
+
+TAG_POSITIVE = 0
+TAG_NEGATIVE = 1
+
+# (prompt_id, profile_id, side, tag text)
+TagRow = tuple[int, int, int, str]
+
+
+def tag_rows(prompt_id: int, profile_id: int, positive: str, negative: str) -> Iterator[TagRow]:
+    for side, text in ((TAG_POSITIVE, positive), (TAG_NEGATIVE, negative)):
+        for tag in parse_tags(text):
+            yield prompt_id, profile_id, side, tag
+
+
+def insert_tag_rows(conn: sqlite3.Connection, rows: list[TagRow], vocab: dict[str, int] | None = None) -> None:
+    # vocab: tag -> id already known to the caller (kept across batches)
+    vocab = {} if vocab is None else vocab
+    missing = list({r[3] for r in rows if r[3] not in vocab})
+    if missing:
+        conn.executemany("INSERT OR IGNORE INTO tags(tag) VALUES(?);", ((t,) for t in missing))
+        for i in range(0, len(missing), 500):
+            part = missing[i:i + 500]
+            vocab.update(conn.execute(
+                f"SELECT tag, id FROM tags WHERE tag IN ({', '.join('?' * len(part))});", part
+            ).fetchall())
+    conn.executemany(
+        "INSERT OR IGNORE INTO prompt_tags(prompt_id, profile_id, side, tag_id) VALUES(?, ?, ?, ?);",
+        ((r[0], r[1], r[2], vocab[r[3]]) for r in rows),
+    )
+
+
+def _m006_tags(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    cur.execute("CREATE TABLE tags(id INTEGER PRIMARY KEY, tag TEXT NOT NULL UNIQUE);")
+    cur.execute("""
+        CREATE TABLE prompt_tags(
+            prompt_id INTEGER NOT NULL REFERENCES prompts(id) ON DELETE CASCADE,
+            profile_id INTEGER NOT NULL,
+            side INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            PRIMARY KEY(prompt_id, side, tag_id)
+        ) WITHOUT ROWID;
+    """)
+
+    # in batches: the texts of all prompts never sit in memory at once
+    vocab: dict[str, int] = {}
+    cur.execute("SELECT id, profile_id, positive, negative FROM prompts;")
+    while batch := cur.fetchmany(1000):
+        insert_tag_rows(conn, [t for r in batch for t in tag_rows(*r)], vocab)
+
+    # built after the backfill: one sort instead of random inserts
+    cur.execute("CREATE INDEX idx_prompt_tags_tag ON prompt_tags(profile_id, side, tag_id, prompt_id);")
+
+
+# ---------------------------
+# v7: MinHash signatures for near-duplicate detection
+# ---------------------------
+#
+# Filled on demand by dedup.refresh_signatures(); a row is stale when its
+# updated_at differs from the prompt's. An empty sig marks a prompt
+# without tags.
+
+def _m007_minhash(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE prompt_minhash(
+            prompt_id INTEGER PRIMARY KEY REFERENCES prompts(id) ON DELETE CASCADE,
+            profile_id INTEGER NOT NULL,
+            updated_at TEXT NOT NULL,
+            sig BLOB NOT NULL
+        );
+    """)
+    conn.execute("CREATE INDEX idx_prompt_minhash_profile ON prompt_minhash(profile_id);")
+
+
+# ---------------------------
+# v8: facet indexes (DB.facet_counts, PromptFilter)
+# ---------------------------
+#
+# prompt_loras is keyed by prompt; a LoRA facet needs the other way round:
+# per (profile, lora) the prompt ids. The model index covers the list
+# columns, like the v3 ones, so a model filter never reads wide rows;
+# the type/model one lets per-type counts under a model or date filter
+# run on the index alone, already grouped.
+
+def _m008_facet_indexes(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE INDEX idx_prompt_loras_lora ON prompt_loras(profile_id, lora, prompt_id);")
+    conn.execute("""
+        CREATE INDEX idx_prompts_profile_model
+        ON prompts(profile_id, model, updated_at, id, type_id, name);
+    """)
+    conn.execute("CREATE INDEX idx_prompts_profile_type_model ON prompts(profile_id, type_id, model, updated_at);")
+
+
+# ---------------------------
+# v9: integer timestamps
+# ---------------------------
+#
+# created_at / updated_at become INTEGER UNIX time (UTC) instead of
+# local-time text: ordered and compared as numbers, and a date range is
+# an index range on (profile_id, created_at) or (profile_id, updated_at).
+# Text is produced for display only (utils.format_ts). A column type
+# cannot change in place, so prompts is rebuilt: its indexes are
+# re-created from their saved SQL, the triggers from FTS_TRIGGERS and
+# STATS_TRIGGERS_V9. stats_day goes: DB.profile_stats counts the
+# activity timeline from those index ranges, in local days.
+
+def epoch_sql(col: str) -> str:
+    # a stored timestamp as UNIX time, in a file of any schema version
+    # (text was local time: the 'utc' modifier converts it)
+    return (
+        f"(CASE WHEN typeof({col}) = 'integer' THEN {col}"
+        f" ELSE COALESCE(CAST(strftime('%s', {col}, 'utc') AS INTEGER), 0) END)"
+    )
+
+
+STATS_COLUMNS_V9 = "profile_id, type_id, model, positive, negative"
+
+STATS_TRIGGERS_V9 = [
+    f"CREATE TRIGGER prompts_stats_ai AFTER INSERT ON prompts BEGIN {_stats_add('new', days=False)} END;",
+    f"CREATE TRIGGER prompts_stats_ad AFTER DELETE ON prompts BEGIN {_stats_remove('old', days=False)} END;",
+    f"""
+    CREATE TRIGGER prompts_stats_au AFTER UPDATE OF {STATS_COLUMNS_V9} ON prompts BEGIN
+        {_stats_remove('old', days=False)}
+        {_stats_add('new', days=False)}
+    END;
+    """,
+]
+
+
+def _m009_epoch_timestamps(conn: sqlite3.Connection) -> None:
+    cur = conn.cursor()
+    indexes = [r[0] for r in cur.execute(
+        "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name='prompts' AND sql IS NOT NULL;"
+    ).fetchall()]
+    seq = _sequence(conn, "prompts")
+
+    cur.execute("""
+        CREATE TABLE prompts_new(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+            type_id INTEGER NOT NULL REFERENCES types(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            description TEXT NOT NULL,
+            positive TEXT NOT NULL,
+            negative TEXT NOT NULL,
+            lora TEXT NOT NULL,
+            model TEXT NOT NULL,
+            created_at INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL,
+            content_hash TEXT
+        );
+    """)
+    cur.execute(f"""
+        INSERT INTO prompts_new(id, profile_id, type_id, name, description, positive, negative, lora, model,
+                                created_at, updated_at, content_hash)
+        SELECT id, profile_id, type_id, name, description, positive, negative, lora, model,
+               {epoch_sql('created_at')}, {epoch_sql('updated_at')}, content_hash
+        FROM prompts;
+    """)
+    # indexes and triggers go with the old table; prompts_fts, prompt_loras,
+    # prompt_tags and prompt_minhash refer to the name and keep the ids
+    cur.execute("DROP TABLE prompts;")
+    cur.execute("ALTER TABLE prompts_new RENAME TO prompts;")
+    _restore_sequence(conn, "prompts", seq)
+
+    for sql in indexes:
+        cur.execute(sql)
+    cur.execute("CREATE INDEX idx_prompts_profile_created ON prompts(profile_id, created_at);")
+    for sql in FTS_TRIGGERS + STATS_TRIGGERS_V9:
+        cur.execute(sql)
+    cur.execute("DROP TABLE stats_day;")
+
+    # prompt_minhash.updated_at is compared with prompts.updated_at
+    cur.execute("""
+        CREATE TABLE prompt_minhash_new(
+            prompt_id INTEGER PRIMARY KEY REFERENCES prompts(id) ON DELETE CASCADE,
+            profile_id INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL,
+            sig BLOB NOT NULL
+        );
+    """)
+    cur.execute(f"""
+        INSERT INTO prompt_minhash_new(prompt_id, profile_id, updated_at, sig)
+        SELECT prompt_id, profile_id, {epoch_sql('updated_at')}, sig FROM prompt_minhash;
+    """)
+    cur.execute("DROP TABLE prompt_minhash;")
+    cur.execute("ALTER TABLE prompt_minhash_new RENAME TO prompt_minhash;")
+    cur.execute("CREATE INDEX idx_prompt_minhash_profile ON prompt_minhash(profile_id);")
+
+
+MIGRATIONS: list[Callable[[sqlite3.Connection], None]] = [
+    _m001_indexes_and_cascade,
+    _m002_fts,
+    _m003_summary_indexes,
+    _m004_stats,
+    _m005_content_hash,
+    _m006_tags,
+    _m007_minhash,
+    _m008_facet_indexes,
+    _m009_epoch_timestamps,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version;").fetchone()[0])
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    version = schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    conn.commit()
+    # Must be toggled outside of a transaction.
+    conn.execute("PRAGMA foreign_keys=OFF;")
+    try:
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            conn.execute("BEGIN;")
+            try:
+                MIGRATIONS[target - 1](conn)
+                conn.execute(f"PRAGMA user_version={target};")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON;")
+
+    return SCHEMA_VERSION
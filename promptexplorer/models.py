@@ -1,12 +1,16 @@
-from dataclasses import dataclass
+from enum import Enum
+from typing import NamedTuple
 
 
 # ============================================================
 # Data model
 # ============================================================
+#
+# Plain NamedTuples: immutable (cached Prompts are shared between threads)
+# and cheap to import — dataclasses pulls in inspect, which the CLI's cold
+# start cannot afford.
 
-@dataclass
-class Prompt:
+class Prompt(NamedTuple):
     id: int
     type: str
     name: str
@@ -15,5 +19,104 @@ class Prompt:
     negative: str
     lora: str
     model: str
-    created_at: str
-    updated_at: str
+    # UNIX time (UTC); utils.format_ts for display
+    created_at: int
+    updated_at: int
+
+
+# Light-weight rows for list views: plain tuples, no description / texts.
+# Full prompts are loaded on demand with DB.get_prompt().
+
+class PromptSummary(NamedTuple):
+    id: int
+    type_id: int
+    type: str
+    name: str
+    updated_at: int
+
+
+class SearchHit(NamedTuple):
+    id: int
+    type_id: int
+    type: str
+    name: str
+    snippet: str
+    rank: float
+
+
+class ImportResult(NamedTuple):
+    profile_id: int
+    inserted: int
+    skipped: int  # already in the profile (same content hash) or repeated in the source
+
+
+class ProfileStats(NamedTuple):
+    total: int
+    avg_positive: float
+    avg_negative: float
+    # (name, prompts), most used first
+    by_type: list[tuple[str, int]]
+    by_model: list[tuple[str, int]]
+    by_lora: list[tuple[str, int]]
+    # (day "YYYY-MM-DD", week "YYYY-Www" or month "YYYY-MM", created, updated),
+    # the last ACTIVITY_BUCKETS[period] of them, empty ones included, newest first
+    activity: list[tuple[str, int, int]]
+
+
+class PromptFilter(NamedTuple):
+    # facet selection; values of one facet are OR-ed, facets are AND-ed
+    type_ids: tuple[int, ...] = ()
+    models: tuple[str, ...] = ()
+    loras: tuple[str, ...] = ()
+    # "YYYY-MM-DD", inclusive, on updated_at
+    date_from: str | None = None
+    date_to: str | None = None
+
+
+class FacetCounts(NamedTuple):
+    # prompts per value under all the other facets: (type id, name, prompts),
+    # (model, prompts), (lora, prompts); most used first
+    types: list[tuple[int, str, int]]
+    models: list[tuple[str, int]]
+    loras: list[tuple[str, int]]
+    # prompts matching the whole filter
+    total: int
+
+
+class DuplicateGroup(NamedTuple):
+    # near-duplicates (dedup.find_duplicates), oldest prompt first
+    ids: tuple[int, ...]
+    # lowest estimated Jaccard similarity of a member to the first one
+    similarity: float
+
+
+class BackupInfo(NamedTuple):
+    # a snapshot file (backup.list_backups)
+    path: str
+    created_at: int  # UNIX time, from the file name
+    size: int  # bytes
+
+# ============================================================
+# Change notifications (DB.subscribe)
+# ============================================================
+
+class ChangeKind(str, Enum):
+    PROFILE_CREATED = "profile_created"
+    PROFILE_DELETED = "profile_deleted"
+    TYPE_CREATED = "type_created"
+    TYPE_RENAMED = "type_renamed"
+    TYPE_DELETED = "type_deleted"
+    PROMPTS_INSERTED = "prompts_inserted"
+    PROMPTS_UPDATED = "prompts_updated"
+    PROMPTS_DELETED = "prompts_deleted"
+    # the profile's prompts changed in a way that cannot be told prompt by
+    # prompt (another process deleted some, a backup was restored): views
+    # reload; ids are empty
+    PROMPTS_RELOADED = "prompts_reloaded"
+
+
+class Change(NamedTuple):
+    kind: ChangeKind
+    profile_id: int
+    # prompt ids for PROMPTS_*, type ids for TYPE_*, the profile id for PROFILE_*
+    ids: tuple[int, ...] = ()
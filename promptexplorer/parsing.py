@@ -0,0 +1,99 @@
+import re
+from functools import lru_cache
+
+
+# ============================================================
+# Prompt text parsing
+# ============================================================
+
+_LORA_TAG = re.compile(r"<\s*(?:lora|lyco)\s*:\s*([^:>]+?)\s*(?::[^>]*)?>", re.IGNORECASE)
+_LORA_SEP = re.compile(r"[,;\n]+")
+_LORA_WEIGHT = re.compile(r"\s*:\s*-?[\d.]+\s*$")
+
+
+def parse_loras(text: str) -> list[str]:
+    # The LoRA field is free text: either A1111 tags (<lora:name:0.8>) or a
+    # plain list ("name:0.8, other"). Names are returned without weights,
+    # de-duplicated case-insensitively, in order of appearance.
+    text = text or ""
+    names = _LORA_TAG.findall(text)
+    if not names:
+        names = [_LORA_WEIGHT.sub("", part).strip() for part in _LORA_SEP.split(text)]
+
+    out: list[str] = []
+    seen: set[str] = set()
+    for name in names:
+        name = name.strip()
+        if name and name.casefold() not in seen:
+            seen.add(name.casefold())
+            out.append(name)
+    return out
+
+
+# ---------------------------
+# SD tags (positive / negative)
+# ---------------------------
+
+_TAG_SPLIT = re.compile(r"[,\n]+|\bBREAK\b")
+_EXTRA_NET = re.compile(r"<\s*([a-z]+)\s*:\s*([^:>]+?)\s*(?::[^>]*)?>", re.IGNORECASE)
+_EMPHASIS = re.compile(r"(?<!\\)[()\[\]{}]")
+_TAG_WEIGHT = re.compile(r"\s*:\s*-?\d*\.?\d+\s*$")
+
+
+_EMPHASIS_CHARS = str.maketrans("", "", "()[]{}")
+
+
+# the same tags come back in prompt after prompt: memoized
+@lru_cache(maxsize=1 << 16)
+def normalize_tag(tag: str) -> str:
+    # "(Long_Hair:1.2)" -> "long hair"; escaped brackets stay: "artist \(style\)" -> "artist (style)".
+    if "\\" in tag:
+        tag = _EMPHASIS.sub("", tag).replace("\\(", "(").replace("\\)", ")")
+    else:
+        tag = tag.translate(_EMPHASIS_CHARS)
+    if ":" in tag:
+        tag = _TAG_WEIGHT.sub("", tag)
+    return " ".join(tag.replace("_", " ").casefold().split())
+
+
+def parse_tags(text: str) -> list[str]:
+    # A1111 prompt syntax: comma separated tags with (tag:1.2), ((tag)),
+    # [tag] emphasis and <lora:name:0.8> extra networks ("lora:name").
+    # Normalized, de-duplicated, in order of appearance.
+    out: list[str] = []
+    seen: set[str] = set()
+
+    def add(tag: str) -> None:
+        if tag and tag not in seen:
+            seen.add(tag)
+            out.append(tag)
+
+    for chunk in _TAG_SPLIT.split(text or ""):
+        if "<" in chunk:
+            for kind, name in _EXTRA_NET.findall(chunk):
+                add(f"{kind.casefold()}:{name.strip().casefold()}")
+            chunk = _EXTRA_NET.sub("", chunk)
+        add(normalize_tag(chunk))
+    return out
+
+
+# ---------------------------
+# Content hash (duplicate detection)
+# ---------------------------
+
+_SPACES = re.compile(r"\s+")
+_COMMA = re.compile(r"\s*,\s*")
+
+
+def normalize_text(text: str) -> str:
+    # case, runs of whitespace and spacing around commas do not make a prompt different
+    text = _SPACES.sub(" ", str(text or "").casefold()).strip()
+    return _COMMA.sub(", ", text)
+
+
+def content_hash(name: str, description: str, positive: str, negative: str, lora: str, model: str) -> str:
+    # Also registered as the SQL function content_hash(6 args): keep it deterministic.
+    import hashlib  # loads OpenSSL: only when hashing, not on every CLI start
+
+    parts = (normalize_text(t) for t in (name, description, positive, negative, lora, model))
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,191 @@
+from typing import Callable, Iterable
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal
+
+from .constants import PAGE_SIZE
+from .db_executor import DBExecutor
+from .models import PromptSummary, SearchHit
+from .utils import format_ts
+
+
+# ============================================================
+# Lazy, paged list model for prompt lists
+# ============================================================
+#
+# A source is a callable fetch(cursor, limit) -> (records, next_cursor).
+# cursor is None for the first page; next_cursor None means "no more rows".
+# Records are PromptSummary (keyset-paged list) or SearchHit (offset-paged
+# search results). With an executor, pages are fetched on a DB worker
+# thread; a new source cancels the page still in flight for the old one.
+#
+# Edits are patched in place (patch / prepend / remove_ids / rename_type),
+# so selection, current row and scroll position survive them.
+
+Record = PromptSummary | SearchHit
+FetchPage = Callable[[object | None, int], tuple[list[Record], object | None]]
+
+
+class PromptListModel(QAbstractListModel):
+
+    IdRole = Qt.UserRole
+
+    # Once per set_source(), when its first page is in: the row count (rows
+    # prepended meanwhile included), or the error it failed with.
+    firstPageLoaded = Signal(int)
+    firstPageFailed = Signal(object)
+
+    def __init__(self, executor: DBExecutor | None = None, page_size: int = PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.page_size = page_size
+        self._key = f"page-{id(self)}"
+        self._fetch: FetchPage | None = None
+        self._rows: list[Record] = []
+        self._pos: dict[int, int] = {}
+        self._cursor: object | None = None
+        self._exhausted = True
+        self._loading = False
+        self._first_pending = False
+
+    def set_source(self, fetch: FetchPage | None) -> None:
+        if self.executor is not None:
+            self.executor.cancel(self._key)
+
+        self.beginResetModel()
+        self._fetch = fetch
+        self._rows = []
+        self._pos = {}
+        self._cursor = None
+        self._exhausted = fetch is None
+        self._loading = False
+        self._first_pending = fetch is not None
+        self.endResetModel()
+
+        # first page right away, the view pulls the rest on scroll
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def prompt_id(self, row: int) -> int | None:
+        if 0 <= row < len(self._rows):
+            return self._rows[row].id
+        return None
+
+    def row_of(self, prompt_id: int) -> int:
+        return self._pos.get(prompt_id, -1)
+
+    # ---------------------------
+    # In-place patches
+    # ---------------------------
+    def patch(self, records: Iterable[Record]) -> None:
+        for rec in records:
+            row = self._pos.get(rec.id, -1)
+            if row < 0:
+                continue
+            old = self._rows[row]
+            # a search hit keeps its snippet / rank, takes the fresh type and name
+            if isinstance(old, SearchHit):
+                rec = old._replace(type_id=rec.type_id, type=rec.type, name=rec.name)
+            self._rows[row] = rec
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx)
+
+    def prepend(self, records: list[Record]) -> None:
+        records = [r for r in records if r.id not in self._pos]
+        if not records:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(records) - 1)
+        self._rows[0:0] = records
+        self._reindex()
+        self.endInsertRows()
+
+    def remove_ids(self, prompt_ids: Iterable[int]) -> None:
+        # one signal pair per run of adjacent rows, bottom-up, so the row
+        # numbers of the remaining runs stay valid
+        rows = sorted((self._pos[i] for i in set(prompt_ids) if i in self._pos), reverse=True)
+        if not rows:
+            return
+        runs: list[tuple[int, int]] = []
+        for row in rows:
+            if runs and row == runs[-1][0] - 1:
+                runs[-1] = (row, runs[-1][1])
+            else:
+                runs.append((row, row))
+        for first, last in runs:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first:last + 1]
+            self.endRemoveRows()
+        self._reindex()
+
+    def remove_type(self, type_id: int) -> None:
+        self.remove_ids([r.id for r in self._rows if r.type_id == type_id])
+
+    def rename_type(self, type_id: int, name: str) -> None:
+        for row, rec in enumerate(self._rows):
+            if rec.type_id == type_id:
+                self._rows[row] = rec._replace(type=name)
+                idx = self.index(row)
+                self.dataChanged.emit(idx, idx)
+
+    def _reindex(self) -> None:
+        self._pos = {rec.id: row for row, rec in enumerate(self._rows)}
+
+    # ---------------------------
+    # QAbstractListModel
+    # ---------------------------
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        rec = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"[{rec.type}] {rec.name}"
+        if role == Qt.ToolTipRole:
+            return rec.snippet if isinstance(rec, SearchHit) else f"Обновлён: {format_ts(rec.updated_at)}"
+        if role == self.IdRole:
+            return rec.id
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if not self.canFetchMore(parent) or self._fetch is None:
+            return
+
+        if self.executor is None:
+            self._append(self._fetch(self._cursor, self.page_size))
+            return
+
+        self._loading = True
+        self.executor.read(self._fetch, self._cursor, self.page_size, key=self._key).then(self._append, self._failed)
+
+    def _append(self, page: tuple[list[Record], object | None]) -> None:
+        records, cursor = page
+        first = len(self._rows)
+
+        self._loading = False
+        self._cursor = cursor
+        self._exhausted = cursor is None
+
+        # rows prepended by an edit may come again with a later page
+        records = [r for r in records if r.id not in self._pos]
+        if records:
+            self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+            for rec in records:
+                self._pos[rec.id] = len(self._rows)
+                self._rows.append(rec)
+            self.endInsertRows()
+
+        if self._first_pending:
+            self._first_pending = False
+            self.firstPageLoaded.emit(len(self._rows))
+
+    def _failed(self, err: Exception) -> None:
+        # stop paging this source; the next set_source() starts over
+        self._loading = False
+        self._exhausted = True
+        if self._first_pending:
+            self._first_pending = False
+            self.firstPageFailed.emit(err)
@@ -0,0 +1,43 @@
+import os
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QIcon, QPixmap
+from PySide6.QtWidgets import QApplication, QDialog, QWidget
+
+from .utils import resource_path
+
+
+# ============================================================
+# Qt helpers
+# ============================================================
+
+def center_dialog(dlg: QDialog, parent: QWidget | None = None) -> None:
+
+    dlg.adjustSize()
+
+    if parent:
+        g = parent.frameGeometry()
+        dlg.move(g.center() - dlg.rect().center())
+    else:
+        screen = QApplication.primaryScreen().availableGeometry()
+        dlg.move(screen.center() - dlg.rect().center())
+
+
+def load_hidpi_icon(filename: str, logical_size: int) -> QIcon | None:
+
+    path = resource_path(filename)
+    if not os.path.exists(path):
+        return None
+
+    pm = QPixmap(path)
+    if pm.isNull():
+        return None
+
+    scr = QApplication.primaryScreen()
+    dpr = scr.devicePixelRatio() if scr else 1.0
+
+    target = int(logical_size * dpr)
+    scaled = pm.scaled(target, target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    scaled.setDevicePixelRatio(dpr)
+
+    return QIcon(scaled)
@@ -0,0 +1,359 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from .db import DB
+
+
+# ============================================================
+# Similar prompts: TF-IDF cosine over positive tags
+# ============================================================
+#
+# A prompt is the set of its positive tags (prompt_tags, side 0), every
+# tag weighted by its smoothed idf; two prompts are as similar as the
+# cosine of these vectors. The term matrix is kept on disk next to the
+# database, one directory per profile, and memory-mapped:
+#
+#   <db>.similar/p<profile_id>/
+#       meta.json          {"format", "gen", "rows", "nnz"}
+#       ids.<gen>.bin      int64[rows]   prompt id of a row, -1 = stale row
+#       stamps.<gen>.bin   uint64[rows]  content_hash prefix the row was built from
+#       ends.<gen>.bin     int64[rows]   end offset of the row in terms (CSR)
+#       terms.<gen>.bin    int32[nnz]    tag ids, sorted within a row
+#
+# Updates are incremental: the rows of edited and deleted prompts are
+# marked stale in place and new versions are appended; meta.json is
+# replaced last, so a crash leaves the previous state (longer files are
+# cut back on load). Once stale rows make up half of the matrix it is
+# rewritten as the next generation.
+#
+# The directory is shared by every process on the database (the app, `cli
+# similar`): files are only touched under a lock file next to meta.json,
+# and a meta.json that moved since our load means another process synced,
+# so its state is loaded before ours is compared with the DB.
+#
+# A query is one gather over the term array and a np.add.reduceat per
+# row — no per-pair Python loop; df and row norms are recomputed only
+# after the matrix changed.
+
+INDEX_SUFFIX = ".similar"
+FORMAT = 1
+FETCH_BATCH = 500
+COMPACT_SHARE = 0.5
+
+_FILES = {"ids": np.int64, "stamps": np.uint64, "ends": np.int64, "terms": np.int32}
+
+
+@contextmanager
+def _file_lock(path: str):
+    # exclusive across processes; blocks until granted
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            while True:
+                f.seek(0)
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after 10 s
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class SimilarIndex:
+
+    def __init__(self, db: DB, profile_id: int):
+        self.db = db
+        self.profile_id = profile_id
+        self.dir = os.path.join(db.path + INDEX_SUFFIX, f"p{profile_id}")
+        # sync() and query() run on DBExecutor readers: one at a time
+        self.lock = threading.Lock()
+
+        self._token: tuple[int, int, int] | None = None
+        self._gen = 0
+        self._rows = 0
+        self._nnz = 0
+        self._arrays: dict[str, np.ndarray] = {}
+        self._derived: dict[str, np.ndarray] | None = None
+        with self._locked():
+            self._load()
+
+    # ---------------------------
+    # Files
+    # ---------------------------
+    def _path(self, name: str, gen: int | None = None) -> str:
+        return os.path.join(self.dir, f"{name}.{self._gen if gen is None else gen}.bin")
+
+    def _locked(self):
+        return _file_lock(os.path.join(self.dir, "lock"))
+
+    def _read_meta(self) -> tuple[int, int, int]:
+        # (gen, rows, nnz); raises when missing or broken
+        with open(os.path.join(self.dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT:
+            raise ValueError("index format")
+        return int(meta["gen"]), int(meta["rows"]), int(meta["nnz"])
+
+    def _moved(self) -> bool:
+        # meta.json is not the one we loaded or wrote: another process synced
+        try:
+            return self._read_meta() != (self._gen, self._rows, self._nnz)
+        except (OSError, ValueError, KeyError, TypeError):
+            return self._rows > 0
+
+    def _load(self) -> None:
+        try:
+            self._gen, self._rows, self._nnz = self._read_meta()
+            for name, dtype in _FILES.items():
+                size = (self._nnz if name == "terms" else self._rows) * np.dtype(dtype).itemsize
+                with open(self._path(name), "r+b") as f:
+                    if os.fstat(f.fileno()).st_size < size:
+                        raise ValueError(f"{name}: truncated")
+                    # an append that did not reach meta.json
+                    f.truncate(size)
+        except (OSError, ValueError, KeyError, TypeError):
+            # missing or broken: rebuilt from the DB on the first sync
+            self._gen, self._rows, self._nnz = 0, 0, 0
+        self._map()
+
+    def _map(self) -> None:
+        self._arrays = {}
+        for name, dtype in _FILES.items():
+            n = self._nnz if name == "terms" else self._rows
+            self._arrays[name] = (
+                np.memmap(self._path(name), dtype=dtype, mode="r", shape=(n,)) if n else np.empty(0, dtype)
+            )
+        self._derived = None
+
+    def _unmap(self) -> None:
+        # Windows cannot resize or replace a mapped file
+        self._arrays = {}
+        self._derived = None
+
+    def _write_meta(self) -> None:
+        tmp = os.path.join(self.dir, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format": FORMAT, "gen": self._gen, "rows": self._rows, "nnz": self._nnz}, f)
+        os.replace(tmp, os.path.join(self.dir, "meta.json"))
+
+    def _rewrite(self, arrays: dict[str, np.ndarray]) -> None:
+        # next generation; the old files are removed once meta.json points past them
+        old, self._gen = self._gen, self._gen + 1
+        os.makedirs(self.dir, exist_ok=True)
+        for name, dtype in _FILES.items():
+            arrays[name].astype(dtype, copy=False).tofile(self._path(name))
+        self._rows, self._nnz = len(arrays["ids"]), len(arrays["terms"])
+        self._write_meta()
+        for name in _FILES:
+            try:
+                os.remove(self._path(name, old))
+            except OSError:
+                pass
+
+    def _append(self, stale_rows: np.ndarray, arrays: dict[str, np.ndarray]) -> None:
+        with open(self._path("ids"), "r+b") as f:
+            for row in stale_rows.tolist():
+                f.seek(row * 8)
+                f.write(np.int64(-1).tobytes())
+        for name, dtype in _FILES.items():
+            with open(self._path(name), "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                arrays[name].astype(dtype, copy=False).tofile(f)
+        self._rows += len(arrays["ids"])
+        self._nnz += len(arrays["terms"])
+        self._write_meta()
+
+    # ---------------------------
+    # Sync with the DB
+    # ---------------------------
+    def _fetch_terms(self, prompt_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # (row lengths, concatenated sorted tag ids) of the given prompts
+        lengths = np.zeros(len(prompt_ids), np.int64)
+        chunks: list[np.ndarray] = []
+        for start in range(0, len(prompt_ids), FETCH_BATCH):
+            batch = prompt_ids[start:start + FETCH_BATCH].tolist()
+            keys = self.db.prompt_tag_keys(batch)
+            for i, pid in enumerate(batch, start):
+                # tag_id * 2 + side; side 0 = positive
+                k = np.asarray(keys.get(pid, ()), np.int64)
+                t = np.unique(k[(k & 1) == 0] >> 1)
+                lengths[i] = len(t)
+                chunks.append(t)
+        return lengths, np.concatenate(chunks) if chunks else np.empty(0, np.int64)
+
+    def sync(self) -> bool:
+        # True when the matrix changed
+        token = self.db.change_token()
+        if token == self._token:
+            return False
+        with self._locked():
+            if self._moved():
+                self._unmap()
+                self._load()
+            return self._sync(token)
+
+    def _sync(self, token: tuple[int, int, int]) -> bool:
+        rows = self.db.prompt_hashes(self.profile_id)
+        cur_ids = np.array([r[0] for r in rows], np.int64)
+        # the first 8 bytes of the hex digest, big-endian
+        digest = bytes.fromhex("".join((r[1] or "0" * 16)[:16] for r in rows))
+        cur_stamps = np.frombuffer(digest, ">u8").astype(np.uint64)
+
+        # copies: the maps are dropped before the files are touched
+        ids = np.array(self._arrays["ids"])
+        stamps = np.array(self._arrays["stamps"])
+        live_rows = np.flatnonzero(ids >= 0)
+        order = np.argsort(ids[live_rows], kind="stable")
+        known_ids, known_rows = ids[live_rows][order], live_rows[order]
+
+        same = np.zeros(len(cur_ids), bool)
+        if len(known_ids):
+            pos = np.minimum(np.searchsorted(known_ids, cur_ids), len(known_ids) - 1)
+            same = (known_ids[pos] == cur_ids) & (stamps[known_rows[pos]] == cur_stamps)
+        keep = np.zeros(self._rows, bool)
+        if same.any():
+            keep[known_rows[pos[same]]] = True
+        stale = live_rows[~keep[live_rows]]  # edited or deleted
+        fresh_ids, fresh_stamps = cur_ids[~same], cur_stamps[~same]
+
+        if len(stale) or len(fresh_ids):
+            lengths, terms = self._fetch_terms(fresh_ids)
+            fresh = {"ids": fresh_ids, "stamps": fresh_stamps, "ends": self._nnz + np.cumsum(lengths), "terms": terms}
+            dead = self._rows - len(live_rows) + len(stale)
+            self._unmap()
+            if self._rows == 0 or dead > (self._rows + len(fresh_ids)) * COMPACT_SHARE:
+                self._rewrite(self._compacted(ids, keep, fresh))
+            else:
+                self._append(stale, fresh)
+            self._map()
+
+        self._token = token
+        return bool(len(stale) or len(fresh_ids))
+
+    def _compacted(self, ids: np.ndarray, keep: np.ndarray, fresh: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        # all kept rows followed by the fresh ones; reads the old files (still on disk)
+        rows = np.flatnonzero(keep)
+        out = {"ids": ids[rows], "stamps": np.empty(0, np.uint64), "ends": np.empty(0, np.int64),
+               "terms": np.empty(0, np.int32)}
+        if self._rows:
+            stamps = np.fromfile(self._path("stamps"), np.uint64, self._rows)
+            ends = np.fromfile(self._path("ends"), np.int64, self._rows)
+            terms = np.fromfile(self._path("terms"), np.int32, self._nnz)
+            starts = np.r_[0, ends[:-1]]
+            lengths = ends[rows] - starts[rows]
+            mask = np.repeat(keep, ends - starts)
+            out["stamps"], out["terms"] = stamps[rows], terms[mask]
+            out["ends"] = np.cumsum(lengths)
+        base = len(out["terms"])
+        return {
+            "ids": np.r_[out["ids"], fresh["ids"]],
+            "stamps": np.r_[out["stamps"], fresh["stamps"]],
+            "ends": np.r_[out["ends"], fresh["ends"] - self._nnz + base],
+            "terms": np.r_[out["terms"], fresh["terms"]],
+        }
+
+    # ---------------------------
+    # Query
+    # ---------------------------
+    def _derive(self) -> dict[str, np.ndarray]:
+        if self._derived is not None:
+            return self._derived
+        ids, ends, terms = self._arrays["ids"], self._arrays["ends"], self._arrays["terms"]
+        starts = np.r_[0, ends[:-1]].astype(np.int64)
+        lengths = ends - starts
+        live = ids >= 0
+
+        vocab = int(terms.max()) + 1 if len(terms) else 1
+        df = np.bincount(terms[np.repeat(live, lengths)], minlength=vocab)
+        n = int(live.sum())
+        idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        norms = self._row_sums(idf[terms] ** 2, starts, lengths)
+        live_rows = np.flatnonzero(live)
+        order = np.argsort(ids[live_rows], kind="stable")
+
+        self._derived = {
+            "starts": starts, "lengths": lengths, "live": live, "idf": idf,
+            "norms": np.sqrt(norms), "ids": ids[live_rows][order], "rows": live_rows[order],
+        }
+        return self._derived
+
+    @staticmethod
+    def _row_sums(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        # reduceat yields values[start] for empty rows and rejects start == len
+        if not len(values):
+            return np.zeros(len(starts), np.float32)
+        sums = np.add.reduceat(values, np.minimum(starts, len(values) - 1))
+        sums[lengths == 0] = 0
+        return sums
+
+    def query(self, prompt_id: int, limit: int) -> list[tuple[int, float]]:
+        d = self._derive()
+        pos = np.searchsorted(d["ids"], prompt_id)
+        if pos >= len(d["ids"]) or d["ids"][pos] != prompt_id:
+            return []
+        row = int(d["rows"][pos])
+        terms = self._arrays["terms"]
+        own = np.asarray(terms[d["starts"][row]:d["starts"][row] + d["lengths"][row]])
+        if not len(own) or d["norms"][row] == 0:
+            return []
+
+        # binary tf: q . x = sum of idf^2 over the shared tags
+        weights = np.zeros(len(d["idf"]), np.float32)
+        weights[own] = d["idf"][own] ** 2
+        dots = self._row_sums(weights[terms], d["starts"], d["lengths"])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = dots / (d["norms"] * d["norms"][row])
+        scores[~d["live"] | (d["norms"] == 0)] = 0
+        scores[row] = 0
+
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-scores[hits], limit - 1)[:limit]]
+        ids = self._arrays["ids"]
+        ranked = sorted(((float(scores[r]), int(ids[r])) for r in hits), key=lambda h: (-h[0], h[1]))
+        return [(pid, score) for score, pid in ranked]
+
+
+# ---------------------------
+# Entry points
+# ---------------------------
+
+_indexes: dict[tuple[str, int], SimilarIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def index_for(db: DB, profile_id: int) -> SimilarIndex:
+    # one per database file and profile, kept for the process lifetime
+    key = (os.path.abspath(db.path), profile_id)
+    with _indexes_lock:
+        idx = _indexes.get(key)
+        if idx is None or idx.db is not db:
+            idx = _indexes[key] = SimilarIndex(db, profile_id)
+        return idx
+
+
+def similar_prompts(db: DB, profile_id: int, prompt_id: int, limit: int = 20) -> list[tuple[int, float]]:
+    # (prompt id, cosine) of the closest prompts, best first
+    idx = index_for(db, profile_id)
+    with idx.lock:
+        idx.sync()
+        return idx.query(prompt_id, limit)
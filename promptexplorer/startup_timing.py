@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+
+from .constants import APP_VERSION
+
+
+# ============================================================
+# Startup timing report
+# ============================================================
+#
+# Import this module before anything heavy (app.py does it first), so T0
+# is close to the process start. Marks are milliseconds since T0.
+#
+#   python run.py --startup-report     (or PROMPTEXPLORER_STARTUP_REPORT=1)
+#
+# prints the marks to stderr and appends them as one JSON line to
+# STARTUP_LOG in the app data dir, so runs and releases can be compared.
+
+T0 = time.perf_counter()
+
+
+class StartupTimer:
+
+    def __init__(self):
+        self.marks: dict[str, float] = {}
+        self.enabled = "--startup-report" in sys.argv or bool(os.getenv("PROMPTEXPLORER_STARTUP_REPORT"))
+
+    def mark(self, name: str) -> None:
+        # first occurrence wins: "first_paint" is the first one
+        self.marks.setdefault(name, (time.perf_counter() - T0) * 1000.0)
+
+    def report(self) -> str:
+        lines = [f"startup, {APP_VERSION}:"]
+        prev = 0.0
+        for name, ms in self.marks.items():
+            lines.append(f"  {name:<18}{ms:9.1f} ms  (+{ms - prev:.1f})")
+            prev = ms
+        return "\n".join(lines)
+
+    def finish(self, log_path: str) -> None:
+        if not self.enabled:
+            return
+        import json
+
+        print(self.report(), file=sys.stderr)
+        entry = {"version": APP_VERSION, "at": time.strftime("%Y-%m-%d %H:%M:%S"), **self.marks}
+        try:
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"startup report not saved: {e}", file=sys.stderr)
+
+
+timer = StartupTimer()
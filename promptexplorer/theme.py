@@ -0,0 +1,215 @@
+import time
+from functools import lru_cache
+from typing import Callable
+
+from PySide6.QtWidgets import QApplication
+
+
+# ============================================================
+# Themes
+# ============================================================
+#
+# The stylesheet is set once, on the application: every window and
+# dialog inherits it, so opening a dialog does not re-parse any QSS.
+# The text per theme is built once and cached; apply_theme() is a no-op
+# when the theme is already applied.
+
+THEMES = ("light", "dark")
+
+PALETTES: dict[str, dict[str, str]] = {
+    "dark": {
+        "bg": "#121212",
+        "card": "#1b1b1b",
+        "field": "#181818",
+        "border": "#2a2a2a",
+        "text": "#e7e7e7",
+        "hint": "#bdbdbd",
+        "tab_bg": "#171717",
+        "tab_sel": "#1f1f1f",
+        "hover": "#202020",
+        "sel_bg": "#2f4d7a",
+        "sel_text": "#ffffff",
+        "splitter": "#2a2a2a",
+        "menu_bg": "#1d1d1d",
+    },
+    "light": {
+        "bg": "#f3f3f3",
+        "card": "#ffffff",
+        "field": "#ffffff",
+        "border": "#dcdcdc",
+        "text": "#111111",
+        "hint": "#222222",
+        "tab_bg": "#f7f7f7",
+        "tab_sel": "#ffffff",
+        "hover": "#f6f6f6",
+        "sel_bg": "#cfe5ff",
+        "sel_text": "#000000",
+        "splitter": "#e5e5e5",
+        "menu_bg": "#ffffff",
+    },
+}
+
+_QSS = """
+    QWidget {{
+        color: {text};
+        font-size: 10.5pt;
+        font-family: "Segoe UI";
+    }}
+
+    QMainWindow, QDialog {{
+        background: {bg};
+    }}
+
+    QWidget#Card {{
+        background: {card};
+        border: 1px solid {border};
+        border-radius: 12px;
+    }}
+
+    QLineEdit, QPlainTextEdit, QTextEdit, QListView, QTreeWidget, QComboBox {{
+        color: {text};
+        background: {field};
+        border: 1px solid {border};
+        border-radius: 10px;
+        padding: 8px;
+        selection-background-color: {sel_bg};
+        selection-color: {sel_text};
+    }}
+
+    QComboBox::drop-down {{
+        border: 0px;
+        width: 26px;
+    }}
+
+    QPushButton {{
+        color: {text};
+        background: {card};
+        border: 1px solid {border};
+        border-radius: 10px;
+        padding: 8px 12px;
+        min-height: 34px;
+    }}
+    QPushButton:hover {{
+        background: {hover};
+    }}
+    QPushButton:pressed {{
+        background: {field};
+    }}
+
+    /* Theme toggle button */
+    QPushButton#ThemeBtn {{
+        min-height: 0px;
+        padding: 0px;
+        border-radius: 16px;
+        border: 1px solid {border};
+        background: {card};
+    }}
+    QPushButton#ThemeBtn:hover {{
+        background: {hover};
+    }}
+    QPushButton#ThemeBtn:pressed {{
+        background: {field};
+    }}
+
+    QTabWidget::pane {{
+        border: 0px;
+        margin-top: 8px;
+    }}
+    QTabBar::tab {{
+        color: {text};
+        background: {tab_bg};
+        border: 1px solid {border};
+        border-radius: 10px;
+        padding: 8px 14px;
+        margin-right: 6px;
+    }}
+    QTabBar::tab:selected {{
+        background: {tab_sel};
+    }}
+
+    QListView::item, QTreeWidget::item {{
+        padding: 6px;
+        border-radius: 8px;
+    }}
+    QListView::item:selected, QTreeWidget::item:selected {{
+        background: {sel_bg};
+        color: {sel_text};
+    }}
+
+    QLabel#Hint {{
+        color: {hint};
+    }}
+
+    QSplitter::handle {{
+        background: {splitter};
+    }}
+
+    QMenu {{
+        background: {menu_bg};
+        color: {text};
+        border: 1px solid {border};
+        border-radius: 10px;
+        padding: 6px;
+    }}
+    QMenu::item {{
+        padding: 6px 12px;
+        border-radius: 8px;
+    }}
+    QMenu::item:selected {{
+        background: {sel_bg};
+        color: {sel_text};
+    }}
+
+    QToolBar {{
+        border: 0px;
+        background: transparent;
+        spacing: 8px;
+    }}
+    """
+
+
+def normalize_theme(theme: object) -> str:
+    return theme if theme in THEMES else "light"
+
+
+@lru_cache(maxsize=None)
+def theme_qss(theme: str) -> str:
+    return _QSS.format(**PALETTES[normalize_theme(theme)])
+
+
+# ---------------------------
+# Applying (app-wide)
+# ---------------------------
+
+# hook(theme, ms): called after every re-polish, e.g. to log its cost
+RepolishHook = Callable[[str, float], None]
+_repolish_hooks: list[RepolishHook] = []
+
+
+def add_repolish_hook(hook: RepolishHook) -> None:
+    _repolish_hooks.append(hook)
+
+
+def apply_theme(theme: str) -> float:
+    # Returns the re-polish time in ms (0 when nothing had to change).
+    app = QApplication.instance()
+    qss = theme_qss(theme)
+    if app.styleSheet() == qss:
+        return 0.0
+
+    # Qt re-polishes every widget; painting is held back on the visible
+    # windows until it is done, so they repaint once instead of per widget.
+    t0 = time.perf_counter()
+    windows = [w for w in app.topLevelWidgets() if w.isVisible() and w.updatesEnabled()]
+    for w in windows:
+        w.setUpdatesEnabled(False)
+    try:
+        app.setStyleSheet(qss)
+    finally:
+        for w in windows:
+            w.setUpdatesEnabled(True)
+    ms = (time.perf_counter() - t0) * 1000.0
+
+    for hook in _repolish_hooks:
+        hook(theme, ms)
+    return ms
@@ -0,0 +1,60 @@
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+# ============================================================
+# Type names of the current profile
+# ============================================================
+#
+# Cached in the GUI: filled from list_types when the profile changes,
+# then kept up to date from DB change notifications, so the prompt
+# dialog's type combo and completer never query the DB.
+
+class TypeListModel(QAbstractListModel):
+
+    IdRole = Qt.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: list[tuple[int, str]] = []
+
+    def reset(self, types: list[tuple[int, str]]) -> None:
+        self.beginResetModel()
+        self._rows = sorted(types, key=lambda r: r[1].lower())
+        self.endResetModel()
+
+    def names(self) -> list[str]:
+        return [name for _, name in self._rows]
+
+    def upsert(self, type_id: int, name: str) -> None:
+        # new type or renamed one: (re)placed in case-insensitive order
+        self.remove(type_id)
+        pos = 0
+        while pos < len(self._rows) and self._rows[pos][1].lower() <= name.lower():
+            pos += 1
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows.insert(pos, (type_id, name))
+        self.endInsertRows()
+
+    def remove(self, type_id: int) -> None:
+        for row, (tid, _) in enumerate(self._rows):
+            if tid == type_id:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._rows[row]
+                self.endRemoveRows()
+                return
+
+    # ---------------------------
+    # Qt model API
+    # ---------------------------
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+        tid, name = self._rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return name
+        if role == self.IdRole:
+            return tid
+        return None
@@ -1,16 +1,13 @@
 import os
 import sys
-from datetime import datetime
-
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QIcon, QPixmap
-from PySide6.QtWidgets import QApplication, QDialog, QWidget
+import time
+from datetime import date, datetime, timedelta
 
 from .constants import APP_NAME
 
 
 # ============================================================
-# Utils
+# Utils (no Qt here: imported by db.py and the CLI)
 # ============================================================
 
 def resource_path(rel_path: str) -> str:
@@ -45,182 +42,49 @@ def now_iso() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def center_dialog(dlg: QDialog, parent: QWidget | None = None) -> None:
-
-    dlg.adjustSize()
+# ---------------------------
+# Timestamps: prompts store integer UNIX time (UTC); text is for display only
+# ---------------------------
 
-    if parent:
-        g = parent.frameGeometry()
-        dlg.move(g.center() - dlg.rect().center())
-    else:
-        screen = QApplication.primaryScreen().availableGeometry()
-        dlg.move(screen.center() - dlg.rect().center())
+def now_ts() -> int:
+    return int(time.time())
 
 
-def load_hidpi_icon(filename: str, logical_size: int) -> QIcon | None:
+def format_ts(ts: int) -> str:
+    # local time, the format the prompts were stored in before v9
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
 
-    path = resource_path(filename)
-    if not os.path.exists(path):
-        return None
 
-    pm = QPixmap(path)
-    if pm.isNull():
-        return None
+def local_midnight(day: date) -> int:
+    # start of a local calendar day (DST days are 23 or 25 hours long)
+    return int(datetime(day.year, day.month, day.day).timestamp())
 
-    scr = QApplication.primaryScreen()
-    dpr = scr.devicePixelRatio() if scr else 1.0
 
-    target = int(logical_size * dpr)
-    scaled = pm.scaled(target, target, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-    scaled.setDevicePixelRatio(dpr)
+def day_range(first: str | None, last: str | None) -> tuple[int | None, int | None]:
+    # inclusive "YYYY-MM-DD" days -> half-open [start, end) in UNIX time
+    start = local_midnight(date.fromisoformat(first)) if first else None
+    end = local_midnight(date.fromisoformat(last) + timedelta(days=1)) if last else None
+    return start, end
 
-    return QIcon(scaled)
 
+def period_buckets(period: str, count: int, today: date | None = None) -> list[tuple[str, int, int]]:
+    # the last `count` local days / weeks (from Monday) / months up to today,
+    # newest first: (label, start, end) with [start, end) in UNIX time
+    today = today or date.today()
+    if period == "month":
+        # month starts from the next one back: bucket i is [firsts[i + 1], firsts[i])
+        n = today.year * 12 + today.month - 1
+        firsts = [date((n - i) // 12, (n - i) % 12 + 1, 1) for i in range(-1, count)]
+        return [
+            (firsts[i + 1].strftime("%Y-%m"), local_midnight(firsts[i + 1]), local_midnight(firsts[i]))
+            for i in range(count)
+        ]
 
-def theme_qss(theme: str) -> str:
-    if theme == "dark":
-        bg = "#121212"
-        card = "#1b1b1b"
-        field = "#181818"
-        border = "#2a2a2a"
-        text = "#e7e7e7"
-        hint = "#bdbdbd"
-        tab_bg = "#171717"
-        tab_sel = "#1f1f1f"
-        hover = "#202020"
-        sel_bg = "#2f4d7a"
-        sel_text = "#ffffff"
-        splitter = "#2a2a2a"
-        menu_bg = "#1d1d1d"
+    if period == "week":
+        start, step, fmt = today - timedelta(days=today.weekday()), timedelta(weeks=1), "%G-W%V"
     else:
-        bg = "#f3f3f3"
-        card = "#ffffff"
-        field = "#ffffff"
-        border = "#dcdcdc"
-        text = "#111111"
-        hint = "#222222"
-        tab_bg = "#f7f7f7"
-        tab_sel = "#ffffff"
-        hover = "#f6f6f6"
-        sel_bg = "#cfe5ff"
-        sel_text = "#000000"
-        splitter = "#e5e5e5"
-        menu_bg = "#ffffff"
-
-    return f"""
-    QWidget {{
-        color: {text};
-        font-size: 10.5pt;
-        font-family: "Segoe UI";
-    }}
-
-    QMainWindow, QDialog {{
-        background: {bg};
-    }}
-
-    QWidget#Card {{
-        background: {card};
-        border: 1px solid {border};
-        border-radius: 12px;
-    }}
-
-    QLineEdit, QPlainTextEdit, QTextEdit, QListWidget, QTreeWidget, QComboBox {{
-        color: {text};
-        background: {field};
-        border: 1px solid {border};
-        border-radius: 10px;
-        padding: 8px;
-        selection-background-color: {sel_bg};
-        selection-color: {sel_text};
-    }}
-
-    QComboBox::drop-down {{
-        border: 0px;
-        width: 26px;
-    }}
-
-    QPushButton {{
-        color: {text};
-        background: {card};
-        border: 1px solid {border};
-        border-radius: 10px;
-        padding: 8px 12px;
-        min-height: 34px;
-    }}
-    QPushButton:hover {{
-        background: {hover};
-    }}
-    QPushButton:pressed {{
-        background: {field};
-    }}
-
-    /* Theme toggle button */
-    QPushButton#ThemeBtn {{
-        min-height: 0px;
-        padding: 0px;
-        border-radius: 16px;
-        border: 1px solid {border};
-        background: {card};
-    }}
-    QPushButton#ThemeBtn:hover {{
-        background: {hover};
-    }}
-    QPushButton#ThemeBtn:pressed {{
-        background: {field};
-    }}
-
-    QTabWidget::pane {{
-        border: 0px;
-        margin-top: 8px;
-    }}
-    QTabBar::tab {{
-        color: {text};
-        background: {tab_bg};
-        border: 1px solid {border};
-        border-radius: 10px;
-        padding: 8px 14px;
-        margin-right: 6px;
-    }}
-    QTabBar::tab:selected {{
-        background: {tab_sel};
-    }}
-
-    QListWidget::item, QTreeWidget::item {{
-        padding: 6px;
-        border-radius: 8px;
-    }}
-    QListWidget::item:selected, QTreeWidget::item:selected {{
-        background: {sel_bg};
-        color: {sel_text};
-    }}
-
-    QLabel#Hint {{
-        color: {hint};
-    }}
-
-    QSplitter::handle {{
-        background: {splitter};
-    }}
-
-    QMenu {{
-        background: {menu_bg};
-        color: {text};
-        border: 1px solid {border};
-        border-radius: 10px;
-        padding: 6px;
-    }}
-    QMenu::item {{
-        padding: 6px 12px;
-        border-radius: 8px;
-    }}
-    QMenu::item:selected {{
-        background: {sel_bg};
-        color: {sel_text};
-    }}
-
-    QToolBar {{
-        border: 0px;
-        background: transparent;
-        spacing: 8px;
-    }}
-    """
+        start, step, fmt = today, timedelta(days=1), "%Y-%m-%d"
+    return [
+        (first.strftime(fmt), local_midnight(first), local_midnight(first + step))
+        for first in (start - step * i for i in range(count))
+    ]